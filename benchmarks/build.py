@@ -0,0 +1,302 @@
+"""
+vebp 构建相关路径的性能回归基准
+
+在临时目录中生成合成项目（资源数量/大小、插件数量、子项目层数可配置），
+使用一次性虚拟环境中的替身 PyInstaller 离线运行，统计各操作的耗时中位数。
+
+用法:
+    python benchmarks/build.py                                 # 默认规模
+    python benchmarks/build.py --assets 2000 --asset-bytes 65536 --plugins 100 --depth 3
+    python benchmarks/build.py --only copy_assets_cold --only copy_assets_warm
+    python benchmarks/build.py --save baseline.json            # 保存基线
+    python benchmarks/build.py --baseline baseline.json --threshold 20
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import synthetic  # noqa: E402
+
+RUNNER = "import sys; sys.argv = ['vebp'] + sys.argv[1:]; from vebp.lancher import run; run()"
+
+
+@contextlib.contextmanager
+def quiet():
+    """屏蔽被测代码的输出"""
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        with contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            yield
+
+
+def timeit(fn: Callable[[], object], runs: int, setup: Optional[Callable[[], object]] = None) -> dict:
+    """
+    运行 runs 次并统计耗时，setup 不计入耗时
+
+    :return: {"median_ms", "min_ms", "runs"}
+    """
+    times = []
+    for _ in range(runs):
+        with quiet():
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+
+    return {
+        "median_ms": round(statistics.median(times) * 1000, 3),
+        "min_ms": round(min(times) * 1000, 3),
+        "runs": runs,
+    }
+
+
+class BuildBenchmarks:
+    """在合成项目中运行各项基准，每个 bench_* 方法对应一项结果"""
+
+    def __init__(self, workdir: Path, args) -> None:
+        self.workdir = workdir
+        self.args = args
+        self.project = workdir / "project"
+        self.venv = workdir / "venv"
+        self.plugin_src = workdir / "plugin-src"
+        self.artifacts = workdir / "artifacts"
+
+    def setup(self) -> None:
+        args = self.args
+        print(f"🧪 生成合成项目: {self.workdir}")
+        synthetic.make_venv(self.venv)
+        synthetic.make_project(self.project, self.venv, args.assets, args.asset_bytes, args.depth)
+        synthetic.make_plugins(self.project / "plugins", args.plugins)
+        synthetic.make_plugin_source(self.plugin_src, self.venv, args.plugin_files)
+
+        os.environ["VEBP_BENCH_EXE_BYTES"] = str(args.exe_bytes)
+        os.environ["VEBP_NO_DAEMON"] = "1"
+        os.chdir(self.project)
+
+        from vebp.Data.globals import reset_config
+        reset_config()
+
+    @staticmethod
+    def _builder():
+        from vebp.Builder.Builder import Builder
+
+        builder = Builder.from_package()
+        builder._get_path()
+        return builder
+
+    def bench_from_package(self) -> dict:
+        from vebp.Builder.Builder import Builder
+
+        return timeit(Builder.from_package, self.args.runs)
+
+    def bench_get_cmd(self) -> dict:
+        from vebp.Libs.venvs import get_venv_python
+
+        builder = self._builder()
+        python_path = get_venv_python(builder.venv)
+        return timeit(lambda: builder._get_cmd(python_path), self.args.runs)
+
+    def bench_copy_assets_cold(self) -> dict:
+        builder = self._builder()
+
+        def reset():
+            shutil.rmtree(builder.project_dir, ignore_errors=True)
+            shutil.rmtree(builder.cache_dir / "assets", ignore_errors=True)
+
+        return timeit(builder._copy_assets, self.args.runs, reset)
+
+    def bench_copy_assets_warm(self) -> dict:
+        builder = self._builder()
+        with quiet():
+            builder._copy_assets()
+        return timeit(builder._copy_assets, self.args.runs)
+
+    def bench_copy_exe_onefile(self) -> dict:
+        source = self.artifacts / "onefile" / "app.exe"
+        source.parent.mkdir(parents=True, exist_ok=True)
+        source.write_bytes(os.urandom(self.args.exe_bytes))
+
+        builder = self._builder()
+        target = self.workdir / "out" / "app.exe"
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        return timeit(lambda: builder._copy_exe(source, target), self.args.runs,
+                      lambda: target.unlink(missing_ok=True))
+
+    def bench_copy_exe_onedir(self) -> dict:
+        source = self.artifacts / "onedir" / "app"
+        synthetic.make_assets(source / "_internal", self.args.assets, self.args.asset_bytes)
+        (source / "app.exe").write_bytes(os.urandom(self.args.exe_bytes))
+
+        builder = self._builder()
+        builder._onefile = False
+        target = self.workdir / "out" / "app"
+
+        return timeit(lambda: builder._copy_exe(source, target), self.args.runs,
+                      lambda: shutil.rmtree(target, ignore_errors=True))
+
+    def bench_build_force(self) -> dict:
+        def build():
+            builder = self._builder()
+            builder.force = True
+            if not builder.build():
+                raise RuntimeError("构建失败")
+
+        return timeit(build, self.args.runs)
+
+    def bench_build_noop(self) -> dict:
+        def build():
+            if not self._builder().build():
+                raise RuntimeError("构建失败")
+
+        with quiet():
+            build()
+        return timeit(build, self.args.runs)
+
+    def bench_plugin_build(self) -> dict:
+        from vebp.Builder.Plugin import PluginBuilder
+
+        return timeit(lambda: PluginBuilder(str(self.plugin_src), force=True).build(), self.args.runs)
+
+    def bench_plugin_build_noop(self) -> dict:
+        from vebp.Builder.Plugin import PluginBuilder
+
+        with quiet():
+            PluginBuilder(str(self.plugin_src)).build()
+        return timeit(lambda: PluginBuilder(str(self.plugin_src)).build(), self.args.runs)
+
+    def bench_load_plugins_cold(self) -> dict:
+        from vebp.Plugin.Manager import PluginManager
+        from vebp.Plugin.index import PluginIndex
+
+        index = self.project / "plugins" / PluginIndex.FILENAME
+        return timeit(lambda: PluginManager().load_plugins(), self.args.runs,
+                      lambda: index.unlink(missing_ok=True))
+
+    def bench_load_plugins_warm(self) -> dict:
+        from vebp.Plugin.Manager import PluginManager
+
+        with quiet():
+            manager = PluginManager()
+            manager.load_plugins()
+            manager.index.save()
+        return timeit(lambda: PluginManager().load_plugins(), self.args.runs)
+
+    def bench_cli_startup(self) -> dict:
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+        cmd = [sys.executable, "-c", RUNNER, "version"]
+
+        def run():
+            subprocess.run(cmd, cwd=self.project, env=env, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        return timeit(run, self.args.runs)
+
+    @classmethod
+    def names(cls) -> list[str]:
+        return [name[len("bench_"):] for name in vars(cls) if name.startswith("bench_")]
+
+    def run(self, only: Optional[list[str]] = None) -> dict[str, dict]:
+        results = {}
+        for name in self.names():
+            if only and name not in only:
+                continue
+
+            results[name] = getattr(self, f"bench_{name}")()
+            print(f"  ⏱️ {name:<20}{results[name]['median_ms']:>12.2f} ms  (min {results[name]['min_ms']:.2f} ms)")
+        return results
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], threshold: float, min_ms: float) -> bool:
+    """
+    与基线比较，耗时超出基线 threshold% 且绝对差值超过 min_ms 视为回归
+
+    :return: 是否没有回归
+    """
+    ok = True
+    print(f"\n📊 与基线比较 (阈值 +{threshold:.0f}%, 最小差值 {min_ms:.1f} ms):")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"  ➖ {name:<20}基线中不存在")
+            continue
+
+        current, previous = result["median_ms"], base["median_ms"]
+        change = (current - previous) / previous * 100 if previous else 0.0
+        regressed = current > previous * (1 + threshold / 100) and current - previous > min_ms
+
+        mark = "❌" if regressed else "✅"
+        print(f"  {mark} {name:<20}{previous:>10.2f} -> {current:>10.2f} ms ({change:+.1f}%)")
+        ok = ok and not regressed
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="vebp 构建性能基准")
+    parser.add_argument("--assets", type=int, default=500, help="外部资源文件数 (子项目为其 1/10)")
+    parser.add_argument("--asset-bytes", type=int, default=16 * 1024, help="每个资源文件的字节数")
+    parser.add_argument("--plugins", type=int, default=50, help="插件目录中的插件数")
+    parser.add_argument("--plugin-files", type=int, default=200, help="待打包插件的文件数")
+    parser.add_argument("--depth", type=int, default=2, help="子项目嵌套层数")
+    parser.add_argument("--exe-bytes", type=int, default=8 * 1024 * 1024, help="替身 PyInstaller 生成的可执行文件大小")
+    parser.add_argument("--runs", type=int, default=5, help="每项运行次数，取中位数")
+    parser.add_argument("--only", action="append", choices=BuildBenchmarks.names(), help="只运行指定基准 (可重复)")
+    parser.add_argument("--save", help="把结果保存为 JSON (可作为基线)")
+    parser.add_argument("--baseline", help="与基线 JSON 比较")
+    parser.add_argument("--threshold", type=float, default=20.0, help="允许超出基线的百分比")
+    parser.add_argument("--min-ms", type=float, default=1.0, help="低于该绝对差值 (ms) 的变化不算回归")
+    parser.add_argument("--keep", action="store_true", help="保留生成的临时目录")
+    args = parser.parse_args()
+    args.runs = max(1, args.runs)
+
+    workdir = Path(tempfile.mkdtemp(prefix="vebp-bench-"))
+    cwd = os.getcwd()
+    try:
+        bench = BuildBenchmarks(workdir, args)
+        bench.setup()
+        results = bench.run(args.only)
+    finally:
+        os.chdir(cwd)
+        if args.keep:
+            print(f"📂 临时目录已保留: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "params": {key: getattr(args, key) for key in
+                   ("assets", "asset_bytes", "plugins", "plugin_files", "depth", "exe_bytes", "runs")},
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    ok = True
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        if baseline.get("params") != report["params"]:
+            print("⚠️ 基线的项目规模参数与本次不同, 比较结果可能没有意义", file=sys.stderr)
+        ok = compare(results, baseline.get("results", {}), args.threshold, args.min_ms)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"💾 结果已保存: {args.save}")
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
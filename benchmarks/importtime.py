@@ -0,0 +1,120 @@
+"""
+vebp 启动导入耗时回归基准
+
+使用 `python -X importtime` 运行 vebp 命令，统计导入总耗时并检查是否加载了不应在该命令中出现的重型依赖。
+
+用法:
+    python benchmarks/importtime.py                       # 测量 `vebp version`
+    python benchmarks/importtime.py help --runs 10
+    python benchmarks/importtime.py --save baseline.json  # 保存基线
+    python benchmarks/importtime.py --baseline baseline.json --threshold 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 非交互、非构建命令不应加载的模块
+FORBIDDEN = (
+    "questionary",
+    "prompt_toolkit",
+    "pygments",
+    "PyInstaller",
+    "vebp.Builder",
+    "vebp.Console",
+)
+
+RUNNER = "import sys; sys.argv = ['vebp'] + sys.argv[1:]; from vebp.lancher import run; run()"
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """解析 -X importtime 输出，返回 {模块名: 累计耗时(us)}，只保留顶层导入"""
+    result = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line.split("|")
+        # 嵌套导入的模块名带有额外缩进
+        if not name[1:].startswith(" "):
+            result[name.strip()] = int(cumulative)
+    return result
+
+
+def imported_modules(stderr: str) -> set[str]:
+    return {line.split("|")[2].strip() for line in stderr.splitlines()
+            if line.startswith("import time:") and "cumulative" not in line}
+
+
+def measure(command: list[str], runs: int) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])))
+    totals, walls, modules = [], [], set()
+
+    # 在空目录中运行，避免读取或生成当前目录下的配置和插件目录
+    with tempfile.TemporaryDirectory(prefix="vebp-importtime-") as cwd:
+        for _ in range(runs):
+            start = time.perf_counter()
+            proc = subprocess.run([sys.executable, "-X", "importtime", "-c", RUNNER, *command],
+                                  cwd=cwd, env=env, capture_output=True, text=True)
+            walls.append(time.perf_counter() - start)
+
+            if proc.returncode != 0:
+                raise RuntimeError(f"命令执行失败 ({proc.returncode}):\n{proc.stderr[-2000:]}")
+
+            top = parse_importtime(proc.stderr)
+            totals.append(sum(top.values()) / 1000)
+            modules |= imported_modules(proc.stderr)
+
+    return {
+        "command": command,
+        "runs": runs,
+        "import_ms": statistics.median(totals),
+        "wall_ms": statistics.median(walls) * 1000,
+        "forbidden": sorted(m for m in modules if any(m == f or m.startswith(f"{f}.") for f in FORBIDDEN)),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="vebp 启动导入耗时基准")
+    parser.add_argument("command", nargs="*", default=["version"], help="要测量的 vebp 命令 (默认: version)")
+    parser.add_argument("--runs", type=int, default=5, help="运行次数，取中位数")
+    parser.add_argument("--save", help="把结果保存为基线 JSON")
+    parser.add_argument("--baseline", help="与基线 JSON 比较")
+    parser.add_argument("--threshold", type=float, default=20.0, help="允许超出基线的百分比")
+    args = parser.parse_args()
+
+    result = measure(args.command or ["version"], max(1, args.runs))
+    print(f"⏱️ vebp {' '.join(result['command'])}: 导入 {result['import_ms']:.1f} ms, "
+          f"总耗时 {result['wall_ms']:.1f} ms (中位数, {result['runs']} 次)")
+
+    failed = False
+    if result["forbidden"]:
+        print(f"❌ 加载了不应导入的模块: {', '.join(result['forbidden'])}", file=sys.stderr)
+        failed = True
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        limit = baseline["import_ms"] * (1 + args.threshold / 100)
+        if result["import_ms"] > limit:
+            print(f"❌ 导入耗时回归: {result['import_ms']:.1f} ms > {limit:.1f} ms "
+                  f"(基线 {baseline['import_ms']:.1f} ms + {args.threshold:.0f}%)", file=sys.stderr)
+            failed = True
+        else:
+            print(f"✅ 未超过基线 {baseline['import_ms']:.1f} ms + {args.threshold:.0f}%")
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"💾 基线已保存: {args.save}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
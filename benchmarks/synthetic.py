@@ -0,0 +1,171 @@
+"""
+生成基准测试使用的合成项目
+
+- 一次性虚拟环境，其中的 PyInstaller 是只生成假可执行文件的替身模块，无需联网安装
+- 可配置资源数量/大小和子项目层数的构建项目
+- 可配置数量的插件目录和一个带依赖的待打包插件
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# 替身 PyInstaller：解析 vebp 传入的参数，按真实 PyInstaller 的格式输出阶段日志并生成产物
+PYINSTALLER_STUB = '''\
+import os
+import sys
+
+
+def main(argv):
+    name, dist, onedir = "app", "dist", False
+    i = 0
+    while i < len(argv):
+        if argv[i] == "--name":
+            i += 1
+            name = argv[i]
+        elif argv[i] == "--distpath":
+            i += 1
+            dist = argv[i]
+        elif argv[i] == "--onedir":
+            onedir = True
+        i += 1
+
+    size = int(os.environ.get("VEBP_BENCH_EXE_BYTES", "1048576"))
+    print("INFO: PyInstaller: 0.0 (vebp benchmark stub)")
+    print("INFO: Running Analysis Analysis-00.toc")
+    print("INFO: Building PYZ (ZlibArchive) PYZ-00.pyz")
+    print("INFO: Building PKG (CArchive) %s.pkg" % name)
+    print("INFO: Building EXE from EXE-00.toc")
+
+    os.makedirs(dist, exist_ok=True)
+    if onedir:
+        print("INFO: Building COLLECT COLLECT-00.toc")
+        target = os.path.join(dist, name)
+        os.makedirs(os.path.join(target, "_internal"), exist_ok=True)
+        with open(os.path.join(target, name + ".exe"), "wb") as f:
+            f.write(b"\\0" * size)
+        for n in range(int(os.environ.get("VEBP_BENCH_ONEDIR_FILES", "50"))):
+            with open(os.path.join(target, "_internal", "lib%d.dat" % n), "wb") as f:
+                f.write(b"\\0" * 4096)
+    else:
+        with open(os.path.join(dist, name + ".exe"), "wb") as f:
+            f.write(b"\\0" * size)
+    print("INFO: Build complete!")
+
+
+main(sys.argv[1:])
+'''
+
+
+def _write(path: Path, content, binary: bool = False) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if binary:
+        path.write_bytes(content)
+    else:
+        path.write_text(content, encoding="utf-8")
+
+
+def _write_json(path: Path, data: dict) -> None:
+    _write(path, json.dumps(data, indent=4, ensure_ascii=False))
+
+
+def site_packages(venv: Path) -> Path:
+    if os.name == "nt":
+        return venv / "Lib" / "site-packages"
+    return next((venv / "lib").glob("python*/site-packages"))
+
+
+def make_venv(venv: Path, dep_files: int = 20) -> Path:
+    """
+    创建不含 pip 的虚拟环境，安装替身 PyInstaller 和一个供插件依赖解析使用的假依赖包
+
+    :param venv: 虚拟环境目录
+    :param dep_files: 假依赖包中的文件数
+    """
+    subprocess.run([sys.executable, "-m", "venv", "--without-pip", str(venv)], check=True)
+    site = site_packages(venv)
+
+    _write(site / "PyInstaller" / "__init__.py", "")
+    _write(site / "PyInstaller" / "__main__.py", PYINSTALLER_STUB)
+
+    dep = site / "benchdep"
+    _write(dep / "__init__.py", "VALUE = 1\n")
+    for i in range(dep_files):
+        _write(dep / f"mod{i}.py", f"def f{i}():\n    return {i}\n" * 20)
+    _write(site / "benchdep-1.0.dist-info" / "top_level.txt", "benchdep\n")
+    _write(site / "benchdep-1.0.dist-info" / "METADATA", "Metadata-Version: 2.1\nName: benchdep\nVersion: 1.0\n")
+
+    return venv
+
+
+def make_assets(folder: Path, count: int, size: int, per_dir: int = 50) -> None:
+    """生成 count 个 size 字节的资源文件，每个子目录 per_dir 个"""
+    chunk = os.urandom(min(size, 65536)) if size else b""
+    data = (chunk * (size // len(chunk) + 1))[:size] if chunk else b""
+
+    for i in range(count):
+        _write(folder / f"d{i // per_dir}" / f"asset{i}.bin", data, binary=True)
+
+
+def make_project(root: Path, venv: Path, assets: int, asset_bytes: int, depth: int, modules: int = 20) -> Path:
+    """
+    生成构建项目，子项目逐层嵌套 depth 层
+
+    :param root: 项目目录
+    :param venv: 虚拟环境目录（绝对路径）
+    :param assets: 外部资源文件数
+    :param asset_bytes: 每个资源文件的字节数
+    :param depth: 子项目层数
+    :param modules: 本地模块数量
+    """
+    def project(folder: Path, name: str, level: int) -> None:
+        imports = "\n".join(f"import pkg.m{i}" for i in range(modules))
+        _write(folder / "main.py", f"{imports}\nprint('{name}')\n")
+        _write(folder / "pkg" / "__init__.py", "")
+        for i in range(modules):
+            _write(folder / "pkg" / f"m{i}.py", f"from pkg import m{(i + 1) % modules}\nX = {i}\n")
+
+        _write(folder / "data" / "config.json", json.dumps({"name": name}))
+
+        build = {
+            "main": "main.py",
+            "onefile": True,
+            "in_assets": [{"from": ["data"], "to": "data"}],
+            "assets": [{"from": ["assets"], "to": "res"}],
+        }
+        if level < depth:
+            # 子项目目录相对于根项目（构建时的工作目录）
+            sub = folder / f"sub{level + 1}"
+            build["sub_project"] = [{"path": sub.name, "script": sub.relative_to(root).as_posix()}]
+            project(sub, sub.name, level + 1)
+
+        make_assets(folder / "assets", assets if level == 0 else max(1, assets // 10), asset_bytes)
+        _write_json(folder / "vebp-build.json", build)
+        _write_json(folder / "vebp-package.json", {"name": name, "venv": str(venv)})
+
+    project(root, "app", 0)
+    _write_json(root / "vebp-config.json", {"autoRun": False, "plugins": {"src": "plugins", "add": {}}})
+    return root
+
+
+def make_plugins(folder: Path, count: int, files: int = 5) -> Path:
+    """生成 count 个插件目录，每个插件带 files 个模块"""
+    for i in range(count):
+        plugin = folder / f"plugin{i}"
+        _write_json(plugin / "vebp-plugin.json", {"namespace": f"bench{i}", "author": "bench"})
+        _write(plugin / "main.py", "def on_load(*args, **kwargs):\n    pass\n\n\ndef before_build(*args, **kwargs):\n    pass\n")
+        for n in range(files):
+            _write(plugin / "lib" / f"m{n}.py", f"X = {n}\n")
+    return folder
+
+
+def make_plugin_source(folder: Path, venv: Path, files: int) -> Path:
+    """生成待打包的插件项目，依赖虚拟环境中的假依赖包"""
+    _write_json(folder / "vebp-plugin.json", {"namespace": "benchplugin", "author": "bench"})
+    _write_json(folder / "vebp-package.json", {"name": "benchplugin", "venv": str(venv)})
+    _write(folder / "main.py", "def on_load(*args, **kwargs):\n    pass\n")
+    _write(folder / "requirements.txt", "benchdep\n")
+    for n in range(files):
+        _write(folder / "lib" / f"d{n // 50}" / f"m{n}.py", f"X = {n}\n" * 50)
+    return folder
@@ -0,0 +1,241 @@
+"""
+ZipStreamWriter 生成归档的正确性与内存检查
+
+用 ZipStreamWriter 写入归档，再用标准库 zipfile 读回，逐项校验内容、CRC 和时间戳，覆盖:
+    - 超过 4 GiB 的条目和偏移 (Zip64 扩展字段)
+    - 超过 65535 个条目 (Zip64 中央目录结束记录)
+    - add_zip 原样复制的成员
+    - 并发压缩时已提交条目占用的内存上限
+
+用法:
+    python benchmarks/zipcheck.py                 # 全部检查 (大文件检查需要约 8 GiB 临时磁盘空间)
+    python benchmarks/zipcheck.py --skip-large    # 跳过超过 4 GiB 的检查
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from vebp.Libs.File.zip import ZipStreamWriter  # noqa: E402
+
+# 固定的偶数秒时间戳，DOS 时间只精确到 2 秒
+MTIME = time.mktime((2024, 5, 17, 12, 34, 56, 0, 0, -1))
+LARGE = 4 * 1024 * 1024 * 1024 + 1024 * 1024
+
+# 在子进程中运行，只统计写入归档本身的峰值内存
+RSS_SCRIPT = """
+import resource, sys
+from pathlib import Path
+sys.path.insert(0, sys.argv[1])
+from vebp.Libs.File.zip import ZipStreamWriter
+folder = Path(sys.argv[2])
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+with ZipStreamWriter(folder / "out.zip", level=9, jobs=16) as writer:
+    writer.add_files((path, path.name) for path in sorted(folder.glob("m*")))
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+scale = 1 if sys.platform == "darwin" else 1024
+print((peak - before) * scale)
+"""
+
+
+def _make_file(path: Path, size: int, data: bytes = b"") -> Path:
+    """写入文件并设置固定的修改时间，data 为空时生成稀疏文件"""
+    with open(path, "wb") as f:
+        if data:
+            f.write(data)
+        else:
+            f.truncate(size)
+    os.utime(path, (MTIME, MTIME))
+    return path
+
+
+def _verify(archive: Path, expected: dict[str, Callable[[], object]], date_time: tuple = None) -> int:
+    """
+    用 zipfile 读回归档并逐项比较
+
+    :param expected: {成员名: 返回期望内容 (bytes) 或 (大小, CRC) 的函数}
+    :param date_time: 期望的时间戳，None 表示不检查
+    :return: 校验的成员数
+    """
+    with zipfile.ZipFile(archive) as z:
+        bad = z.testzip()
+        if bad is not None:
+            raise AssertionError(f"CRC 校验失败: {bad}")
+
+        infos = z.infolist()
+        names = [info.filename for info in infos]
+        if names != list(expected):
+            raise AssertionError(f"成员列表不一致: {len(names)} 个, 期望 {len(expected)} 个")
+
+        for info in infos:
+            want = expected[info.filename]()
+            if isinstance(want, bytes):
+                if z.read(info) != want:
+                    raise AssertionError(f"内容不一致: {info.filename}")
+            elif (info.file_size, info.CRC) != want:
+                raise AssertionError(f"大小或 CRC 不一致: {info.filename} {(info.file_size, info.CRC)} != {want}")
+
+            if date_time is not None and info.date_time != date_time:
+                raise AssertionError(f"时间戳不一致: {info.filename} {info.date_time} != {date_time}")
+
+    return len(expected)
+
+
+def _zeros_crc(size: int) -> int:
+    crc, chunk = 0, bytes(1024 * 1024)
+    while size > 0:
+        crc = zlib.crc32(chunk[:min(size, len(chunk))], crc)
+        size -= len(chunk)
+    return crc
+
+
+def check_many(folder: Path) -> str:
+    """超过 65535 个条目，归档需要 Zip64 中央目录结束记录"""
+    count = 70000
+    source = _make_file(folder / "small.txt", 0, b"vebp zip64 entry count\n")
+    archive = folder / "many.zip"
+    with ZipStreamWriter(archive, level=6, jobs=4) as writer:
+        writer.add_files((source, f"d{i // 1000}/f{i}.txt") for i in range(count))
+
+    content = source.read_bytes()
+    expected = {f"d{i // 1000}/f{i}.txt": (lambda: content) for i in range(count)}
+    return f"{_verify(archive, expected, time.localtime(MTIME)[:6])} 个条目"
+
+
+def check_add_zip(folder: Path) -> str:
+    """add_zip 原样复制 STORED 和 DEFLATED 成员，CRC、压缩方式和时间戳不变"""
+    source = folder / "source.zip"
+    members = {
+        "a/text.txt": (b"hello vebp\n" * 1000, zipfile.ZIP_DEFLATED),
+        "a/raw.bin": (os.urandom(4096), zipfile.ZIP_STORED),
+        "b/empty.txt": (b"", zipfile.ZIP_DEFLATED),
+    }
+    date_time = (2023, 1, 2, 3, 4, 6)
+    with zipfile.ZipFile(source, "w") as z:
+        for name, (data, method) in members.items():
+            info = zipfile.ZipInfo(name, date_time)
+            info.compress_type = method
+            info.external_attr = 0o100644 << 16
+            z.writestr(info, data)
+        z.writestr("skip/me.txt", b"excluded")
+
+    archive = folder / "copied.zip"
+    with ZipStreamWriter(archive) as writer:
+        writer.add_bytes("first.txt", b"before copy")
+        writer.add_zip(source, prefix="deps/", exclude=["deps/skip/me.txt"])
+
+    with zipfile.ZipFile(source) as src, zipfile.ZipFile(archive) as out:
+        for name, (_, method) in members.items():
+            copied = out.getinfo(f"deps/{name}")
+            original = src.getinfo(name)
+            if (copied.compress_type, copied.compress_size, copied.CRC) != \
+                    (method, original.compress_size, original.CRC):
+                raise AssertionError(f"成员没有被原样复制: {name}")
+            if copied.date_time != date_time:
+                raise AssertionError(f"时间戳不一致: {name} {copied.date_time} != {date_time}")
+
+    expected = {"first.txt": lambda: b"before copy"}
+    expected.update({f"deps/{name}": (lambda data=data: data) for name, (data, _) in members.items()})
+    return f"{_verify(archive, expected)} 个条目"
+
+
+def check_large(folder: Path) -> str:
+    """超过 4 GiB 的 DEFLATED 和 STORED 条目，以及位于 4 GiB 之后的条目偏移"""
+    sparse = _make_file(folder / "large.dat", LARGE)
+    stored = _make_file(folder / "large.zst", LARGE)
+    tail = _make_file(folder / "tail.txt", 0, b"after 4 GiB\n")
+
+    archive = folder / "large.zip"
+    with ZipStreamWriter(archive, level=1, jobs=2) as writer:
+        writer.add_files([(sparse, "large.dat"), (stored, "large.zst"), (tail, "tail.txt")])
+
+    crc = _zeros_crc(LARGE)
+    expected = {
+        "large.dat": lambda: (LARGE, crc),
+        "large.zst": lambda: (LARGE, crc),
+        "tail.txt": lambda: b"after 4 GiB\n",
+    }
+    with zipfile.ZipFile(archive) as z:
+        methods = [info.compress_type for info in z.infolist()]
+        if methods[:2] != [zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED]:
+            raise AssertionError(f"压缩方式不符合预期: {methods}")
+        if z.getinfo("tail.txt").header_offset <= LARGE:
+            raise AssertionError("最后一个条目没有位于 4 GiB 之后")
+
+    # 大条目只比较中央目录记录，完整读回由 testzip 完成 CRC 校验
+    return f"{_verify(archive, expected, time.localtime(MTIME)[:6])} 个条目, {archive.stat().st_size / 1024 ** 3:.1f} GiB"
+
+
+def check_memory(folder: Path) -> str:
+    """排在前面的条目压缩较慢时，后续已完成但等待写入的条目占用的内存受字节窗口限制"""
+    if os.name == "nt":
+        return "跳过 (Windows 不支持 resource)"
+
+    # 第一个条目是以最高级别压缩的随机数据（最后回退为直接存储），后面的条目直接存储，会在它写入之前完成
+    _make_file(folder / "m000.txt", 0, os.urandom(64 * 1024 * 1024))
+    count, size = 80, 8 * 1024 * 1024
+    for i in range(1, count):
+        _make_file(folder / f"m{i:03}.zst", 0, os.urandom(size))
+
+    proc = subprocess.run([sys.executable, "-c", RSS_SCRIPT, str(ROOT), str(folder)],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"写入失败 ({proc.returncode}):\n{proc.stderr[-2000:]}")
+
+    growth = int(proc.stdout.strip())
+    # 窗口 64 MiB，加上缓冲扩容和线程内存分配的余量；只按条目数量限制时超过 400 MiB
+    limit = 200 * 1024 * 1024
+    if growth > limit:
+        raise AssertionError(f"峰值内存增长 {growth / 1024 ** 2:.0f} MiB 超过 {limit / 1024 ** 2:.0f} MiB")
+    return f"{count} x {size // 1024 ** 2} MiB, 峰值内存增长 {growth / 1024 ** 2:.0f} MiB"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="ZipStreamWriter 归档正确性检查")
+    parser.add_argument("--skip-large", action="store_true", help="跳过超过 4 GiB 的条目检查")
+    parser.add_argument("--keep", action="store_true", help="保留生成的临时目录")
+    args = parser.parse_args()
+
+    checks = [("many_entries", check_many), ("add_zip", check_add_zip), ("memory", check_memory)]
+    if not args.skip_large:
+        checks.append(("large_entries", check_large))
+
+    workdir = Path(tempfile.mkdtemp(prefix="vebp-zipcheck-"))
+    failed = False
+    try:
+        for name, check in checks:
+            folder = workdir / name
+            folder.mkdir()
+            start = time.perf_counter()
+            try:
+                detail = check(folder)
+            except (AssertionError, zipfile.BadZipFile) as e:
+                print(f"  ❌ {name:<16}{e}", file=sys.stderr)
+                failed = True
+            else:
+                print(f"  ✅ {name:<16}{detail} ({time.perf_counter() - start:.1f}s)")
+            finally:
+                # 大文件检查占用大量磁盘，每项检查结束后立即清理
+                if not args.keep:
+                    shutil.rmtree(folder, ignore_errors=True)
+    finally:
+        if args.keep:
+            print(f"📂 临时目录已保留: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
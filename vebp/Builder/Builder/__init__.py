@@ -1,19 +1,33 @@
-﻿import os
+﻿import hashlib
+import json
+import os
 import platform
 import shutil
 import subprocess
 import sys
+import time
 from pathlib import Path
 from typing import Dict, Union, Optional
 
 from vebp.Libs.File import FileStream, FolderStream
+from vebp.Libs.File.cache import CacheDir
+from vebp.Libs.File.ignore import IgnoreSpec
 from vebp.Libs.File.path import MPath_
+from vebp.Libs.File.sync import FolderSync
+from vebp.Libs.File.tree import iter_tree
 from vebp.Builder import BaseBuilder
+from vebp.Builder.Builder.manifest import BuildManifest
+from vebp.Builder.Builder.planner import BuildPlan
+from vebp.Builder.Builder.progress import run_pyinstaller
+from vebp.Builder.Builder.scheduler import SubProjectScheduler, validate_jobs
 from vebp.Data.BuildConfig import BuildConfig
 from vebp.Data.globals import get_config
 from vebp.Data.Package import Package
 from vebp.Libs.venvs import get_venv_python
 
+# mtime: 比较 size 和 mtime; hash: stat 变化时再比较内容哈希; copy: 每次全部重新复制
+ASSET_SYNC_MODES = ("mtime", "hash", "copy")
+
 
 class Builder(BaseBuilder):
     def __init__(self, name=None, icon=None, parent_path=None, sub=None, base_path=".") -> None:
@@ -29,10 +43,20 @@ class Builder(BaseBuilder):
         self._exclude_commands = []
 
         self._auto_run = True
+        self._force = False
+        self._jobs = 1
+        self._asset_sync = "mtime"
+        # assets 和 in_assets 的排除规则，相对 base_path
+        self.ignore = IgnoreSpec()
 
         self.sub_project_src = {}
         self.sub_project_builder = []
 
+        # 由构建计划统一调度时为 True，此时不再自行构建子项目
+        self.planned = False
+        self.extra_project_dirs: list[Path] = []
+        self._plan: Optional[BuildPlan] = None
+
     def _get_path(self) -> None:
         if not self._parent_path:
             self._parent_path = self.name
@@ -70,6 +94,32 @@ class Builder(BaseBuilder):
     def auto_run(self, value) -> None:
         self._auto_run = value
 
+    @property
+    def force(self) -> bool:
+        return self._force
+
+    @force.setter
+    def force(self, value) -> None:
+        self._force = value
+
+    @property
+    def jobs(self) -> int:
+        return self._jobs
+
+    @jobs.setter
+    def jobs(self, value) -> None:
+        self._jobs = validate_jobs(value)
+
+    @property
+    def asset_sync(self) -> str:
+        return self._asset_sync
+
+    @asset_sync.setter
+    def asset_sync(self, value) -> None:
+        if value not in ASSET_SYNC_MODES:
+            raise ValueError(f"未知的资源同步模式: {value} (可选: {', '.join(ASSET_SYNC_MODES)})")
+        self._asset_sync = value
+
     @staticmethod
     def from_package(folder_path = None, sub=None, parent=None, base_path=".") -> Optional["Builder"]:
         if folder_path:
@@ -111,6 +161,13 @@ class Builder(BaseBuilder):
         if sub_pro:
             for pro in sub_pro:
                 builder.add_sub_project(pro.get("path", "sub_project"), pro.get("script", None))
+        try:
+            builder.jobs = build_config.get('jobs', 1)
+        except ValueError as e:
+            raise ValueError(f"{build_config.path} 中的 jobs 配置错误: {e}") from None
+        builder.asset_sync = build_config.get('asset_sync', "mtime")
+        builder.ignore = IgnoreSpec.load(builder.base_path, build_config.get('exclude', []))
+
         exclude_modules = build_config.get('exclude_modules', [])
         builder._exclude_modules = exclude_modules
 
@@ -183,12 +240,74 @@ class Builder(BaseBuilder):
 
         return True
 
+    def _asset_exclude(self, source: Path):
+        """
+        资源的排除规则
+
+        :param source: 资源路径
+        :return: (资源本身是否被排除, 遍历资源目录时使用的 exclude 回调，没有规则时为 None)
+        """
+        if not self.ignore:
+            return False, None
+
+        try:
+            prefix = source.resolve().relative_to(self._base_path.resolve()).as_posix()
+        except ValueError:
+            # 不在项目目录中的资源只能按名称匹配
+            prefix = source.name
+        if prefix == ".":
+            prefix = ""
+
+        if prefix and self.ignore.match_path(prefix, source.is_dir()):
+            return True, None
+        return False, self.ignore.under(prefix)
+
+    @staticmethod
+    def _filtered_data(source: Path, out: Path, exclude) -> list[tuple[Path, Path]]:
+        """
+        拆分含有被排除文件的目录: 没有排除任何内容的子目录整体添加，其余逐个文件添加
+
+        :return: [(源路径, 目标目录)]，目录中没有被排除的内容时只有目录本身一项
+        """
+        excluded = []
+
+        def record(relpath, entry) -> bool:
+            if exclude(relpath, entry):
+                excluded.append(relpath)
+                return True
+            return False
+
+        entries = list(iter_tree(source, record, dirs=True, with_stat=False))
+        if not excluded:
+            return [(source, out)]
+
+        # 含有被排除内容的目录 (包括根目录 "")
+        tainted = {""}
+        for relpath in excluded:
+            parts = relpath.split("/")[:-1]
+            tainted.update("/".join(parts[:i]) for i in range(1, len(parts) + 1))
+
+        data = []
+        for entry in entries:
+            parent = entry.relpath.rpartition("/")[0]
+            if parent not in tainted:
+                continue
+            if not entry.is_dir:
+                data.append((Path(entry.path), out / parent))
+            elif entry.relpath not in tainted:
+                data.append((Path(entry.path), out / entry.relpath))
+        return data
+
     def _get_add_data_args(self) -> list[str]:
         add_data_args = []
         separator = ";" if platform.system() == "Windows" else ":"
 
         for target_relative, sources in self.in_assets.items():
             for source in sources:
+                skip, exclude = self._asset_exclude(source)
+                if skip:
+                    continue
+
                 abs_source = source.resolve()
 
                 out = Path(target_relative)
@@ -196,8 +315,13 @@ class Builder(BaseBuilder):
                 if source.is_dir():
                     out /= source
 
-                arg = f"{abs_source}{separator}{out}"
-                add_data_args.extend(["--add-data", arg])
+                data = [(abs_source, out)]
+                if exclude is not None and source.is_dir():
+                    data = self._filtered_data(abs_source, out, exclude)
+
+                for path, dest in data:
+                    arg = f"{path}{separator}{dest}"
+                    add_data_args.extend(["--add-data", arg])
 
         return add_data_args
 
@@ -205,8 +329,13 @@ class Builder(BaseBuilder):
         if not self._assets:
             return True
 
-        print("\n📦 复制外部资源...")
+        if self.asset_sync == "copy":
+            print("\n📦 复制外部资源...")
+        else:
+            print("\n📦 同步外部资源...")
+
         success = True
+        sync = FolderSync(self.cache_dir / "assets" / f"{self.name}.json", self.asset_sync == "hash", self._copier())
 
         for target_relative, sources in self.assets.items():
             target_path = self._project_dir / target_relative
@@ -218,38 +347,36 @@ class Builder(BaseBuilder):
                 continue
 
             for source in sources:
+                skip, exclude = self._asset_exclude(source)
+                if skip:
+                    print(f"  ⏭️ 跳过被排除的资源: {source}")
+                    continue
+
                 try:
                     source_path = source.resolve()
                     dest_path = target_path / source.name
-                    if source.is_dir():
-                        print(f"  📁 复制目录: {source} -> {dest_path}")
-                        if dest_path.exists:
-                            shutil.rmtree(dest_path)
-
-                        FolderStream(str(dest_path)).create()
 
-                        for root, dirs, files in os.walk(source_path):
-                            relative_path = Path(root).relative_to(source_path)
-                            dest_dir = dest_path / relative_path
-
-                            FolderStream(str(dest_dir)).create()
+                    if self.asset_sync == "copy" and dest_path.exists():
+                        if dest_path.is_dir():
+                            shutil.rmtree(dest_path)
+                        else:
+                            os.remove(dest_path)
 
-                            # 复制所有文件
-                            for file in files:
-                                src_file = Path(root) / file
-                                dest_file = dest_dir / file
-                                if not FileStream.copy(str(src_file), str(dest_file)):
-                                    print(f"    复制文件失败: {src_file} -> {dest_file}", file=sys.stderr)
-                                    success = False
+                    if source.is_dir():
+                        print(f"  📁 同步目录: {source} -> {dest_path}")
+                        if not sync.sync_tree(source_path, dest_path, exclude):
+                            success = False
                     else:
-                        print(f"  📄 复制文件: {source} -> {dest_path}")
-                        if not FileStream.copy(str(source_path), str(dest_path)):
-                            print(f"    复制文件失败: {source} -> {dest_path}", file=sys.stderr)
+                        print(f"  📄 同步文件: {source} -> {dest_path}")
+                        if not sync.sync_file(source_path, dest_path):
                             success = False
                 except Exception as e:
                     print(f"  ❌ 复制 {source} 出错: {str(e)}", file=sys.stderr)
                     success = False
 
+        sync.save()
+        print(f"  📊 {sync.stats.summary()}")
+
         return success
 
     def _print_result(self, target_path) -> None:
@@ -271,17 +398,11 @@ class Builder(BaseBuilder):
         else:
             print(f"  📁 复制目录: {source_path} -> {target_path}")
 
-            for item in source_path.iterdir():
-                dest_item = target_path / item.name
-                if item.is_dir():
-                    shutil.copytree(item, dest_item, dirs_exist_ok=True)
-                    return True
-                else:
-                    if not FileStream.copy(str(item), str(dest_item)):
-                        print(f"    复制文件失败: {item} -> {dest_item}", file=sys.stderr)
-                        return False
+            copier = self._copier()
+            success = copier.copy_tree(source_path, target_path)
+            print(f"  ⚡ {copier.stats.summary()}")
 
-            return True
+            return success
 
     def _start_build(self, cmd) -> None:
         print(f"\n🔨 开始打包项目: {self.name}")
@@ -298,15 +419,34 @@ class Builder(BaseBuilder):
 
         print("⏳ 打包进行中...")
 
-        subprocess.run(
-            cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.STDOUT,
-            check=True
-        )
+        run_pyinstaller(cmd, self.name, self.base_output_dir / "reports" / f"{self.name}.json")
+
+    def _work_key(self, python_path) -> str:
+        """PyInstaller 工作目录的 key: 项目名 + 解释器 + 影响分析结果的选项"""
+        options = {
+            "python": str(Path(str(python_path)).resolve()) if python_path else None,
+            "onefile": self.onefile,
+            "console": self.console,
+            "icon": str(self.icon.resolve()) if self.icon else None,
+            "exclude_modules": sorted(self._exclude_modules),
+        }
+        digest = hashlib.sha256(json.dumps(options, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        return f"{self.name}-{digest}"
+
+    def _work_cache(self) -> CacheDir:
+        """PyInstaller 工作目录缓存，容量由 vebp-config.json 的 buildCache.maxSize (MB) 决定"""
+        max_size = get_config().get("buildCache", 2048, "maxSize")
+        return CacheDir(self.cache_dir / "pyinstaller", max_size * 1024 * 1024 if max_size else None)
+
+    def _get_work_dir(self, python_path) -> Path:
+        return self._work_cache().path(self._work_key(python_path))
 
     def _get_cmd(self, python_path) -> list[str]:
-        cmd = [str(python_path), '-m', 'PyInstaller', '--noconfirm']
+        work_dir = self._get_work_dir(python_path)
+        cmd = [str(python_path), '-m', 'PyInstaller', '--noconfirm',
+               '--workpath', str(work_dir / "build"),
+               '--distpath', str(work_dir / "dist"),
+               '--specpath', str(work_dir / "spec")]
 
         if self.onefile:
             cmd.append('--onefile')
@@ -344,16 +484,63 @@ class Builder(BaseBuilder):
         except Exception as e:
             print(f"运行程序失败: {str(e)}", file=sys.stderr)
 
+    def plan(self) -> BuildPlan:
+        """加载完整的子项目树并生成构建计划"""
+        if self._plan is None:
+            self._plan = BuildPlan(self)
+        return self._plan
+
     def _compile_sub_project(self) -> None:
-        if not self.sub_project_src:
+        if not self.sub_project_src or self.planned:
             return
 
-        for key, pro in self.sub_project_src.items():
-            self.sub_project_builder.append(self.from_package(pro, key, self._project_dir, pro))
+        self.sub_project_builder = [node.builder for node in self.plan().sub_nodes]
 
     def _build_sub_project(self) -> None:
-        for pro in self.sub_project_builder:
-            pro.build()
+        if not self.sub_project_builder:
+            return
+
+        nodes = self.plan().sub_nodes
+        index = {node.key: i for i, node in enumerate(nodes)}
+        deps = {i: [index[d] for d in node.deps] for i, node in enumerate(nodes)}
+
+        scheduler = SubProjectScheduler(self.jobs)
+        results = scheduler.run(self.sub_project_builder, deps)
+
+        if not scheduler.report(results):
+            failed = ", ".join(result.name for result in results if not result.success)
+            raise ValueError(f"子项目构建失败: {failed}")
+
+    def _deliver(self, source_path: Path) -> bool:
+        """复制打包产物和外部资源到输出目录"""
+        if self.onefile:
+            target_path = self._project_dir / f"{self.name}.exe"
+        else:
+            target_path = self._project_dir
+
+        FolderStream(str(self._project_dir)).create()
+
+        with self.span("copy exe", target=target_path):
+            copy = self._copy_exe(source_path, target_path)
+        self._print_result(target_path)
+        with self.span("copy assets", target=self._project_dir):
+            assets = self._copy_assets()
+
+        return copy and assets
+
+    def sync_assets(self) -> bool:
+        """只同步外部资源到所有输出目录，不重新打包（用于监视模式下仅资源变化的情况）"""
+        self._get_path()
+
+        success = True
+        primary_dir = self._project_dir
+        for project_dir in [primary_dir, *self.extra_project_dirs]:
+            self._project_dir = project_dir
+            with self.span("copy assets", target=project_dir):
+                success = self._copy_assets() and success
+        self._project_dir = primary_dir
+
+        return success
 
     def build(self) -> bool:
         super().build()
@@ -363,48 +550,95 @@ class Builder(BaseBuilder):
 
         FolderStream(str(self._project_dir)).create()
 
-        try:
-            self._validate()
-            self._compile_sub_project()
-            self._build_sub_project()
-            self._start_build(self._get_cmd(python_path))
-
-            if self.onefile:
-                source_path = Path('dist') / f"{self.name}.exe"
-                target_path = self._project_dir / f"{self.name}.exe"
-            else:
-                source_path = Path('dist') / self.name
-                target_path = self._project_dir
+        with self.span("build"):
+            try:
+                with self.span("validate"):
+                    self._validate()
 
-            copy = self._copy_exe(source_path, target_path)
-            self._print_result(target_path)
-            assets = self._copy_assets()
+                with self.span("sub-projects", count=len(self.sub_project_src)):
+                    self._compile_sub_project()
+                    self._build_sub_project()
 
-            if self.onefile:
-                run_path = target_path
-            else:
-                run_path = target_path / f"{self.name}.exe"
+                work_cache = self._work_cache()
+                work_key = self._work_key(python_path)
+                dist_dir = work_cache.path(work_key) / "dist"
 
-            if not self._sub and self._auto_run:
-                print(f"\n🚀 正在启动应用程序...")
-                self._run_executable(run_path)
+                if self.onefile:
+                    source_path = dist_dir / f"{self.name}.exe"
+                else:
+                    source_path = dist_dir / self.name
 
-            return copy and assets
-        except subprocess.CalledProcessError as e:
-            print(f"\n❌ 打包失败! 错误代码: {e.returncode}", file=sys.stderr)
-            return False
-        except Exception as e:
-            print(f"\n❌ {str(e)}", file=sys.stderr)
-            return False
+                cmd = self._get_cmd(python_path)
+                manifest = BuildManifest(self, cmd, source_path)
+
+                with self.span("manifest"):
+                    up_to_date = not self.force and manifest.is_up_to_date()
+
+                if up_to_date:
+                    print(f"\n⏭️ 未检测到变更, 跳过打包: {self.name}")
+                    work_cache.touch(work_key, recount=False)
+                else:
+                    manifest.invalidate()
+                    # 先标记为使用中，避免并行的其他构建在打包期间把它淘汰
+                    work_cache.touch(work_key, recount=False, busy=True)
+                    # 在打包开始前记录输入，打包期间的修改会在下次构建时被检测到
+                    with self.span("manifest"):
+                        manifest.compute()
+                    start = time.perf_counter()
+                    with self.span("pyinstaller"):
+                        self._start_build(cmd)
+                    manifest.save(time.perf_counter() - start)
+
+                    work_cache.touch(work_key)
+                    for key in work_cache.evict(keep=[work_key]):
+                        print(f"🧹 淘汰 PyInstaller 缓存: {key}")
+
+                success = self._deliver(source_path)
+
+                # 共享子项目只打包一次，再复制到其他引用它的父项目中
+                primary_dir = self._project_dir
+                for project_dir in self.extra_project_dirs:
+                    self._project_dir = project_dir
+                    success = self._deliver(source_path) and success
+                self._project_dir = primary_dir
+
+                run_path = self._project_dir / f"{self.name}.exe"
+
+                if not self._sub and self._auto_run:
+                    print(f"\n🚀 正在启动应用程序...")
+                    with self.span("auto-run"):
+                        self._run_executable(run_path)
+
+                return success
+            except subprocess.CalledProcessError as e:
+                print(f"\n❌ 打包失败! 错误代码: {e.returncode}", file=sys.stderr)
+                return False
+            except Exception as e:
+                print(f"\n❌ {str(e)}", file=sys.stderr)
+                return False
 
     @staticmethod
-    def clean():
+    def clean(cache: bool = False):
         try:
             print(f"\n🧹 正在清理构建文件...")
-            shutil.rmtree(Builder().base_output_dir, ignore_errors=True)
+            base_output_dir = MPath_.cwd / "vebp-build"
+
+            if base_output_dir.is_dir():
+                for item in base_output_dir.iterdir():
+                    if item.name == ".cache" and not cache:
+                        continue
+                    if item.is_dir():
+                        shutil.rmtree(item, ignore_errors=True)
+                    else:
+                        os.remove(item)
+
             shutil.rmtree(MPath_.cwd / "build", ignore_errors=True)
             shutil.rmtree(MPath_.cwd / "dist", ignore_errors=True)
-            print(f"✅ 清理成功, 已删除'vebp-build', 'build', 'dist'")
+
+            if cache:
+                print(f"✅ 清理成功, 已删除'vebp-build'(包括缓存), 'build', 'dist'")
+            else:
+                print(f"✅ 清理成功, 已删除'vebp-build'(保留缓存), 'build', 'dist'")
         except Exception as e:
             print(f"\n❌ {str(e)}", file=sys.stderr)
 
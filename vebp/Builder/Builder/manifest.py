@@ -0,0 +1,306 @@
+import ast
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from vebp.Libs.File import FileStream, FolderStream
+from vebp.Libs.File.tree import iter_tree
+from vebp.Libs.venvs import get_venv_site_packages
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    """计算文件内容的 sha256"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _resolve_module(name: str, roots: list[Path]) -> list[Path]:
+    """在本地根目录中解析模块名，返回模块文件及其所属包的 __init__.py"""
+    parts = [p for p in name.split(".") if p]
+    if not parts:
+        return []
+
+    for root in roots:
+        base = root.joinpath(*parts)
+        found = []
+
+        if base.with_suffix(".py").is_file():
+            found.append(base.with_suffix(".py"))
+        elif (base / "__init__.py").is_file():
+            found.append(base / "__init__.py")
+        else:
+            continue
+
+        # 父包的 __init__.py 同样会被执行
+        for i in range(1, len(parts)):
+            init = root.joinpath(*parts[:i]) / "__init__.py"
+            if init.is_file():
+                found.append(init)
+
+        return found
+
+    return []
+
+
+# 进程内缓存，守护进程中跨构建复用: {路径: ((size, mtime), 结果)}
+_imports_cache: dict[str, tuple[tuple[int, int], list[tuple[str, Optional[Path]]]]] = {}
+_venv_cache: dict[str, tuple[int, str]] = {}
+
+
+def _imported_names(file_path: Path) -> list[tuple[str, Path]]:
+    """解析文件中的 import 语句，返回 (模块名, 搜索根目录) 列表，根目录为 None 表示使用全局根目录"""
+    key = str(file_path)
+    try:
+        st = os.stat(key)
+    except OSError:
+        return []
+
+    signature = (st.st_size, st.st_mtime_ns)
+    cached = _imports_cache.get(key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    try:
+        tree = ast.parse(Path(file_path).read_bytes(), filename=str(file_path))
+    except (SyntaxError, ValueError, OSError):
+        return []
+
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                names.append((alias.name, None))
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = file_path.parent
+                for _ in range(node.level - 1):
+                    base = base.parent
+            else:
+                base = None
+
+            module = node.module or ""
+            if module:
+                names.append((module, base))
+            for alias in node.names:
+                if alias.name != "*":
+                    names.append((f"{module}.{alias.name}" if module else alias.name, base))
+
+    _imports_cache[key] = (signature, names)
+    return names
+
+
+def collect_local_modules(script_path: Union[str, Path], roots: list[Union[str, Path]]) -> list[Path]:
+    """
+    收集入口脚本导入闭包中的本地模块
+
+    :param script_path: 入口脚本
+    :param roots: 本地模块搜索根目录
+    :return: 排序后的本地模块文件列表（包含入口脚本）
+    """
+    script_path = Path(script_path).resolve()
+    search_roots = []
+    for root in [script_path.parent, *roots]:
+        root = Path(root).resolve()
+        if root not in search_roots:
+            search_roots.append(root)
+
+    seen = {script_path}
+    pending = [script_path]
+
+    while pending:
+        current = pending.pop()
+        for name, base in _imported_names(current):
+            for module_file in _resolve_module(name, [base] if base else search_roots):
+                module_file = module_file.resolve()
+                if module_file not in seen:
+                    seen.add(module_file)
+                    pending.append(module_file)
+
+    return sorted(seen)
+
+
+class BuildManifest:
+    """
+    构建清单，记录影响 PyInstaller 输出的全部输入的哈希
+
+    清单匹配时可以跳过 PyInstaller 打包，只重新复制产物和外部资源。
+    """
+
+    VERSION = 1
+
+    def __init__(self, builder, cmd: list[str], output_path: Path) -> None:
+        """
+        :param builder: 构建器
+        :param cmd: 解析后的 PyInstaller 命令
+        :param output_path: PyInstaller 产物路径
+        """
+        self.builder = builder
+        self.cmd = cmd
+        self.output_path = Path(output_path)
+        self.path = self._path_for(builder)
+
+        self._previous = self._load()
+        self._files: dict[str, list] = {}
+        self._hashes: Optional[dict[str, str]] = None
+
+    @staticmethod
+    def _path_for(builder) -> Path:
+        return builder.cache_dir / "manifest" / f"{builder.name}.json"
+
+    @classmethod
+    def last_elapsed(cls, builder) -> Optional[float]:
+        """读取上次打包耗时，用于估计构建计划的关键路径"""
+        f = FileStream(cls._path_for(builder))
+        if not f.exists:
+            return None
+
+        try:
+            return f.read_json().get("elapsed")
+        except (ValueError, OSError):
+            return None
+
+    def _load(self) -> dict[str, Any]:
+        f = FileStream(self.path)
+        if not f.exists:
+            return {}
+
+        try:
+            data = f.read_json()
+        except (ValueError, OSError):
+            return {}
+
+        if data.get("version") != self.VERSION:
+            return {}
+        return data
+
+    def _file_hash(self, path: Path) -> str:
+        """带 (size, mtime_ns) 校验的文件哈希，未变化的文件复用上次的结果"""
+        key = str(path)
+        st = path.stat()
+        cached = self._previous.get("files", {}).get(key)
+
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            digest = cached[2]
+        else:
+            digest = hash_file(path)
+
+        self._files[key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def _hash_paths(self, paths: list[Path], base: Optional[Path] = None) -> str:
+        h = hashlib.sha256()
+        for path in paths:
+            name = path.relative_to(base) if base else path
+            h.update(f"{name.as_posix()}\0{self._file_hash(path)}\n".encode("utf-8"))
+        return h.hexdigest()
+
+    def _hash_script(self) -> str:
+        roots = [self.builder.base_path]
+        modules = collect_local_modules(self.builder.script_path, roots)
+        return self._hash_paths(modules)
+
+    def _hash_in_assets(self) -> str:
+        h = hashlib.sha256()
+
+        for target_relative in sorted(self.builder.in_assets):
+            for source in self.builder.in_assets[target_relative]:
+                skip, exclude = self.builder._asset_exclude(source)
+                if skip:
+                    continue
+
+                source = source.resolve()
+                h.update(f"{target_relative}\0{source.as_posix()}\n".encode("utf-8"))
+
+                if source.is_dir():
+                    files = sorted(Path(entry.path) for entry in iter_tree(source, exclude, with_stat=False))
+                    h.update(self._hash_paths(files, source).encode("ascii"))
+                elif source.is_file():
+                    h.update(self._file_hash(source).encode("ascii"))
+
+        return h.hexdigest()
+
+    def _hash_venv(self) -> str:
+        site_packages = get_venv_site_packages(self.builder.venv)
+        if not site_packages:
+            return hash_bytes(b"")
+
+        # 安装或卸载包会改变目录的 mtime
+        key = str(site_packages)
+        mtime = os.stat(key).st_mtime_ns
+        cached = _venv_cache.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        dists = sorted(item.name for item in os.scandir(site_packages)
+                       if item.name.endswith((".dist-info", ".egg-info")))
+        digest = hash_bytes("\n".join(dists).encode("utf-8"))
+        _venv_cache[key] = (mtime, digest)
+        return digest
+
+    def compute(self) -> dict[str, str]:
+        """计算各项输入的哈希（每个清单只计算一次）"""
+        if self._hashes is None:
+            self._hashes = {
+                "script": self._hash_script(),
+                "in_assets": self._hash_in_assets(),
+                "cmd": hash_bytes("\0".join(self.cmd).encode("utf-8")),
+                "venv": self._hash_venv(),
+            }
+        return self._hashes
+
+    def _output_stat(self) -> Optional[list[int]]:
+        if not self.output_path.exists():
+            return None
+
+        st = self.output_path.stat()
+        return [st.st_size, st.st_mtime_ns]
+
+    def is_up_to_date(self) -> bool:
+        """清单与当前输入一致且产物未被改动时返回 True"""
+        if not self._previous:
+            return False
+
+        output = self._output_stat()
+        if output is None or output != self._previous.get("output"):
+            return False
+
+        try:
+            hashes = self.compute()
+        except OSError:
+            return False
+
+        return hashes == self._previous.get("hashes")
+
+    def invalidate(self) -> None:
+        if self.path.exists():
+            os.remove(self.path)
+
+    def save(self, elapsed: Optional[float] = None) -> None:
+        """
+        在 PyInstaller 成功之后写入清单
+
+        只保存打包开始前 compute() 得到的哈希，打包期间对输入的修改不会被记为已构建。
+
+        :param elapsed: 本次打包耗时
+        """
+        hashes = self._hashes
+        if hashes is None:
+            raise RuntimeError("清单输入尚未计算, 需要在打包开始前调用 compute()")
+
+        FolderStream(self.path.parent).create()
+        FileStream(self.path).write_json({
+            "version": self.VERSION,
+            "name": self.builder.name,
+            "hashes": hashes,
+            "output": self._output_stat(),
+            "elapsed": elapsed,
+            "files": self._files,
+        })
@@ -0,0 +1,192 @@
+from pathlib import Path
+from typing import Optional
+
+from vebp.Builder.Builder.manifest import BuildManifest
+
+
+class BuildNode:
+    """构建图中的一个项目节点"""
+
+    def __init__(self, key: str, builder) -> None:
+        """
+        :param key: 项目目录的解析后路径，用于去重
+        :param builder: 项目构建器
+        """
+        self.key = key
+        self.builder = builder
+        # 依赖的子项目节点 key
+        self.deps: list[str] = []
+        # 引用该节点的 (父节点 key, 子项目目录名)
+        self.refs: list[tuple[str, str]] = []
+        # 输出目录，第一个为主输出目录
+        self.targets: list[Path] = []
+
+    @property
+    def name(self) -> str:
+        return self.builder.name
+
+    def __repr__(self) -> str:
+        return f"<BuildNode {self.name}: {self.key}>"
+
+
+class BuildPlan:
+    """
+    构建计划：预先加载整个 sub_project 树并生成有向无环图
+
+    共享的子项目只构建一次，再复制到每个引用它的父项目目录中。
+    """
+
+    def __init__(self, root) -> None:
+        """
+        :param root: 根项目构建器
+        """
+        self.root_key = self._key(root.base_path)
+        self.nodes: dict[str, BuildNode] = {}
+        self._load(root)
+        self.order = self._toposort()
+        self._assign_targets()
+        self._check_duplicates()
+
+    @staticmethod
+    def _key(folder) -> str:
+        return str(Path(folder).resolve())
+
+    def _load(self, root) -> None:
+        from vebp.Builder.Builder import Builder
+
+        self.nodes[self.root_key] = BuildNode(self.root_key, root)
+        pending = [self.root_key]
+
+        while pending:
+            node = self.nodes[pending.pop(0)]
+
+            for sub_key, folder in node.builder.sub_project_src.items():
+                key = self._key(folder)
+
+                if key not in self.nodes:
+                    builder = Builder.from_package(folder, sub_key, None, folder)
+                    if not builder:
+                        raise ValueError(f"子项目配置不存在: {folder}")
+
+                    builder.force = node.builder.force
+                    builder.jobs = node.builder.jobs
+                    self.nodes[key] = BuildNode(key, builder)
+                    pending.append(key)
+
+                if key not in node.deps:
+                    node.deps.append(key)
+                self.nodes[key].refs.append((node.key, sub_key))
+
+    def _toposort(self) -> list[str]:
+        """深度优先拓扑排序，依赖在前；发现环时抛出异常"""
+        order = []
+        state: dict[str, int] = {}
+        stack: list[str] = []
+
+        def visit(key: str) -> None:
+            if state.get(key) == 2:
+                return
+            if state.get(key) == 1:
+                cycle = stack[stack.index(key):] + [key]
+                names = " -> ".join(self.nodes[k].name or k for k in cycle)
+                raise ValueError(f"子项目存在循环依赖: {names}")
+
+            state[key] = 1
+            stack.append(key)
+            for dep in self.nodes[key].deps:
+                visit(dep)
+            stack.pop()
+            state[key] = 2
+            order.append(key)
+
+        visit(self.root_key)
+        return order
+
+    def _assign_targets(self) -> None:
+        root = self.nodes[self.root_key]
+        root.builder._get_path()
+        root.targets = [root.builder.project_dir]
+
+        # 父节点总在子节点之后，逆序遍历保证父节点的输出目录已确定
+        for key in reversed(self.order):
+            node = self.nodes[key]
+            if key == self.root_key:
+                continue
+
+            for parent_key, sub_key in node.refs:
+                for parent_dir in self.nodes[parent_key].targets:
+                    target = parent_dir / sub_key
+                    if target not in node.targets:
+                        node.targets.append(target)
+
+            node.builder._parent_path = node.targets[0].parent
+            node.builder._sub = node.targets[0].name
+            node.builder.extra_project_dirs = node.targets[1:]
+            node.builder.planned = True
+
+    def _check_duplicates(self) -> None:
+        names: dict[str, BuildNode] = {}
+        targets: dict[Path, BuildNode] = {}
+
+        for key in self.order:
+            node = self.nodes[key]
+
+            other = names.setdefault(node.name, node)
+            if other is not node:
+                raise ValueError(f"重复的构建目标 '{node.name}': {other.key} 与 {node.key}")
+
+            for target in node.targets:
+                other = targets.setdefault(target, node)
+                if other is not node:
+                    raise ValueError(f"重复的输出目录 {target}: {other.name} 与 {node.name}")
+
+    @property
+    def sub_nodes(self) -> list[BuildNode]:
+        """除根项目外按拓扑顺序排列的节点"""
+        return [self.nodes[key] for key in self.order if key != self.root_key]
+
+    def estimate(self, node: BuildNode) -> Optional[float]:
+        """根据上次构建清单估计节点的打包耗时"""
+        return BuildManifest.last_elapsed(node.builder)
+
+    def critical_path(self) -> tuple[list[BuildNode], float]:
+        """
+        计算关键路径（耗时最长的依赖链）
+
+        :return: (从叶子到根的节点列表, 估计总耗时)，未知耗时按 1 秒计
+        """
+        best: dict[str, tuple[float, Optional[str]]] = {}
+
+        for key in self.order:
+            node = self.nodes[key]
+            cost = self.estimate(node) or 1.0
+            prev = max(node.deps, key=lambda d: best[d][0], default=None)
+            best[key] = (cost + (best[prev][0] if prev else 0.0), prev)
+
+        path = []
+        key = self.root_key
+        while key:
+            path.append(self.nodes[key])
+            key = best[key][1]
+
+        return list(reversed(path)), best[self.root_key][0]
+
+    def show(self) -> None:
+        print(f"\n📋 构建计划: {len(self.nodes)} 个项目")
+
+        for key in self.order:
+            node = self.nodes[key]
+            deps = ", ".join(self.nodes[d].name for d in node.deps)
+            elapsed = self.estimate(node)
+            cost = f"~{elapsed:.1f}s" if elapsed is not None else "~?"
+
+            print(f"  🔹 {node.name} ({cost})")
+            print(f"     📂 {node.key}")
+            if deps:
+                print(f"     ⬅️ 依赖: {deps}")
+            for target in node.targets:
+                print(f"     ➡️ {target}")
+
+        path, total = self.critical_path()
+        print(f"\n🔥 关键路径 (~{total:.1f}s): {' -> '.join(node.name for node in path)}")
+
@@ -0,0 +1,167 @@
+import json
+import re
+import shutil
+import subprocess
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+# PyInstaller 日志中标志各阶段开始的行
+PHASE_PATTERNS = (
+    ("analysis", re.compile(r"INFO: (Running Analysis|Analyzing |Initializing module dependency graph)")),
+    ("PYZ", re.compile(r"INFO: Building PYZ")),
+    ("PKG", re.compile(r"INFO: Building PKG")),
+    ("EXE", re.compile(r"INFO: Building EXE")),
+    ("COLLECT", re.compile(r"INFO: Building COLLECT")),
+)
+PHASES = ("startup",) + tuple(name for name, _ in PHASE_PATTERNS)
+
+
+class PyInstallerProgress:
+    """
+    解析 PyInstaller 输出，记录每个阶段的耗时
+
+    终端中显示一行实时进度；输出被重定向时（如子项目构建带前缀输出）每进入一个阶段打印一行。
+    最近的日志保存在有上限的环形缓冲区中，打包失败时打印末尾部分。
+    """
+
+    def __init__(self, name: str, max_lines: int = 500) -> None:
+        """
+        :param name: 项目名称
+        :param max_lines: 环形缓冲区保留的日志行数
+        """
+        self.name = name
+        self.lines: deque[str] = deque(maxlen=max_lines)
+        self.phases: dict[str, float] = {}
+        self.phase: Optional[str] = None
+        self.returncode: Optional[int] = None
+
+        self._start = time.perf_counter()
+        self._phase_start = self._start
+        self._live = sys.stdout.isatty()
+        self._width = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._start
+
+    def _enter(self, phase: str) -> None:
+        now = time.perf_counter()
+        if self.phase is not None:
+            self.phases[self.phase] = self.phases.get(self.phase, 0.0) + now - self._phase_start
+
+        self.phase = phase
+        self._phase_start = now
+
+        if not self._live:
+            print(f"  ▶️ {phase} ({now - self._start:.1f}s)")
+
+    def feed(self, line: str) -> None:
+        """处理一行 PyInstaller 输出"""
+        line = line.rstrip("\r\n")
+        self.lines.append(line)
+
+        if self.phase is None:
+            self._enter("startup")
+
+        for phase, pattern in PHASE_PATTERNS:
+            if phase != self.phase and pattern.search(line):
+                self._enter(phase)
+                break
+
+        if self._live:
+            columns = shutil.get_terminal_size((100, 20)).columns
+            status = f"  ⏳ [{self.phase}] {self.elapsed:6.1f}s  {line.strip()}"[:max(20, columns - 1)]
+            sys.stdout.write("\r" + status.ljust(self._width))
+            sys.stdout.flush()
+            self._width = len(status)
+
+    def finish(self, returncode: int) -> None:
+        """结束计时，returncode 为 PyInstaller 的退出码"""
+        if self.phase is not None:
+            self.phases[self.phase] = self.phases.get(self.phase, 0.0) + time.perf_counter() - self._phase_start
+            self.phase = None
+        self.returncode = returncode
+
+        if self._live and self._width:
+            sys.stdout.write("\r" + " " * self._width + "\r")
+            sys.stdout.flush()
+
+    def print_summary(self) -> None:
+        total = sum(self.phases.values())
+        parts = [f"{phase} {self.phases[phase]:.1f}s" for phase in PHASES if phase in self.phases]
+        print(f"  ⏱️ 打包耗时 {total:.1f}s: {', '.join(parts) or '-'}")
+
+    def print_tail(self, count: int = 40) -> None:
+        """打包失败时打印日志末尾"""
+        tail = list(self.lines)[-count:]
+        if not tail:
+            return
+
+        print(f"\n📜 PyInstaller 输出 (最后 {len(tail)} 行):", file=sys.stderr)
+        for line in tail:
+            print(f"  {line}", file=sys.stderr)
+
+    def save(self, path: Path, cmd: list[str]) -> None:
+        """把各阶段耗时写入 JSON 报告"""
+        report = {
+            "name": self.name,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "returncode": self.returncode,
+            "elapsed": round(sum(self.phases.values()), 3),
+            "phases": {phase: round(self.phases[phase], 3) for phase in PHASES if phase in self.phases},
+            "command": cmd,
+        }
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=4, ensure_ascii=False), encoding="utf-8")
+        except OSError as e:
+            print(f"  ⚠️ 写入打包耗时报告失败: {str(e)}", file=sys.stderr)
+
+
+def run_pyinstaller(cmd: list[str], name: str, report_path: Optional[Path] = None) -> PyInstallerProgress:
+    """
+    运行 PyInstaller 并流式解析输出
+
+    :param cmd: PyInstaller 命令
+    :param name: 项目名称
+    :param report_path: 耗时报告路径
+    :raises subprocess.CalledProcessError: PyInstaller 返回非零退出码
+    """
+    progress = PyInstallerProgress(name)
+
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        stdin=subprocess.DEVNULL,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1,
+    )
+
+    try:
+        for line in process.stdout:
+            progress.feed(line)
+    except BaseException:
+        # 被中断 (如守护进程的客户端断开) 时结束 PyInstaller，不等待它完成
+        process.kill()
+        raise
+    finally:
+        process.stdout.close()
+        returncode = process.wait()
+
+    progress.finish(returncode)
+    if report_path is not None:
+        progress.save(report_path, cmd)
+
+    if returncode != 0:
+        progress.print_tail()
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+    progress.print_summary()
+    return progress
@@ -0,0 +1,186 @@
+import contextlib
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Optional, TextIO
+
+from vebp.Trace.globals import get_tracer
+
+
+class PrefixedStream:
+    """按行为输出添加前缀的文本流包装器"""
+
+    def __init__(self, stream: TextIO, prefix: str) -> None:
+        self._stream = stream
+        self._prefix = prefix
+        self._buffer = ""
+
+    def write(self, data: str) -> int:
+        self._buffer += data
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            self._stream.write(f"{self._prefix}{line}\n")
+        self._stream.flush()
+        return len(data)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._stream.write(f"{self._prefix}{self._buffer}")
+            self._buffer = ""
+        self._stream.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+    @property
+    def encoding(self) -> str:
+        return getattr(self._stream, "encoding", "utf-8")
+
+
+@dataclass
+class BuildResult:
+    name: str
+    success: bool
+    elapsed: float
+    error: Optional[str] = None
+    # 在进程池中构建时记录的追踪事件，由主进程合并
+    events: Optional[list[dict[str, Any]]] = None
+
+
+def run_build(builder) -> BuildResult:
+    """执行单个构建器，输出加上项目名前缀并记录耗时"""
+    name = builder.name
+    out = PrefixedStream(sys.stdout, f"[{name}] ")
+    err = PrefixedStream(sys.stderr, f"[{name}] ")
+
+    tracer = get_tracer()
+    mark = tracer.mark()
+    start = time.perf_counter()
+    error = None
+
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        try:
+            success = bool(builder.build())
+        except Exception as e:
+            success = False
+            error = str(e)
+        finally:
+            out.flush()
+            err.flush()
+
+    # 子进程中 fork 得到的追踪器副本记录的事件需要传回主进程
+    events = tracer.since(mark) if tracer.enabled and os.getpid() != tracer.pid else None
+    return BuildResult(name, success, time.perf_counter() - start, error, events)
+
+
+def validate_jobs(jobs) -> int:
+    """校验并发数，必须是非负整数 (0 表示使用 CPU 核心数)"""
+    if isinstance(jobs, bool) or not isinstance(jobs, int) or jobs < 0:
+        raise ValueError(f"无效的并发数: {jobs!r} (需要非负整数, 0 表示使用 CPU 核心数)")
+    return jobs
+
+
+def resolve_jobs(jobs) -> int:
+    """解析并发数，0 表示使用 CPU 核心数"""
+    jobs = validate_jobs(jobs)
+    if jobs == 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+class SubProjectScheduler:
+    """子项目构建调度器，使用进程池按依赖关系并发构建子项目"""
+
+    def __init__(self, jobs: int = 1) -> None:
+        """
+        :param jobs: 最大并发构建数
+        """
+        self.jobs = resolve_jobs(jobs)
+
+    def run(self, builders: list, deps: Optional[dict[int, list[int]]] = None) -> list[BuildResult]:
+        """
+        构建全部子项目，依赖完成后才会开始构建
+
+        :param builders: 按拓扑顺序排列的构建器列表
+        :param deps: 构建器下标到其依赖下标列表的映射
+        :return: 按输入顺序排列的构建结果
+        """
+        if not builders:
+            return []
+
+        deps = deps or {}
+        jobs = min(self.jobs, len(builders))
+        print(f"\n🧵 构建 {len(builders)} 个子项目 (并发数: {jobs})")
+
+        results: dict[int, BuildResult] = {}
+
+        def blocked(i: int) -> Optional[str]:
+            failed = [builders[d].name for d in deps.get(i, []) if not results[d].success]
+            return f"依赖构建失败: {', '.join(failed)}" if failed else None
+
+        if jobs <= 1:
+            for i, builder in enumerate(builders):
+                reason = blocked(i)
+                results[i] = BuildResult(builder.name, False, 0.0, reason) if reason else run_build(builder)
+            return [results[i] for i in range(len(builders))]
+
+        waiting = set(range(len(builders)))
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            try:
+                self._schedule(executor, builders, deps, waiting, results, blocked)
+            except BaseException:
+                # 被中断时不等待正在进行的构建: 取消排队的任务并结束工作进程
+                executor.shutdown(wait=False, cancel_futures=True)
+                for process in list(getattr(executor, "_processes", {}).values()):
+                    process.terminate()
+                raise
+
+        return [results[i] for i in range(len(builders))]
+
+    @staticmethod
+    def _schedule(executor: ProcessPoolExecutor, builders: list, deps: dict[int, list[int]],
+                  waiting: set[int], results: dict[int, BuildResult], blocked) -> None:
+        """依赖完成后提交构建，直到全部子项目都有结果"""
+        running: dict[Future, int] = {}
+
+        while waiting or running:
+            for i in sorted(waiting):
+                if any(d not in results for d in deps.get(i, [])):
+                    continue
+
+                waiting.discard(i)
+                reason = blocked(i)
+                if reason:
+                    results[i] = BuildResult(builders[i].name, False, 0.0, reason)
+                else:
+                    running[executor.submit(run_build, builders[i])] = i
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                try:
+                    results[i] = future.result()
+                    get_tracer().merge(results[i].events)
+                except Exception as e:
+                    results[i] = BuildResult(builders[i].name, False, 0.0, str(e))
+
+    @staticmethod
+    def report(results: list[BuildResult]) -> bool:
+        """打印每个子项目的耗时和结果，全部成功时返回 True"""
+        if not results:
+            return True
+
+        print("\n⏱️ 子项目构建耗时:")
+        for result in results:
+            if result.success:
+                print(f"  ✅ {result.name}: {result.elapsed:.2f}s")
+            else:
+                reason = f" ({result.error})" if result.error else ""
+                print(f"  ❌ {result.name}: {result.elapsed:.2f}s{reason}", file=sys.stderr)
+
+        return all(result.success for result in results)
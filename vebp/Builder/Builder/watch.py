@@ -0,0 +1,173 @@
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from vebp.Builder.Builder.manifest import collect_local_modules
+from vebp.Data.BuildConfig import BuildConfig
+from vebp.Data.Config import Config
+from vebp.Data.Package import Package
+from vebp.Libs.File.path import MPath_
+from vebp.Libs.File.watch import create_watcher, wait_for_changes
+
+# 变化类型，按影响范围从小到大排列
+ASSETS = 1
+CODE = 2
+CONFIG = 3
+
+
+class WatchTargets:
+    """一次构建需要监视的文件及其变化类型"""
+
+    def __init__(self) -> None:
+        self.files: dict[Path, int] = {}
+        self.trees: dict[Path, int] = {}
+
+    def add_file(self, path: Path, kind: int) -> None:
+        path = Path(path).resolve()
+        self.files[path] = max(kind, self.files.get(path, 0))
+
+    def add_source(self, path: Path, kind: int) -> None:
+        path = Path(path).resolve()
+        if path.is_dir():
+            self.trees[path] = max(kind, self.trees.get(path, 0))
+        else:
+            self.add_file(path, kind)
+
+    def classify(self, changed: set[Path]) -> int:
+        """
+        :param changed: 发生变化的路径
+        :return: 影响最大的变化类型，没有相关变化时返回 0
+        """
+        output_dir = (MPath_.cwd / "vebp-build").resolve()
+        kind = 0
+
+        for path in changed:
+            path = Path(path).resolve()
+            if path == output_dir or output_dir in path.parents or "__pycache__" in path.parts:
+                continue
+
+            kind = max(kind, self.files.get(path, 0))
+            for root, root_kind in self.trees.items():
+                if path == root or root in path.parents:
+                    kind = max(kind, root_kind)
+
+        return kind
+
+
+class BuildWatch:
+    """
+    监视模式：文件变化后自动增量构建
+
+    - vebp-config.json / vebp-build.json / vebp-package.json 变化: 重新读取配置并构建
+    - 入口脚本导入闭包中的本地模块或内部资源变化: 重新构建（由构建清单决定是否调用 PyInstaller）
+    - 只有根项目的外部资源变化: 只同步外部资源
+    """
+
+    def __init__(self, factory: Callable[[], object], debounce: float = 0.3, polling: bool = False) -> None:
+        """
+        :param factory: 创建根项目构建器的函数，配置变化后会重新调用
+        :param debounce: 合并连续变化的静默时间（秒）
+        :param polling: 强制使用轮询代替 inotify
+        """
+        self.factory = factory
+        self.debounce = debounce
+        self.watcher = create_watcher(polling)
+
+    def _create(self):
+        try:
+            builder = self.factory()
+        except Exception as e:
+            print(f"\n❌ 读取构建配置失败: {str(e)}", file=sys.stderr)
+            return None
+
+        # 监视模式下每次构建都启动程序会打断编辑
+        builder.auto_run = False
+        return builder
+
+    @staticmethod
+    def _targets(builder) -> WatchTargets:
+        targets = WatchTargets()
+        targets.add_file(MPath_.cwd / Config.FILENAME, CONFIG)
+
+        try:
+            nodes = builder.plan().nodes.values()
+        except Exception as e:
+            print(f"⚠️ 加载子项目失败, 只监视根项目: {str(e)}", file=sys.stderr)
+            nodes = []
+
+        for node_builder in [builder] + [node.builder for node in nodes if node.builder is not builder]:
+            folder = node_builder.base_path
+            targets.add_file(folder / BuildConfig.FILENAME, CONFIG)
+            targets.add_file(folder / Package.FILENAME, CONFIG)
+
+            script = node_builder.script_path
+            if script and script.is_file():
+                for module in collect_local_modules(script, [folder]):
+                    targets.add_file(module, CODE)
+
+            for sources in node_builder.in_assets.values():
+                for source in sources:
+                    targets.add_source(source, CODE)
+
+            # 子项目的外部资源随子项目一起交付，交给完整构建处理
+            asset_kind = ASSETS if node_builder is builder else CODE
+            for sources in node_builder.assets.values():
+                for source in sources:
+                    targets.add_source(source, asset_kind)
+
+        return targets
+
+    @staticmethod
+    def _report(success: bool, start: float) -> None:
+        elapsed = time.perf_counter() - start
+        if success:
+            print(f"✅ 构建成功! ({elapsed:.2f}s)")
+        else:
+            print(f"❌ 构建失败! ({elapsed:.2f}s) 请检查错误信息", file=sys.stderr)
+
+    def run(self) -> None:
+        print("👀 监视模式已启动 (自动运行已关闭, Ctrl+C 退出)")
+        builder = self._create()
+        kind = CONFIG
+
+        try:
+            while True:
+                if builder is not None:
+                    targets = self._targets(builder)
+                else:
+                    # 配置无效时只等待配置文件变化
+                    targets = WatchTargets()
+                    for path in (Config.FILENAME, BuildConfig.FILENAME, Package.FILENAME):
+                        targets.add_file(MPath_.cwd / path, CONFIG)
+
+                self.watcher.watch(targets.files, targets.trees)
+
+                if builder is not None:
+                    start = time.perf_counter()
+                    if kind == ASSETS:
+                        print("\n📦 仅外部资源变化, 跳过打包")
+                        self._report(builder.sync_assets(), start)
+                    else:
+                        print("\n🔨 开始构建...")
+                        self._report(builder.build(), start)
+
+                print(f"\n👀 等待文件变化... ({len(targets.files)} 个文件, {len(targets.trees)} 个目录)")
+                while True:
+                    kind = targets.classify(wait_for_changes(self.watcher, self.debounce))
+                    if kind:
+                        break
+
+                if kind == CONFIG:
+                    print("\n🔄 配置文件变化, 重新加载构建配置")
+                elif kind == CODE:
+                    print("\n🔄 代码或内部资源变化")
+
+                # 完整构建需要新的构建器（构建计划和子项目状态在构建后不可复用）
+                if kind != ASSETS or builder is None:
+                    builder = self._create()
+        except KeyboardInterrupt:
+            print("\n👋 已停止监视")
+        finally:
+            self.watcher.close()
+
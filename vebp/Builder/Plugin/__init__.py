@@ -1,24 +1,47 @@
-﻿import json
+﻿import hashlib
+import json
+import os
+import re
 import shutil
-import subprocess
 import zipfile
 from pathlib import Path
-from typing import Optional
+from typing import Any, ContextManager, Optional
 
 from vebp.Data.Package import Package
+from vebp.Data.globals import get_config
 from vebp.Libs.File import FileStream, FolderStream
+from vebp.Libs.File.cache import CacheDir
+from vebp.Libs.File.ignore import IgnoreSpec
 from vebp.Libs.File.path import MPath_
-from vebp.Libs.venvs import get_venv_python
+from vebp.Libs.File.zip import ZipStreamWriter
+from vebp.Libs.metadata import SiteIndex, normalize_name, parse_requirement
+from vebp.Libs.venvs import get_venv_python, get_venv_site_packages, query_site_packages
+from vebp.Plugin.store import LOCK_FILENAME, LOCK_VERSION
+from vebp.Trace.globals import get_tracer
+
+
+# 打包插件时默认排除的文件，可以在 .vebpignore 或 vebp-plugin.json 的 exclude 中用 ! 重新包含
+PLUGIN_DEFAULT_EXCLUDE = [
+    ".*",
+    "*.pyc", "*.pyo", "*.pyd", "*.log", "*.tmp", "*.bak",
+    "__pycache__", "node_modules", "dist", "build",
+]
+
+# 指纹算法或归档格式变化时递增，使旧的归档失效
+FINGERPRINT_VERSION = 3
+FINGERPRINT_PREFIX = b"vebp-fingerprint:"
 
 
 class PluginBuilder:
     """插件构建器，专门用于将插件目录打包为 ZIP 格式"""
 
-    def __init__(self, plugin_dir: str) -> None:
+    def __init__(self, plugin_dir: str, compress_level: Optional[int] = None, force: bool = False) -> None:
         """
         初始化插件构建器
 
         :param plugin_dir: 插件目录路径
+        :param compress_level: 压缩级别 (0-9)，默认读取 vebp-config.json 的 zip.level
+        :param force: 忽略指纹，强制重新打包
         """
         self.plugin_path = Path(plugin_dir).resolve()
         if not self.plugin_path.exists():
@@ -30,14 +53,33 @@ class PluginBuilder:
         self.meta = self._load_plugin_meta()
         self.plugin_name = self.meta["namespace"]
 
+        self.compress_level = compress_level if compress_level is not None else get_config().get("zip", 6, "level")
+        self.force = force
+        self._site_index: Optional[SiteIndex] = None
+        self._requirements: list[tuple[str, str]] = []
+        self._content_hashes: dict[str, str] = {}
+
         # 设置输出目录
         self.output_dir = MPath_.cwd / "vebp-build"
         FolderStream(self.output_dir).create()
 
+        self.ignore = self._load_ignore()
+
         print(f"🔍 找到插件: {self.plugin_name}")
         print(f"📂 插件目录: {self.plugin_path}")
         print(f"📦 输出目录: {self.output_dir}")
 
+    def span(self, name: str, cat: str = "plugin-build", **args: Any) -> ContextManager[None]:
+        """
+        记录插件构建步骤的耗时（启用 --trace 时写入追踪文件）
+
+        :param name: 步骤名称
+        :param cat: 分类
+        :param args: 附加信息，默认带上插件命名空间
+        """
+        args.setdefault("plugin", self.plugin_name)
+        return get_tracer().span(name, cat, **args)
+
     def _load_plugin_meta(self) -> dict:
         """加载插件元数据文件"""
         meta_file_path = self.plugin_path / "vebp-plugin.json"
@@ -73,228 +115,350 @@ class PluginBuilder:
 
         return True
 
-    def _resolve_dependencies(self) -> dict[str, Path]:
-        """解析插件依赖，返回依赖包名到安装路径的映射"""
+    def _resolve_dependencies(self) -> dict[str, dict[str, Any]]:
+        """解析插件依赖及其传递依赖，返回包名到分发包记录的映射"""
         # 1. 检查是否有 requirements.txt
         req_file = self.plugin_path / "requirements.txt"
         if not req_file.exists():
             print("📝 未找到 requirements.txt，跳过依赖解析")
             return {}
 
-        # 2. 读取依赖列表
+        # 2. 读取依赖列表及版本约束
         dependencies = []
         with open(req_file, "r") as f:
             for line in f:
-                line = line.strip()
-                if line and not line.startswith("#") and "vebp" not in line.lower():
-                    dependencies.append(line.split("==")[0].strip())
+                requirement = parse_requirement(line)
+                if requirement and "vebp" not in requirement[0].lower():
+                    dependencies.append(requirement[:2])
 
         if not dependencies:
             print("📝 未找到有效依赖")
             return {}
 
-        print(f"🔍 发现依赖: {', '.join(dependencies)}")
+        self._requirements = dependencies
+        print(f"🔍 发现依赖: {', '.join(name + spec for name, spec in dependencies)}")
 
-        # 3. 获取当前环境的 site-packages 路径
-        site_packages = self._get_site_packages_path()
-        if not site_packages:
+        # 3. 获取当前环境的 site-packages 索引
+        index = self._get_site_index()
+        if index is None:
             print("⚠️ 无法定位 site-packages 目录")
             return {}
 
-        # 4. 收集依赖包路径
+        # 4. 沿 Requires-Dist 收集依赖闭包
+        records, missing, unsatisfied = index.closure(dependencies)
         dep_map = {}
-        for dep in dependencies:
-            dep_path = self._find_dependency_path(site_packages, dep)
-            if dep_path:
-                dep_map[dep] = dep_path
-                print(f"  ✅ 定位依赖: {dep} -> {dep_path}")
+        for record in records:
+            if normalize_name(record["name"]) == "vebp":
+                continue
+            dep_map[record["name"]] = record
+            print(f"  ✅ 定位依赖: {record['name']} {record['version']} -> {', '.join(record['top_level'])}")
+
+        for dep in missing:
+            record = self._find_bare_package(index.site_packages, dep)
+            if record:
+                dep_map[dep] = record
+                print(f"  ✅ 定位依赖: {dep} -> {index.site_packages / dep} (无安装元数据)")
             else:
                 print(f"  ⚠️ 未找到依赖: {dep}")
 
+        for parent, name, version, spec in unsatisfied:
+            print(f"  ⚠️ 已安装的 {name} {version} 不满足 {parent or 'requirements.txt'} 的约束 {spec}")
+
         return dep_map
 
+    def _write_lock(self, dep_map: dict[str, dict[str, Any]]) -> Path:
+        """
+        记录解析结果: 每个依赖的版本、顶层模块、依赖关系以及是否为直接依赖
+
+        插件管理器按锁文件中的版本在插件之间共享同一份依赖。
+
+        :return: 锁文件路径 (vebp-build/<namespace>.lock.json)
+        """
+        direct = {normalize_name(name) for name, _ in self._requirements}
+        names = {normalize_name(name): name for name in dep_map}
+
+        packages = {}
+        for name, record in sorted(dep_map.items()):
+            requires = sorted({names[normalize_name(dep)] for dep, _ in SiteIndex.requirements(record)
+                               if normalize_name(dep) in names})
+            packages[name] = {
+                "version": self._dependency_version(record),
+                "top_level": record["top_level"],
+                "requires": requires,
+                "direct": normalize_name(name) in direct,
+            }
+
+        lock_path = self.output_dir / f"{self.plugin_name}.lock.json"
+        FileStream(lock_path).write_json({
+            "version": LOCK_VERSION,
+            "requirements": [name + spec for name, spec in self._requirements],
+            "packages": packages,
+        })
+        return lock_path
+
     def _get_site_packages_path(self) -> Optional[Path]:
-        """获取当前环境的 site-packages 路径"""
+        """获取插件虚拟环境的 site-packages 路径，按目录结构查找，找不到时才启动解释器查询"""
+        venv = Package(self.plugin_path / Package.FILENAME).get("venv", ".venv")
+        site_packages = get_venv_site_packages(venv)
+        if site_packages:
+            return site_packages
+
         try:
-            # 使用 Python 命令获取 site-packages 路径
-            result = subprocess.run(
-                [get_venv_python(Package(self.plugin_path / Package.FILENAME).get("venv", ".venv")), "-c", "import site; print(site.getsitepackages()[1])"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return Path(result.stdout.strip())
+            return query_site_packages(get_venv_python(venv))
         except Exception as e:
             print(f"⚠️ 获取 site-packages 失败: {str(e)}")
             return None
 
-    @staticmethod
-    def _find_dependency_path(site_packages: Path, package_name: str) -> Optional[Path]:
-        """在 site-packages 中查找依赖包路径"""
-        # 尝试直接匹配包名目录
-        package_dir = site_packages / package_name
-        if package_dir.exists() and package_dir.is_dir():
-            return package_dir
-
-        # 尝试匹配带下划线的包名（如 PyYAML -> _yaml）
-        underscore_name = f"_{package_name.replace('-', '_')}"
-        underscore_dir = site_packages / underscore_name
-        if underscore_dir.exists() and underscore_dir.is_dir():
-            return underscore_dir
-
-        # 尝试匹配 dist-info 获取真实包名
-        for item in site_packages.iterdir():
-            if item.name.startswith(f"{package_name}-") and item.name.endswith(".dist-info"):
-                # 从 dist-info 获取真实包名
-                top_level = item / "top_level.txt"
-                if top_level.exists():
-                    with open(top_level, "r") as f:
-                        real_name = f.readline().strip()
-                    real_dir = site_packages / real_name
-                    if real_dir.exists():
-                        return real_dir
-                    # 尝试带下划线版本
-                    underscore_real = site_packages / f"_{real_name}"
-                    if underscore_real.exists():
-                        return underscore_real
+    def _get_site_index(self) -> Optional[SiteIndex]:
+        """获取 site-packages 元数据索引，缓存在 vebp-build/.cache/site-packages/ 下"""
+        if self._site_index is None:
+            site_packages = self._get_site_packages_path()
+            if site_packages:
+                with self.span("site index", site_packages=site_packages):
+                    self._site_index = SiteIndex.for_site(site_packages, self.output_dir / ".cache" / "site-packages")
+        return self._site_index
 
+    @staticmethod
+    def _find_bare_package(site_packages: Path, package_name: str) -> Optional[dict[str, Any]]:
+        """没有 dist-info 的包：直接按目录名查找，生成与索引相同格式的记录"""
+        for name in (package_name, package_name.replace("-", "_"), f"_{package_name.replace('-', '_')}"):
+            package_dir = site_packages / name
+            if package_dir.is_dir():
+                return {"name": package_name, "version": "", "top_level": [name],
+                        "files": SiteIndex.module_files(site_packages, [name]), "requires": []}
         return None
 
-    @staticmethod
-    def _copy_dependencies(target_dir: Path, dep_map: dict[str, Path]):
-        """复制依赖到 dependencies 文件夹"""
-        deps_dir = target_dir / "dependencies"
-        FolderStream(deps_dir).create()
-
-        for package_name, source_path in dep_map.items():
-            # 复制整个包目录
-            dest_path = deps_dir / package_name
-            shutil.copytree(
-                source_path,
-                dest_path,
-                ignore=shutil.ignore_patterns(
-                    '__pycache__', '*.pyc', '*.pyo', '*.pyd', '*.egg-info'
-                )
-            )
-            print(f"  📦 复制依赖: {package_name}")
-
-    def _copy_plugin_files(self, target_dir: Path):
-        """复制插件文件到目标目录，排除不需要的文件"""
-        print(f"📦 准备插件文件...")
-
-        # 使用 FolderStream 遍历插件目录
-        plugin_folder = FolderStream(self.plugin_path)
-        self._copy_folder_contents(plugin_folder, target_dir)
+    def _dependency_files(self, record: dict[str, Any]) -> list[tuple[Path, str]]:
+        """
+        按 RECORD 中的文件列表收集依赖文件，跳过字节码和 egg-info
 
-    def _copy_folder_contents(self, source_folder: FolderStream, target_dir: Path):
-        """递归复制文件夹内容"""
-        dir_info = source_folder.walk()
-        if dir_info is None:
-            return
+        :return: [(源文件, 相对 site-packages 的路径)]，按路径排序
+        """
+        ignore = shutil.ignore_patterns('__pycache__', '*.pyc', '*.pyo', '*.pyd', '*.egg-info')
+        site_packages = self._site_index.site_packages
+        files = []
 
-        # 处理当前目录的文件
-        for file in dir_info.files:
-            file_path = Path(file.path)
-            if self._should_exclude(file_path):
+        for rel in sorted(record["files"]):
+            if ignore(None, rel.split("/")):
                 continue
+            file_path = site_packages / rel
+            if file_path.is_file():
+                files.append((file_path, rel))
 
-            # 计算相对路径和目标路径
-            rel_path = file_path.relative_to(self.plugin_path)
-            dest_path = target_dir / rel_path
+        return files
 
-            # 确保目标目录存在
-            FolderStream(dest_path.parent).create()
+    def _dependency_cache(self) -> CacheDir:
+        """依赖包缓存，容量由 vebp-config.json 的 dependencyCache.maxSize (MB) 决定"""
+        max_size = get_config().get("dependencyCache", 1024, "maxSize")
+        return CacheDir(self.output_dir / ".cache" / "dependencies", max_size * 1024 * 1024 if max_size else None)
 
-            # 复制文件
-            FileStream.copy(str(file_path), str(dest_path))
-            print(f"  ➕ 添加: {rel_path}")
+    def _bundle_key(self, name: str, record: dict[str, Any]) -> str:
+        """缓存条目名: 包名、版本、RECORD 哈希 (没有 RECORD 时为内容哈希) 和压缩级别"""
+        content = record.get("record_hash") or self._content_hash(record)
+        version = re.sub(r"[^A-Za-z0-9.+_-]", "_", record["version"] or "local")
+        return f"{normalize_name(name)}-{version}-{content[:16]}-z{self.compress_level}"
 
-        # 递归处理子目录
-        for sub_folder in dir_info.folders:
-            folder_path = Path(sub_folder.path)
-            if self._should_exclude(folder_path):
-                continue
+    def _dependency_bundles(self, dep_map: dict[str, dict[str, Any]]) -> list[tuple[str, Path]]:
+        """
+        获取每个依赖压缩好的 zip 包，没有缓存时按 RECORD 打包一次
 
-            # 复制子目录内容
-            self._copy_folder_contents(sub_folder, target_dir)
+        依赖包以 (包名, 版本, RECORD 哈希) 为键缓存在 vebp-build/.cache/dependencies/ 下，
+        所有插件共用；打包插件时直接复制其中已压缩的数据，无需再读取 site-packages 和重新压缩。
+        归档内保留文件在 site-packages 中的相对路径，dependencies/<包名> 加入 sys.path 后即可按原模块名导入。
 
-    def _create_zip_archive(self, source_dir: Path, zip_path: Path):
-        """从源目录创建 ZIP 文件"""
-        print(f"📦 创建 ZIP 包: {zip_path.name}")
+        :return: [(归档内前缀 dependencies/<包名>/, 依赖 zip 包)]
+        """
+        cache = self._dependency_cache()
+        bundles = []
+        keys = []
 
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # 使用 FolderStream 遍历源目录
-            source_folder = FolderStream(source_dir)
-            self._add_folder_to_zip(source_folder, zipf, source_dir)
+        for package_name, record in sorted(dep_map.items()):
+            key = self._bundle_key(package_name, record)
+            bundle = cache.root / key / "bundle.zip"
+            cached = cache.exists(key) and bundle.is_file()
 
-    def _add_folder_to_zip(self, folder: FolderStream, zipf: zipfile.ZipFile, base_dir: Path):
-        """递归添加文件夹内容到 ZIP"""
-        dir_info = folder.walk()
-        if dir_info is None:
-            return
+            if cached:
+                print(f"  ♻️ 使用缓存的依赖: {package_name}")
+            else:
+                temp_path = cache.path(key) / "bundle.zip.tmp"
+                try:
+                    with ZipStreamWriter(temp_path, self.compress_level, get_config().get("zip", 0, "jobs"),
+                                         reproducible=True) as writer:
+                        writer.add_files(self._dependency_files(record))
+                    os.replace(temp_path, bundle)
+                finally:
+                    temp_path.unlink(missing_ok=True)
+                print(f"  📦 添加依赖: {package_name} ({writer.summary()})")
+
+            cache.touch(key, recount=not cached)
+            bundles.append((f"dependencies/{package_name}/", bundle))
+            keys.append(key)
+
+        for key in cache.evict(keep=keys):
+            print(f"  🧹 淘汰依赖缓存: {key}")
+
+        return bundles
+
+    def _collect_plugin_files(self) -> dict[str, Path]:
+        """
+        收集插件目录中需要打包的文件，被排除的目录不会进入
+
+        :return: {归档内路径: 源文件}
+        """
+        files = {}
+        for entry in FolderStream(self.plugin_path).iter_tree(self.ignore.exclude, follow_symlinks=True,
+                                                              with_stat=False):
+            files[entry.relpath] = Path(entry.path)
+            print(f"  ➕ 添加: {entry.relpath}")
+        return files
+
+    @staticmethod
+    def _file_digest(path: Path) -> "hashlib._Hash":
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h
+
+    def _dependency_version(self, record: dict[str, Any]) -> str:
+        """依赖的已安装版本，没有安装元数据时使用文件内容哈希"""
+        return record["version"] or f"sha256:{self._content_hash(record)}"
+
+    def _content_hash(self, record: dict[str, Any]) -> str:
+        """依赖文件内容的哈希，同一次构建中只计算一次"""
+        cached = self._content_hashes.get(record["name"])
+        if cached:
+            return cached
+
+        h = hashlib.sha256()
+        for rel in sorted(record["files"]):
+            file_path = self._site_index.site_packages / rel
+            if file_path.is_file():
+                h.update(f"{rel}\0".encode("utf-8"))
+                h.update(self._file_digest(file_path).digest())
+        self._content_hashes[record["name"]] = h.hexdigest()
+        return self._content_hashes[record["name"]]
+
+    def _fingerprint(self, entries: dict[str, Path], plugin_arcnames: set[str], versions: dict[str, str]) -> str:
+        """
+        根据输入计算归档指纹：插件文件的内容和可执行位、依赖的版本以及压缩级别
+
+        依赖文件只记录版本，不逐个读取内容。
+        """
+        h = hashlib.sha256()
+        h.update(f"vebp-plugin/{FINGERPRINT_VERSION}\nlevel={self.compress_level}\n".encode("utf-8"))
 
-        # 添加文件
-        for file in dir_info.files:
-            file_path = Path(file.path)
-            rel_path = file_path.relative_to(base_dir)
-            zipf.write(str(file_path), str(rel_path))
+        for name, version in sorted(versions.items()):
+            h.update(f"dependency {name}=={version}\n".encode("utf-8"))
 
-        # 递归添加子目录
-        for sub_folder in dir_info.folders:
-            self._add_folder_to_zip(sub_folder, zipf, base_dir)
+        for arcname in sorted(plugin_arcnames):
+            source = entries[arcname]
+            digest = self._file_digest(source).hexdigest()
+            executable = os.stat(source).st_mode & 0o111 != 0
+            h.update(f"file {arcname} {int(executable)} {digest}\n".encode("utf-8"))
+
+        return h.hexdigest()
+
+    def _fingerprint_path(self) -> Path:
+        return self.output_dir / f"{self.plugin_name}.fingerprint.json"
+
+    def _is_up_to_date(self, zip_path: Path, fingerprint: str) -> bool:
+        """旁路文件和归档注释中的指纹都与输入一致时无需重新打包"""
+        try:
+            recorded = json.loads(self._fingerprint_path().read_text(encoding="utf-8")).get("fingerprint")
+            with zipfile.ZipFile(zip_path) as zf:
+                comment = zf.comment
+        except (OSError, ValueError, zipfile.BadZipFile):
+            return False
+
+        return recorded == fingerprint and comment == FINGERPRINT_PREFIX + fingerprint.encode("ascii")
+
+    def _create_zip_archive(self, entries: dict[str, Path], bundles: list[tuple[str, Path]],
+                            zip_path: Path, fingerprint: str) -> int:
+        """
+        流式写入 ZIP: 依赖从缓存的依赖包中原样复制已压缩的数据，插件文件在线程池中并发压缩
 
-    def _should_exclude(self, path: Path) -> bool:
-        """判断是否应该排除文件/目录"""
-        # 排除隐藏文件和目录
-        if any(part.startswith('.') and part != '.' and part != '..'
-               for part in path.parts):
-            return True
+        条目顺序固定，时间戳和权限规范化，相同的输入生成逐字节相同的归档。
 
-        # 排除特定文件类型
-        exclude_extensions = ['.pyc', '.pyo', '.pyd', '.log', '.tmp', '.bak']
-        if path.suffix.lower() in exclude_extensions:
-            return True
+        :return: 写入的文件数
+        """
+        print(f"📦 创建 ZIP 包: {zip_path.name}")
 
-        # 排除特定目录
-        exclude_dirs = ['__pycache__', '.git', '.idea', '.vscode', 'node_modules', 'dist', 'build']
-        if any(dir_name in path.parts for dir_name in exclude_dirs):
-            return True
+        temp_path = zip_path.with_name(f"{zip_path.name}.tmp")
+        try:
+            with ZipStreamWriter(temp_path, self.compress_level, get_config().get("zip", 0, "jobs"),
+                                 reproducible=True) as writer:
+                # 插件自身的文件覆盖同名的依赖文件
+                for prefix, bundle in bundles:
+                    writer.add_zip(bundle, prefix, exclude=entries)
+                writer.add_files((entries[arcname], arcname) for arcname in sorted(entries))
+                writer.close(FINGERPRINT_PREFIX + fingerprint.encode("ascii"))
+            os.replace(temp_path, zip_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
 
-        # 排除构建输出目录自身
-        if self.output_dir in path.parents:
-            return True
+        print(f"  ⚡ {writer.summary()}")
+        return writer.files
 
-        # 排除 macOS 的 DS_Store 文件
-        if path.name == '.DS_Store':
-            return True
+    def _load_ignore(self) -> IgnoreSpec:
+        """
+        打包时的排除规则: 内置默认规则、插件目录的 .vebpignore、vebp-plugin.json 的 exclude，后者优先
 
-        return False
+        构建输出目录位于插件目录中时总是排除。
+        """
+        spec = IgnoreSpec.load(self.plugin_path, self.meta.get("exclude", []), PLUGIN_DEFAULT_EXCLUDE)
+        if self.output_dir.is_relative_to(self.plugin_path) and self.output_dir != self.plugin_path:
+            spec.extend([f"/{self.output_dir.relative_to(self.plugin_path).as_posix()}/"])
+        return spec
 
     def build(self) -> Optional[Path]:
         """构建插件 ZIP 包"""
-        self.validate()
+        with self.span("build"):
+            return self._build()
 
-        # 创建临时构建目录
-        temp_build_dir = self.output_dir / f"_{self.plugin_name}_temp"
-        FolderStream(temp_build_dir).create()
+    def _build(self) -> Optional[Path]:
+        with self.span("validate"):
+            self.validate()
 
-        try:
-            print(f"🔧 开始构建插件: {self.plugin_name}")
+        print(f"🔧 开始构建插件: {self.plugin_name}")
+
+        # 插件文件的归档内路径到源文件的映射
+        entries: dict[str, Path] = {}
 
+        with self.span("dependencies"):
             dep_map = self._resolve_dependencies()
-            if dep_map:
-                self._copy_dependencies(temp_build_dir, dep_map)
 
-            # 复制文件到临时目录
-            self._copy_plugin_files(temp_build_dir)
+        with self.span("collect files"):
+            print(f"📦 收集插件文件...")
+            entries.update(self._collect_plugin_files())
+            plugin_arcnames = set(entries)
 
-            # 创建 ZIP 文件
-            zip_filename = f"{self.plugin_name}.zip"
-            zip_path = self.output_dir / zip_filename
-            self._create_zip_archive(temp_build_dir, zip_path)
+        if dep_map:
+            entries[LOCK_FILENAME] = self._write_lock(dep_map)
 
-            print(f"✅ 插件构建完成: {zip_path}")
+        zip_path = self.output_dir / f"{self.plugin_name}.zip"
+
+        with self.span("fingerprint"):
+            versions = {name: self._dependency_version(record) for name, record in dep_map.items()}
+            fingerprint = self._fingerprint(entries, plugin_arcnames, versions)
+
+        if not self.force and self._is_up_to_date(zip_path, fingerprint):
+            print(f"⏭️ 输入未变化, 跳过打包: {zip_path} ({fingerprint[:16]})")
             return zip_path
-        finally:
-            # 清理临时目录
-            shutil.rmtree(temp_build_dir, ignore_errors=True)
\ No newline at end of file
+
+        with self.span("dependency bundles", count=len(dep_map)):
+            bundles = self._dependency_bundles(dep_map)
+
+        with self.span("zip", target=zip_path, files=len(entries)):
+            files = self._create_zip_archive(entries, bundles, zip_path, fingerprint)
+
+        FileStream(self._fingerprint_path()).write_json({
+            "fingerprint": fingerprint,
+            "archive": zip_path.name,
+            "files": files,
+            "dependencies": versions,
+        })
+
+        print(f"🔑 指纹: {fingerprint}")
+        print(f"✅ 插件构建完成: {zip_path}")
+        return zip_path
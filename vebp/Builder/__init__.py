@@ -1,9 +1,12 @@
 ﻿import platform
 from pathlib import Path
-from typing import Optional, Union
+from typing import Any, ContextManager, Optional, Union
 
+from vebp.Data.globals import get_config
 from vebp.Libs.File import FolderStream
+from vebp.Libs.File.copy import BulkCopier
 from vebp.Libs.File.path import MPath_
+from vebp.Trace.globals import get_tracer
 from vebp.base import VebpBase
 
 
@@ -51,10 +54,20 @@ class BaseBuilder(VebpBase):
         """获取脚本路径"""
         return self._script_path
 
+    @property
+    def base_path(self) -> Path:
+        """获取基础路径"""
+        return self._base_path
+
     @property
     def base_output_dir(self) -> Path:
         return MPath_.cwd / "vebp-build"
 
+    @property
+    def cache_dir(self) -> Path:
+        """获取构建缓存目录"""
+        return self.base_output_dir / ".cache"
+
     def set_script(self, script_path: str) -> "BaseBuilder":
         """
         设置脚本路径
@@ -66,6 +79,25 @@ class BaseBuilder(VebpBase):
             self._script_path = self._base_path / Path(script_path)
         return self
 
+    @staticmethod
+    def _copier() -> BulkCopier:
+        """根据 vebp-config.json 的 copy 配置创建批量复制引擎"""
+        return BulkCopier(
+            jobs=get_config().get("copy", 0, "jobs"),
+            allow_hardlink=get_config().get("copy", False, "hardlink")
+        )
+
+    def span(self, name: str, cat: str = "build", **args: Any) -> ContextManager[None]:
+        """
+        记录构建步骤的耗时（启用 --trace 时写入追踪文件），插件也可以调用
+
+        :param name: 步骤名称
+        :param cat: 分类
+        :param args: 附加信息，默认带上项目名称
+        """
+        args.setdefault("project", self.name)
+        return get_tracer().span(name, cat, **args)
+
     def _validate(self) -> None:
         """验证构建器配置"""
         if not self.name:
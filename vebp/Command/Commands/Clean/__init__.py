@@ -3,5 +3,5 @@
 
 class CommandClean:
     @staticmethod
-    def handle():
-        Builder.clean()
\ No newline at end of file
+    def handle(args):
+        Builder.clean(getattr(args, 'cache', False))
\ No newline at end of file
@@ -0,0 +1,86 @@
+﻿import os
+import subprocess
+import sys
+import time
+
+from vebp.Daemon import DaemonClient, ensure_runtime_dir, supported
+
+
+class CommandDaemon:
+    @staticmethod
+    def handle(args) -> None:
+        if not supported():
+            print("❌ 错误: 当前平台不支持 Unix socket, 无法使用守护进程", file=sys.stderr)
+            sys.exit(1)
+
+        client = DaemonClient()
+
+        if args.status:
+            status = client.control("status")
+            if status is None:
+                print("⚪ 守护进程未运行")
+                return
+
+            print(f"🟢 守护进程运行中 (pid {status['pid']})")
+            print(f"  📂 项目目录: {status['cwd']}")
+            print(f"  ⏱️ 运行时间: {status['uptime']:.0f}s, 已处理 {status['requests']} 个请求")
+            print(f"  🧩 已加载插件: {', '.join(status['plugins']) or '无'}")
+            if status.get("busy") is not None:
+                print(f"  ⏳ 正在执行命令 (已运行 {status['busy']:.0f}s), 其他命令在本地执行")
+            return
+
+        if args.stop:
+            reply = client.control("stop")
+            if reply is None:
+                print("⚪ 守护进程未运行")
+            elif "error" in reply:
+                print("⏳ 守护进程正在执行命令, 请在命令结束后再停止", file=sys.stderr)
+                sys.exit(1)
+            else:
+                print("🔴 守护进程已停止")
+            return
+
+        if client.running:
+            print(f"🟢 守护进程已在运行: {client.path}")
+            return
+
+        if args.foreground:
+            from vebp.Daemon.server import serve
+
+            serve(idle_timeout=args.idle)
+            return
+
+        CommandDaemon._spawn(client, args.idle)
+
+    @staticmethod
+    def _spawn(client: DaemonClient, idle: float) -> None:
+        """在后台启动守护进程并等待 socket 就绪"""
+        if getattr(sys, "frozen", False):
+            command = [sys.executable]
+        else:
+            command = [sys.executable, os.path.abspath(sys.argv[0])]
+        command += ["daemon", "--foreground", "--idle", str(idle)]
+
+        try:
+            log_path = ensure_runtime_dir() / f"{client.path.stem}.log"
+        except PermissionError as e:
+            print(f"❌ {str(e)}", file=sys.stderr)
+            sys.exit(1)
+
+        with open(log_path, "ab") as log:
+            process = subprocess.Popen(command, cwd=client.cwd, stdin=subprocess.DEVNULL,
+                                       stdout=log, stderr=log, start_new_session=True)
+
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if client.running:
+                print(f"🟢 守护进程已启动 (pid {process.pid})")
+                print(f"  🔌 socket: {client.path}")
+                print(f"  📄 日志: {log_path}")
+                return
+            if process.poll() is not None:
+                break
+            time.sleep(0.05)
+
+        print(f"❌ 守护进程启动失败, 请查看日志: {log_path}", file=sys.stderr)
+        sys.exit(1)
@@ -20,8 +20,9 @@ class CommandInit:
         config_success = Config.create(path, args.force)
 
         package = Package(path / Package.FILENAME)
-        package.write("name", path.name if path.name else Path.cwd().name)
-        package.write("script", "run run.py", "start")
+        with package.batch():
+            package.write("name", path.name if path.name else Path.cwd().name)
+            package.write("script", "run run.py", "start")
 
         create(path)
 
@@ -1,5 +1,7 @@
 ﻿from vebp.Builder.Plugin import PluginBuilder
 from vebp.Plugin.globals import get_plugin_manager
+from vebp.Trace import TraceSession
+from vebp.Trace.globals import get_tracer
 
 
 class CommandPlugin:
@@ -26,12 +28,19 @@ class CommandPlugin:
                 return
 
             print(f"🔨 构建插件: {args.path}")
-            pb = PluginBuilder(args.path)
-            pb.build()
+            with TraceSession(get_tracer(), args.trace, args.profile, "plugin-build"):
+                pb = PluginBuilder(args.path, args.level, args.force)
+                pb.build()
             print("✅ 插件构建完成!")
             return
 
         if args.reload:
-            get_plugin_manager().load_plugins()
+            get_plugin_manager().load_plugins(args.jobs)
             print("🧩 加载成功")
+            return
+
+        if args.timing:
+            pm = get_plugin_manager()
+            pm.preload_plugins(args.jobs)
+            pm.timings.report()
             return
\ No newline at end of file
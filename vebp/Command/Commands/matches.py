@@ -1,17 +1,5 @@
 import argparse
 
-from vebp.Command.Commands.Builder import CommandBuild
-from vebp.Command.Commands.Clean import CommandClean
-from vebp.Command.Commands.Create import CommandCreate
-from vebp.Command.Commands.Cwd import CommandCwd
-from vebp.Command.Commands.Dev import CommandDev
-from vebp.Command.Commands.Exit import CommandExit
-from vebp.Command.Commands.Help import CommandHelp
-from vebp.Command.Commands.Init import CommandInit
-from vebp.Command.Commands.Pack import CommandPack
-from vebp.Command.Commands.Package import CommandPackage
-from vebp.Command.Commands.Plugin import CommandPlugin
-from vebp.Command.Commands.Version import CommandVersion
 from vebp.Libs.Args import ArgsUtil
 
 
@@ -28,29 +16,45 @@ class CommandMatch:
                 raise argparse.ArgumentTypeError(other)
         command = getattr(parsed_args, "command", None)
 
+        # 命令模块在分发时才导入，未使用的命令（及其依赖）不会拖慢启动
         # noinspection PyUnreachableCode
         match command:
             case 'build':
+                from vebp.Command.Commands.Builder import CommandBuild
                 CommandBuild.handle(parsed_args)
             case 'init':
+                from vebp.Command.Commands.Init import CommandInit
                 CommandInit.handle(parsed_args)
             case 'package':
+                from vebp.Command.Commands.Package import CommandPackage
                 CommandPackage.handle()
             case 'pack':
+                from vebp.Command.Commands.Pack import CommandPack
                 CommandPack.handle()
             case 'dev':
+                from vebp.Command.Commands.Dev import CommandDev
                 CommandDev.handle(parsed_args)
             case 'plugin':
+                from vebp.Command.Commands.Plugin import CommandPlugin
                 CommandPlugin.handle(parsed_args)
             case 'exit':
+                from vebp.Command.Commands.Exit import CommandExit
                 CommandExit.handle()
             case "clean":
-                CommandClean.handle()
+                from vebp.Command.Commands.Clean import CommandClean
+                CommandClean.handle(parsed_args)
             case "cwd":
+                from vebp.Command.Commands.Cwd import CommandCwd
                 CommandCwd.handle()
             case "help":
+                from vebp.Command.Commands.Help import CommandHelp
                 CommandHelp.handle(parser)
             case "version":
+                from vebp.Command.Commands.Version import CommandVersion
                 CommandVersion.handle()
             case "create":
-                CommandCreate.handle(parsed_args)
\ No newline at end of file
+                from vebp.Command.Commands.Create import CommandCreate
+                CommandCreate.handle(parsed_args)
+            case "daemon":
+                from vebp.Command.Commands.Daemon import CommandDaemon
+                CommandDaemon.handle(parsed_args)
\ No newline at end of file
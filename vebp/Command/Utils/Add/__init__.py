@@ -1,7 +1,14 @@
-﻿from pygments.lexer import default
+﻿import argparse
 
 
 class CommandAdd:
+    @staticmethod
+    def _add_trace_arguments(parser) -> None:
+        parser.add_argument('--trace', metavar='FILE',
+                            help='🧭 记录各步骤耗时并写入 Chrome trace JSON (chrome://tracing / ui.perfetto.dev)')
+        parser.add_argument('--profile', nargs='?', const='', default=None, metavar='FILE',
+                            help='📈 使用 cProfile 分析并写入 .pstats (默认: vebp-build/reports/<命令>.pstats)')
+
     @staticmethod
     def add_build_command(subparsers) -> None:
         build_parser = subparsers.add_parser(
@@ -16,6 +23,7 @@ class CommandAdd:
                   vebp build App -s app.py --in_asset "config.json;settings"
                   vebp build App -s app.py --in_asset "templates;ui" --asset "README.md"
                   vebp build  # 使用 vebp-build.json 中的配置
+                  vebp build --watch  # 文件变化后自动重新构建
                 ''')
 
         build_parser.add_argument('name', nargs='?', default=None,
@@ -34,6 +42,19 @@ class CommandAdd:
                                   help='📦 外部资源: "源路径;目标相对路径" (复制到输出目录)')
         build_parser.add_argument('--in_asset', action='append',
                                   help='📦 内部资源: "源路径;目标相对路径" (嵌入到可执行文件中)')
+        build_parser.add_argument('--force', action='store_true',
+                                  help='💥 忽略构建清单, 强制重新打包')
+        build_parser.add_argument('--jobs', '-j', type=int, default=None,
+                                  help='🧵 子项目并发构建数 (0 表示使用 CPU 核心数)')
+        build_parser.add_argument('--plan', action='store_true',
+                                  help='📋 打印子项目构建计划和关键路径, 不执行构建')
+        build_parser.add_argument('--watch', '-w', action='store_true',
+                                  help='👀 监视源码、资源和配置文件, 变化后自动增量构建')
+        build_parser.add_argument('--poll', action='store_true',
+                                  help='🔁 监视模式使用轮询代替 inotify')
+        build_parser.add_argument('--debounce', type=float, default=0.3,
+                                  help='⏳ 监视模式合并连续变化的静默时间 (秒, 默认: 0.3)')
+        CommandAdd._add_trace_arguments(build_parser)
 
     @staticmethod
     def add_init_command(subparsers) -> None:
@@ -76,6 +97,7 @@ class CommandAdd:
             description='🚀 执行 vebp-package.json 中 scripts 部分定义的命令'
         )
         run_parser.add_argument('script', help='📜 要运行的脚本名称')
+        CommandAdd._add_trace_arguments(run_parser)
 
     @staticmethod
     def add_plugin_command(subparsers) -> None:
@@ -91,6 +113,45 @@ class CommandAdd:
         plugin_parser.add_argument('--path', '-p', help='📂 插件路径')
         plugin_parser.add_argument('--reload', '-r', action='store_true',
                                    help='🔨 重新加载')
+        plugin_parser.add_argument('--timing', '-t', action='store_true',
+                                   help='⏱️ 导入全部插件并显示每个插件各阶段的加载耗时')
+        plugin_parser.add_argument('--jobs', '-j', type=int, default=None,
+                                   help='🧵 插件加载线程数 (0 表示按 CPU 核心数计算)')
+        plugin_parser.add_argument('--level', type=int, choices=range(10), default=None, metavar='0-9',
+                                   help='🗜️ 打包时的压缩级别 (默认读取 vebp-config.json 的 zip.level, 未设置时为 6)')
+        plugin_parser.add_argument('--force', '-f', action='store_true',
+                                   help='💪 忽略指纹, 即使输入未变化也重新打包')
+        CommandAdd._add_trace_arguments(plugin_parser)
+
+    @staticmethod
+    def add_daemon_command(subparsers) -> None:
+        daemon_parser = subparsers.add_parser(
+            'daemon',
+            help='🛰️ 启动常驻守护进程',
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            description='🛰️ 在后台保持一个常驻进程, CLI 和 CMD 的命令会转发给它执行, 省去每次启动时加载配置和插件的开销',
+            epilog='''示例:
+  vebp daemon            # 在后台启动
+  vebp daemon --status   # 查看状态
+  vebp daemon --stop     # 停止
+  VEBP_NO_DAEMON=1 vebp build  # 临时不使用守护进程
+  VEBP_DAEMON_ENV=API_TOKEN,MY_FLAG vebp build  # 额外转发这些环境变量
+
+注意:
+  dev 和 build --watch 总是在本地执行; 守护进程正在执行其他命令时, 新命令也在本地执行
+  转发的命令只能看到以下环境变量, 其余变量需要通过 VEBP_DAEMON_ENV 列出:
+    PATH HOME USER LOGNAME SHELL TERM COLORTERM NO_COLOR FORCE_COLOR LANG LANGUAGE TZ TMPDIR
+    DISPLAY WAYLAND_DISPLAY VIRTUAL_ENV CONDA_PREFIX SOURCE_DATE_EPOCH LC_* PYTHON* VEBP_* XDG_*
+'''
+        )
+        daemon_parser.add_argument('--stop', action='store_true',
+                                   help='🔴 停止守护进程')
+        daemon_parser.add_argument('--status', action='store_true',
+                                   help='ℹ️ 显示守护进程状态')
+        daemon_parser.add_argument('--foreground', action='store_true',
+                                   help='🖥️ 在前台运行 (不转入后台)')
+        daemon_parser.add_argument('--idle', type=float, default=1800,
+                                   help='💤 空闲多少秒后自动退出 (0 表示不退出, 默认 1800)')
 
     @staticmethod
     def add_exit_command(subparsers) -> None:
@@ -104,6 +165,9 @@ class CommandAdd:
             "clean", help="🧹 清理构建目录"
         )
 
+        clean_parser.add_argument('--cache', action='store_true',
+                                  help='🗑️ 同时清理构建缓存 (PyInstaller 工作目录、构建清单等)')
+
     @staticmethod
     def add_cwd_command(subparsers) -> None:
         cwd_parser = subparsers.add_parser(
@@ -47,5 +47,6 @@ class CommandUtilsCreate:
         CommandAdd.add_help_command(subparsers)
         CommandAdd.add_version_command(subparsers)
         CommandAdd.add_create_command(subparsers)
+        CommandAdd.add_daemon_command(subparsers)
 
         return parser
\ No newline at end of file
@@ -1,9 +1,7 @@
 ﻿import os
 import sys
-import questionary
 
 from typing import Any, Optional, Callable, Union
-from questionary import Style as QStyle
 
 from vebp.Console.choice import Choice
 
@@ -43,6 +41,9 @@ class ConsoleInput:
         :param key_style: 摘要键样式
         :param value_style: 摘要值样式
         """
+        # questionary 依赖 prompt_toolkit，导入较慢，只在交互时加载
+        from questionary import Style as QStyle
+
         self.title = title
         self.answers: dict[str, Any] = {}
         self.questions: list[dict] = []
@@ -144,6 +145,8 @@ class ConsoleInput:
 
     def _create_questionary_question(self, question):
         """将内部问题格式转换为questionary格式"""
+        import questionary
+
         q_type = question["type"]
         prompt_text = question["prompt"]
         description = question["description"]
@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+from vebp.version import __version__
+
+
+# 转发给守护进程的环境变量，其余变量 (令牌、密钥等) 不离开当前进程
+FORWARD_ENV = frozenset({
+    "PATH", "HOME", "USER", "LOGNAME", "SHELL", "TERM", "COLORTERM", "NO_COLOR", "FORCE_COLOR",
+    "LANG", "LANGUAGE", "TZ", "TMPDIR", "DISPLAY", "WAYLAND_DISPLAY",
+    "VIRTUAL_ENV", "CONDA_PREFIX", "SOURCE_DATE_EPOCH",
+})
+FORWARD_ENV_PREFIXES = ("LC_", "PYTHON", "VEBP_", "XDG_")
+# 以逗号分隔的额外转发变量名，转发的命令需要其他变量时设置
+FORWARD_ENV_VAR = "VEBP_DAEMON_ENV"
+
+# 总是在本地执行的命令: dev 脚本运行时间不定并且依赖完整的环境变量
+LOCAL_COMMANDS = frozenset({"daemon", "dev"})
+
+
+def runs_locally(argv: list[str]) -> bool:
+    """
+    命令是否不应转发给守护进程
+
+    dev 和 build --watch 会长时间占用守护进程（守护进程一次只执行一个命令），总是在本地执行。
+    build 的短选项可以合并 (如 -cw)，含 w 的短选项组一律视为 --watch。
+    """
+    if not argv or argv[0] in LOCAL_COMMANDS:
+        return True
+    if argv[0] != "build":
+        return False
+
+    for token in argv[1:]:
+        if token == "--":
+            break
+        # argparse 接受长选项的无歧义前缀
+        if token.startswith("--w") and "--watch".startswith(token.split("=", 1)[0]):
+            return True
+        if token.startswith("-") and not token.startswith("--") and "w" in token[1:]:
+            return True
+    return False
+
+
+def runtime_dir() -> Path:
+    """守护进程 socket 和日志所在目录（每个用户一个），优先使用 $XDG_RUNTIME_DIR"""
+    xdg = os.environ.get("XDG_RUNTIME_DIR")
+    if xdg and os.path.isabs(xdg):
+        return Path(xdg) / "vebp"
+
+    uid = os.getuid() if hasattr(os, "getuid") else "user"
+    return Path(tempfile.gettempdir()) / f"vebp-{uid}"
+
+
+def ensure_runtime_dir(create: bool = True) -> Path:
+    """
+    获取并检查运行目录
+
+    目录必须是当前用户所有、权限为 0700 的真实目录（不能是符号链接），
+    否则可能是其他用户抢先创建的，在其中监听或连接 socket 会把终端和环境变量交给对方。
+
+    :param create: 目录不存在时是否创建
+    :raises FileNotFoundError: 目录不存在且 create 为 False
+    :raises PermissionError: 目录不安全
+    """
+    path = runtime_dir()
+    if create:
+        try:
+            path.mkdir(mode=0o700, parents=True)
+            # mkdir 的权限受 umask 影响，只修正自己刚创建的目录
+            os.chmod(path, 0o700)
+        except FileExistsError:
+            pass
+
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or stat.S_IMODE(st.st_mode) != 0o700:
+        raise PermissionError(f"守护进程目录不安全 (需要是当前用户所有且权限为 0700 的目录): {path}")
+    return path
+
+
+def is_own_socket(path: Path) -> bool:
+    """路径是否是当前用户所有的 socket 文件（不跟随符号链接）"""
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def forwarded_env() -> dict[str, str]:
+    """转发给守护进程的环境变量：FORWARD_ENV、FORWARD_ENV_PREFIXES 以及 VEBP_DAEMON_ENV 中列出的变量"""
+    extra = {name.strip() for name in os.environ.get(FORWARD_ENV_VAR, "").split(",") if name.strip()}
+    return {name: value for name, value in os.environ.items()
+            if name in FORWARD_ENV or name in extra or name.startswith(FORWARD_ENV_PREFIXES)}
+
+
+def socket_path(cwd: Optional[str] = None) -> Path:
+    """
+    获取项目对应的守护进程 socket 路径
+
+    每个项目目录使用独立的守护进程，避免不同项目的插件模块和环境变量互相干扰。
+
+    :param cwd: 项目目录，默认为当前工作目录
+    """
+    key = hashlib.sha1(os.path.abspath(cwd or os.getcwd()).encode("utf-8")).hexdigest()[:12]
+    return runtime_dir() / f"{key}.sock"
+
+
+def supported() -> bool:
+    return hasattr(socket, "AF_UNIX") and hasattr(socket, "send_fds")
+
+
+class DaemonClient:
+    """
+    守护进程客户端
+
+    把命令转发给当前项目的守护进程执行。标准输入输出的文件描述符随请求一起发送，
+    守护进程（及其启动的 PyInstaller、dev 脚本等子进程）直接读写调用方的终端。
+    """
+
+    def __init__(self, cwd: Optional[str] = None) -> None:
+        self.cwd = os.path.abspath(cwd or os.getcwd())
+        self.path = socket_path(self.cwd)
+
+    def _connect(self) -> Optional[socket.socket]:
+        if not supported():
+            return None
+
+        try:
+            ensure_runtime_dir(create=False)
+        except FileNotFoundError:
+            return None
+        except PermissionError as e:
+            print(f"⚠️ {str(e)}, 不使用守护进程", file=sys.stderr)
+            return None
+
+        if not os.path.lexists(self.path):
+            return None
+        if not is_own_socket(self.path):
+            print(f"⚠️ 守护进程 socket 不属于当前用户, 不使用守护进程: {self.path}", file=sys.stderr)
+            return None
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(self.path))
+        except OSError:
+            sock.close()
+            return None
+        return sock
+
+    @staticmethod
+    def _replies(sock: socket.socket):
+        buffer = b""
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                return
+
+            buffer += data
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                yield json.loads(line)
+
+    @property
+    def running(self) -> bool:
+        sock = self._connect()
+        if sock is None:
+            return False
+        sock.close()
+        return True
+
+    def forward(self, argv: list[str]) -> Optional[int]:
+        """
+        在守护进程中执行命令
+
+        :param argv: 命令行参数（不含程序名）
+        :return: 命令退出码，守护进程不可用时返回 None（由调用方在本地执行）
+        """
+        if os.environ.get("VEBP_NO_DAEMON") or runs_locally(argv):
+            return None
+
+        sock = self._connect()
+        if sock is None:
+            return None
+
+        request = {
+            "version": __version__,
+            "argv": argv,
+            "cwd": self.cwd,
+            "env": forwarded_env(),
+        }
+
+        with sock:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            try:
+                socket.send_fds(sock, [json.dumps(request).encode("utf-8") + b"\n"], [0, 1, 2])
+            except OSError:
+                return None
+
+            interrupted = False
+            while True:
+                try:
+                    for reply in self._replies(sock):
+                        # busy: 守护进程正在执行其他命令，与版本不兼容等错误一样回到本地执行
+                        if "error" in reply:
+                            return None
+                        if "exit" in reply:
+                            return reply["exit"]
+                    break
+                except KeyboardInterrupt:
+                    # 守护进程不在当前终端的进程组中，收不到 Ctrl+C，需要转告它中断命令；再按一次直接退出
+                    if interrupted:
+                        return 130
+                    interrupted = True
+                    print("\n⛔ 正在中断守护进程中的命令 (再按一次 Ctrl+C 直接退出)", file=sys.stderr)
+                    try:
+                        sock.sendall(json.dumps({"interrupt": True}).encode("utf-8") + b"\n")
+                    except OSError:
+                        return 130
+
+        print("⚠️ 守护进程连接中断", file=sys.stderr)
+        return 1
+
+    def control(self, action: str) -> Optional[dict[str, Any]]:
+        """
+        发送控制请求 (status / stop)
+
+        :return: 守护进程的回复，未运行时返回 None
+        """
+        sock = self._connect()
+        if sock is None:
+            return None
+
+        with sock:
+            sock.sendall(json.dumps({"control": action}).encode("utf-8") + b"\n")
+            for reply in self._replies(sock):
+                return reply
+        return None
@@ -0,0 +1,338 @@
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
+from typing import Any, Optional
+
+from vebp.Command.Commands.matches import CommandMatch
+from vebp.Command.Utils.Create import CommandUtilsCreate
+from vebp.Daemon import ensure_runtime_dir, is_own_socket, socket_path
+from vebp.Data.Config import Config
+from vebp.Data.globals import get_config, reset_config, set_config
+from vebp.Plugin.Manager import PluginManager
+from vebp.Plugin.globals import set_plugin_manager
+from vebp.Trace.globals import enable_from_argv, reset_tracer
+from vebp.base import VebpBase
+from vebp.version import __version__
+
+
+class ProjectState:
+    """守护进程缓存的项目状态：配置和已加载的插件管理器"""
+
+    def __init__(self, cwd: str) -> None:
+        self.cwd = cwd
+        self.config: Optional[Config] = None
+        self.plugin_manager: Optional[PluginManager] = None
+        self._signature: Optional[tuple[int, int]] = None
+
+    def _stat(self) -> Optional[tuple[int, int]]:
+        try:
+            st = os.stat(os.path.join(self.cwd, Config.FILENAME))
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def activate(self) -> None:
+        """切换全局配置和插件管理器为缓存的实例，vebp-config.json 变化时重新加载"""
+        signature = self._stat()
+
+        if self.config is None or signature != self._signature:
+            if self.plugin_manager is not None:
+                print("🔄 vebp-config.json 已变化, 重新加载配置和插件")
+                for namespace in self.plugin_manager.list_plugins():
+                    self.plugin_manager.unload_plugin(namespace)
+
+            reset_config()
+            self.config = get_config()
+            self.plugin_manager = PluginManager()
+            self._signature = signature
+
+        set_config(self.config)
+        set_plugin_manager(self.plugin_manager)
+
+        # 与 CLI 启动时相同，加载插件目录中新增或变化的插件（已加载的插件保持导入状态）
+        VebpBase()
+
+
+class DaemonServer:
+    """
+    常驻构建守护进程
+
+    在 Unix socket 上依次处理 CLI 和 CMD 转发的命令，配置、插件和构建相关的缓存在请求之间保留。
+    执行命令期间的新连接由后台线程回复 busy (客户端改为本地执行)；客户端断开或发送 interrupt 时中断正在执行的命令。
+    """
+
+    def __init__(self, cwd: Optional[str] = None, idle_timeout: float = 1800) -> None:
+        """
+        :param cwd: 项目目录
+        :param idle_timeout: 空闲多少秒后自动退出，0 表示不退出
+        """
+        self.cwd = os.path.abspath(cwd or os.getcwd())
+        self.path = socket_path(self.cwd)
+        self.idle_timeout = idle_timeout
+
+        self.state = ProjectState(self.cwd)
+        self.parser = CommandUtilsCreate.create()
+        self.started = time.time()
+        self.requests = 0
+        self._running = False
+        # 为 True 时 SIGINT 中断正在执行的命令，其余时间忽略，避免迟到的中断打断请求之间的处理
+        self._interruptible = False
+        self._busy_since: Optional[float] = None
+
+    def _bind(self) -> socket.socket:
+        # 目录不属于当前用户或权限不是 0700 时抛出 PermissionError
+        ensure_runtime_dir()
+
+        if os.path.lexists(self.path):
+            if not is_own_socket(self.path):
+                raise RuntimeError(f"socket 路径已被占用且不属于当前用户: {self.path}")
+
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(self.path))
+                raise RuntimeError(f"守护进程已在运行: {self.path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                # 上次异常退出留下的 socket 文件
+                self.path.unlink(missing_ok=True)
+            finally:
+                probe.close()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(self.path))
+        os.chmod(self.path, 0o600)
+        server.listen(16)
+        return server
+
+    @staticmethod
+    def _peer_uid(conn: socket.socket) -> Optional[int]:
+        """连接方进程的 uid，平台不支持 SO_PEERCRED 时返回 None（此时由目录的 0700 权限限制连接方）"""
+        if not hasattr(socket, "SO_PEERCRED"):
+            return None
+
+        creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+        _, uid, _ = struct.unpack("3i", creds)
+        return uid
+
+    def serve(self) -> None:
+        server = self._bind()
+        self._running = True
+
+        def stop(*_):
+            self._running = False
+            server.close()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, self._on_interrupt)
+
+        # 守护进程的输出重定向到日志文件，改为行缓冲以便转发的命令实时输出
+        sys.stdout.reconfigure(line_buffering=True)
+        sys.stderr.reconfigure(line_buffering=True)
+
+        print(f"🟢 vebp 守护进程已启动: {self.path} (pid {os.getpid()})")
+        try:
+            while self._running:
+                server.settimeout(self.idle_timeout or None)
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    print("💤 空闲超时, 守护进程退出")
+                    break
+                except OSError:
+                    break
+
+                with conn:
+                    uid = self._peer_uid(conn)
+                    if uid is not None and uid != os.getuid():
+                        print(f"❌ 拒绝来自其他用户 (uid {uid}) 的连接", file=sys.stderr)
+                        continue
+
+                    conn.settimeout(None)
+                    try:
+                        self._handle(conn, server)
+                    except Exception as e:
+                        print(f"❌ 处理请求失败: {str(e)}", file=sys.stderr)
+        finally:
+            server.close()
+            self.path.unlink(missing_ok=True)
+            print("🔴 vebp 守护进程已停止")
+
+    @staticmethod
+    def _send(conn: socket.socket, reply: dict[str, Any]) -> None:
+        conn.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+
+    def _on_interrupt(self, *_) -> None:
+        if not self._interruptible:
+            return
+        # 每个请求最多中断一次
+        self._interruptible = False
+        raise KeyboardInterrupt
+
+    def _status(self) -> dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "cwd": self.cwd,
+            "version": __version__,
+            "uptime": time.time() - self.started,
+            "requests": self.requests,
+            "plugins": self.state.plugin_manager.list_plugins() if self.state.plugin_manager else [],
+            "busy": None if self._busy_since is None else time.time() - self._busy_since,
+        }
+
+    def _answer_busy(self, server: socket.socket, done: threading.Event) -> None:
+        """执行命令期间接受新连接: status 正常回复，其余请求回复 busy"""
+        server.settimeout(0.2)
+        while not done.is_set():
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+
+            with conn:
+                try:
+                    uid = self._peer_uid(conn)
+                    if uid is not None and uid != os.getuid():
+                        continue
+
+                    conn.settimeout(1)
+                    data = conn.recv(65536)
+                    if not data:
+                        continue
+                    if b'"status"' in data:
+                        self._send(conn, self._status())
+                    else:
+                        self._send(conn, {"error": "busy"})
+                except (OSError, ValueError):
+                    pass
+
+    def _watch_client(self, conn: socket.socket, done: threading.Event) -> None:
+        """客户端断开连接或发送 interrupt 时中断正在执行的命令"""
+        while not done.is_set():
+            try:
+                data = conn.recv(4096)
+            except OSError:
+                data = b""
+
+            if done.is_set():
+                return
+            if not data or b"interrupt" in data:
+                # 直接发给主线程，才能打断主线程中阻塞的系统调用 (如读取 PyInstaller 输出)，
+                # 信号处理函数在主线程抛出 KeyboardInterrupt
+                signal.pthread_kill(threading.main_thread().ident, signal.SIGINT)
+                return
+
+    def _handle(self, conn: socket.socket, server: socket.socket) -> None:
+        data, fds, _, _ = socket.recv_fds(conn, 65536, 3)
+        try:
+            while data and not data.endswith(b"\n"):
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                data += chunk
+
+            # DaemonClient.running 只连接不发送数据
+            if not data:
+                return
+
+            request = json.loads(data)
+            control = request.get("control")
+
+            if control == "status":
+                self._send(conn, self._status())
+                return
+
+            if control == "stop":
+                self._send(conn, {"stopped": True})
+                self._running = False
+                return
+
+            if request.get("version") != __version__ or len(fds) != 3:
+                self._send(conn, {"error": "incompatible"})
+                return
+
+            self.requests += 1
+            done = threading.Event()
+            helpers = [threading.Thread(target=self._answer_busy, args=(server, done), daemon=True),
+                       threading.Thread(target=self._watch_client, args=(conn, done), daemon=True)]
+            self._busy_since = time.time()
+            for thread in helpers:
+                thread.start()
+            try:
+                code = self._run(request, fds)
+            finally:
+                done.set()
+                helpers[0].join()
+                self._busy_since = None
+
+            try:
+                self._send(conn, {"exit": code})
+            except OSError:
+                # 客户端已断开
+                pass
+        finally:
+            for fd in fds:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+
+    def _run(self, request: dict[str, Any], fds: list[int]) -> int:
+        """在客户端的标准输入输出、环境变量和参数下执行一条命令"""
+        sys.stdout.flush()
+        sys.stderr.flush()
+        saved_fds = [os.dup(i) for i in range(3)]
+        saved_env = dict(os.environ)
+        saved_argv = sys.argv
+
+        for i, fd in enumerate(fds):
+            os.dup2(fd, i)
+        os.environ.clear()
+        os.environ.update(request.get("env", {}))
+        sys.argv = [saved_argv[0], *request.get("argv", [])]
+
+        # 每个请求使用新的追踪器，已缓存的配置和插件不会重新加载，因此不会出现在追踪中
+        reset_tracer()
+        enable_from_argv(sys.argv[1:])
+
+        code = 0
+        try:
+            try:
+                self._interruptible = True
+                os.chdir(self.cwd)
+                self.state.activate()
+                CommandMatch.handle(self.parser)
+            finally:
+                self._interruptible = False
+        except KeyboardInterrupt:
+            print("\n⛔ 命令已中断", file=sys.stderr)
+            code = 130
+        except SystemExit as e:
+            if isinstance(e.code, int):
+                code = e.code
+            elif e.code is not None:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except Exception as e:
+            print(f"❌ {str(e)}", file=sys.stderr)
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            for i, fd in enumerate(saved_fds):
+                os.dup2(fd, i)
+                os.close(fd)
+            os.environ.clear()
+            os.environ.update(saved_env)
+            sys.argv = saved_argv
+
+        return code
+
+
+def serve(cwd: Optional[str] = None, idle_timeout: float = 1800) -> None:
+    DaemonServer(cwd, idle_timeout).serve()
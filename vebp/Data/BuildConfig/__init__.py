@@ -19,5 +19,8 @@ class BuildConfig(VebpData):
         "in_assets": {},
         "sub_project": {},
         "exclude_modules": {},
-        "exclude_commands": {}
+        "exclude_commands": {},
+        "jobs": {},
+        "asset_sync": {},
+        "exclude": {}
     }
\ No newline at end of file
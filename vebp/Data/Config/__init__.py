@@ -11,7 +11,30 @@ class Config(VebpData):
         "plugins": {
             "value": {
                 "src": {},
-                "add": {}
+                "add": {},
+                "jobs": {}
+            }
+        },
+        "copy": {
+            "value": {
+                "jobs": {},
+                "hardlink": {}
+            }
+        },
+        "buildCache": {
+            "value": {
+                "maxSize": {}
+            }
+        },
+        "dependencyCache": {
+            "value": {
+                "maxSize": {}
+            }
+        },
+        "zip": {
+            "value": {
+                "level": {},
+                "jobs": {}
             }
         },
     }
@@ -12,5 +12,6 @@ class PluginConfig(VebpData):
         "author": {
             "generate": True,
             "default": "vebp"
-        }
+        },
+        "exclude": {}
     }
\ No newline at end of file
@@ -1,10 +1,80 @@
-from typing import Any
+import copy
+import os
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
 
 from vebp.Libs.File import FileStream
 from vebp.Libs.File.path import MPath_
 from vebp.fstr import format_string
 
 
+# 已解析的配置文件: {真实路径: ((mtime, size), 内容)}，进程内共享，守护进程中跨请求复用
+_json_cache: dict[str, tuple[tuple[int, int], dict[str, Any]]] = {}
+
+
+def _signature(path: str) -> tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+class ConfigConflictError(RuntimeError):
+    """提交事务时配置文件已被其他写入者修改"""
+
+
+def _read_json_cached(f: FileStream) -> tuple[tuple[int, int], dict[str, Any]]:
+    """
+    读取 JSON 文件，文件 (mtime, size) 未变化时复用上次的解析结果
+
+    :return: (读取时文件的 (mtime, size), 内容)
+    """
+    # 同一文件经不同的相对路径或符号链接访问时共享缓存
+    key = os.path.realpath(f.path)
+    signature = _signature(key)
+
+    cached = _json_cache.get(key)
+    if cached is None or cached[0] != signature:
+        cached = (signature, f.read_json())
+        _json_cache[key] = cached
+
+    # 调用方会修改 self.file，返回副本以免污染缓存
+    return cached[0], copy.deepcopy(cached[1])
+
+
+def _write_json_cached(f: FileStream, data: dict[str, Any], fsync: bool = False) -> tuple[int, int]:
+    """
+    原子地写入 JSON 文件并更新缓存，之后读取同一文件无需重新解析
+
+    :return: 写入后文件的 (mtime, size)
+    """
+    f.write_json(data, fsync)
+    key = os.path.realpath(f.path)
+    signature = _signature(key)
+    _json_cache[key] = (signature, copy.deepcopy(data))
+    return signature
+
+
+def _unknown_keys(props: dict[str, Any], keys: list, value: Any) -> list[str]:
+    """
+    按 PROP_DICT 检查键路径，返回未声明的键 (以 . 连接的完整路径)
+
+    只有带 "value" 的属性约束其下一级的键，其余属性的内容不做检查；写入的值是字典时同样检查其中的键。
+    """
+    for depth, key in enumerate(keys):
+        if key not in props:
+            return [".".join(map(str, keys[:depth + 1]))]
+        props = props[key].get("value")
+        if props is None:
+            return []
+
+    if not isinstance(value, dict):
+        return []
+
+    prefix = ".".join(map(str, keys))
+    return [f"{prefix}.{name}"
+            for key, item in value.items()
+            for name in _unknown_keys(props, [key], item)]
+
+
 class VebpData:
     FILENAME = "vebp-config.json"
 
@@ -12,7 +82,14 @@ class VebpData:
 
     def __init__(self, path) -> None:
         self.path = path
+        # 读取或上次写入时文件的 (mtime, size)，文件不存在时为 None，事务提交时用于检测冲突
+        self._signature: Optional[tuple[int, int]] = None
         self.file = self._read(path)
+        # batch() 的嵌套层数和期间是否有未写回的修改
+        self._batch_depth = 0
+        self._dirty = False
+        # transaction() 中记录的修改 [(键路径, 值)]，不在事务中时为 None
+        self._transaction: Optional[list[tuple[list, Any]]] = None
 
     def _read(self, path) -> dict[str, Any]:
         f = FileStream(path)
@@ -20,8 +97,10 @@ class VebpData:
             raise FileNotFoundError(f"File {path} not found")
 
         try:
-            return f.read_json()
+            self._signature, data = _read_json_cached(f)
+            return data
         except FileNotFoundError:
+            self._signature = None
             return self.default()
 
     @classmethod
@@ -42,9 +121,8 @@ class VebpData:
             print(f"{cls.FILENAME} 已存在。使用 --force 覆盖。")
             return False
 
-        file_path.create()
         config = cls.generate_default()
-        file_path.write_json(config)
+        _write_json_cached(file_path, config)
 
         print(f"成功创建 {cls.FILENAME}!")
 
@@ -84,9 +162,106 @@ class VebpData:
         last_key = all_keys[-1]
         current[last_key] = value
 
-        # 写回文件
+        # 事务中只记录修改，提交时校验并写回
+        if self._transaction is not None:
+            self._transaction.append((all_keys, value))
+            return
+
+        # 写回文件，batch() 中推迟到结束时统一写回
+        self._dirty = True
+        if not self._batch_depth:
+            self.flush()
+
+    def flush(self) -> bool:
+        """
+        把修改写回文件
+
+        :return: 写入成功或没有需要写入的修改时返回 True
+        """
+        if not self._dirty:
+            return True
+
         try:
-            f = FileStream(self.path)
-            f.write_json(self.file)
+            self._signature = _write_json_cached(FileStream(self.path), self.file)
         except Exception as e:
-            print(f"写入配置文件失败: {e}")
\ No newline at end of file
+            print(f"写入配置文件失败: {e}")
+            return False
+
+        self._dirty = False
+        return True
+
+    @contextmanager
+    def batch(self) -> Iterator["VebpData"]:
+        """
+        合并多次 write，在退出时只写回一次文件
+
+        用法示例:
+            with package.batch():
+                package.write("name", "demo")
+                package.write("script", "run run.py", "start")
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
+
+    @contextmanager
+    def transaction(self) -> Iterator["VebpData"]:
+        """
+        事务: 块内的 write 只修改内存，退出时按 PROP_DICT 校验，再 fsync 并原子替换，只写一次文件
+
+        采用乐观并发控制: 提交前比较文件的 (mtime, size) 与本对象读取 (或上次写入) 时是否一致，
+        不一致说明有其他写入者修改了文件，此时不写入并抛出 ConfigConflictError，调用方可以重新读取后重试。
+        块内抛出异常、校验失败或发生冲突时，内存中的修改全部撤销。
+
+        用法示例:
+            config = Package(Package.FILENAME)
+            with config.transaction():
+                config.write("venv", ".venv")
+                config.write("scripts", "run run.py", "start")
+
+        :raises ValueError: 写入了 PROP_DICT 中未声明的键
+        :raises ConfigConflictError: 文件在读取后被修改
+        """
+        if self._transaction is not None:
+            raise RuntimeError("不支持嵌套事务")
+
+        snapshot = copy.deepcopy(self.file)
+        self._transaction = []
+        try:
+            yield self
+            mutations = self._transaction
+        except BaseException:
+            self.file = snapshot
+            raise
+        finally:
+            self._transaction = None
+
+        if not mutations:
+            return
+
+        try:
+            if self.PROP_DICT:
+                unknown = []
+                for keys, value in mutations:
+                    unknown.extend(_unknown_keys(self.PROP_DICT, keys, value))
+                if unknown:
+                    raise ValueError(f"{self.FILENAME} 中没有这些配置项: {', '.join(unknown)}")
+
+            try:
+                current = _signature(str(self.path))
+            except FileNotFoundError:
+                current = None
+            if current != self._signature:
+                raise ConfigConflictError(f"{self.path} 在读取后已被修改，请重新读取后重试")
+
+            self._signature = _write_json_cached(FileStream(self.path), self.file, fsync=True)
+        except BaseException:
+            self.file = snapshot
+            raise
+
+        # batch() 中此前的修改已随事务一起写入
+        self._dirty = False
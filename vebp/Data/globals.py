@@ -1,4 +1,5 @@
 ﻿from vebp.Data.Config import Config
+from vebp.Trace.globals import get_tracer
 
 _global_config_manager = None
 
@@ -18,7 +19,8 @@ def get_config() -> Config:
     """
     global _global_config_manager
     if _global_config_manager is None:
-        _global_config_manager = Config(Config.FILENAME)
+        with get_tracer().span("config.load", cat="config"):
+            _global_config_manager = Config(Config.FILENAME)
     return _global_config_manager
 
 
@@ -30,4 +32,14 @@ def reset_config():
     在正常运行时通常不需要调用此函数
     """
     global _global_config_manager
-    _global_config_manager = None
\ No newline at end of file
+    _global_config_manager = None
+
+
+def set_config(value: Config):
+    """
+    替换全局配置实例
+
+    守护进程在处理请求前切换为缓存的实例
+    """
+    global _global_config_manager
+    _global_config_manager = value
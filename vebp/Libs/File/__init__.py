@@ -3,7 +3,10 @@ import os
 import shutil
 
 from pathlib import Path
-from typing import Iterator, Any, Union, Optional
+from typing import Callable, Iterator, Any, Union, Optional
+
+from vebp.Libs.File.copy import BulkCopier, copy_file
+from vebp.Libs.File.tree import TreeEntry, iter_tree
 
 
 class FileStream:
@@ -56,9 +59,44 @@ class FileStream:
         with open(self._path, 'r', encoding="utf-8") as file:
             return json.load(file)
 
-    def write_json(self, data: dict) -> None:
-        with open(self._path, 'w', encoding="utf-8") as file:
-            json.dump(data, file, indent=2)
+    def write_json(self, data: dict, fsync: bool = False) -> None:
+        """
+        原子地写入 JSON: 先写入同目录的临时文件再替换目标文件，写入中途出错不会留下截断的文件
+
+        :param data: 要写入的数据
+        :param fsync: 是否把临时文件和替换后的目录项刷到磁盘
+        """
+        # 目标是符号链接时写入链接指向的文件，而不是用普通文件替换掉链接本身
+        target = Path(os.path.realpath(self._path))
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.{os.urandom(4).hex()}.tmp")
+        # 与直接 open 相同按 umask 创建，覆盖已有文件时保留其权限
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            try:
+                os.chmod(tmp_path, os.stat(target).st_mode & 0o7777)
+            except OSError:
+                pass
+
+            with open(fd, 'w', encoding="utf-8") as file:
+                json.dump(data, file, indent=2)
+                if fsync:
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.replace(tmp_path, target)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        # 目录项也刷到磁盘，替换本身才能在断电后保留 (Windows 不支持打开目录)
+        if fsync and os.name != "nt":
+            dir_fd = os.open(target.parent, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
 
     @staticmethod
     def abs(source) -> Optional[str]:
@@ -89,7 +127,7 @@ class FileStream:
         if dest_dir and not os.path.exists(dest_dir):
             os.makedirs(dest_dir, exist_ok=True)
 
-        shutil.copy2(src_path, dest_path)
+        copy_file(src_path, dest_path)
 
         return FileStream(dest_path)
 
@@ -162,6 +200,18 @@ class FolderStream:
 
         return DirectoryInfo(self._path, folders, files)
 
+    def iter_tree(self, exclude: Optional[Callable[[str, os.DirEntry], bool]] = None, dirs: bool = False,
+                  follow_symlinks: bool = False, with_stat: bool = True) -> Iterator[TreeEntry]:
+        """
+        迭代遍历整个目录树，见 vebp.Libs.File.tree.iter_tree
+
+        :param exclude: exclude(相对路径, DirEntry) 返回 True 时跳过该文件，或不进入该目录
+        :param dirs: 是否同时产生目录条目
+        :param follow_symlinks: 是否进入指向目录的符号链接
+        :param with_stat: 是否读取大小、修改时间和权限
+        """
+        return iter_tree(self._path, exclude, dirs, follow_symlinks, with_stat)
+
     @staticmethod
     def abs(source) -> Optional[str]:
         if isinstance(source, FolderStream):
@@ -205,24 +255,10 @@ class FolderStream:
             # 创建目标文件夹（如果不存在）
             os.makedirs(dest_abs, exist_ok=True)
 
-            # 遍历当前文件夹内容
-            dir_info = self.walk()
-            if dir_info is None:
+            # 使用线程池并发复制所有文件
+            if not BulkCopier().copy_tree(self._path, dest_abs):
                 return None
 
-            # 复制所有文件
-            for file_stream in dir_info.files:
-                # 构建目标文件路径
-                target_file = os.path.join(dest_abs, file_stream.name)
-                # 复制文件
-                FileStream.copy(file_stream, target_file)
-
-            # 递归复制子文件夹
-            for sub_folder in dir_info.folders:
-                # 构建目标子文件夹路径
-                target_subfolder = os.path.join(dest_abs, os.path.basename(sub_folder.path))
-                sub_folder.copy_tree(target_subfolder)
-
             return FolderStream(dest_abs)
         except Exception as e:
             print(f"复制失败: {str(e)}")
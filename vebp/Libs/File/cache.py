@@ -0,0 +1,140 @@
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+
+def dir_size(path: Union[str, Path]) -> int:
+    """统计目录下所有文件的总大小"""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class CacheDir:
+    """
+    按 key 划分子目录的缓存，超过容量上限时按最近使用时间 (LRU) 淘汰
+
+    每个条目目录下保存一个元数据文件，记录最近使用时间和占用大小，淘汰时无需遍历条目内容。
+    """
+
+    META = ".vebp-cache.json"
+    # 正在写入（或没有元数据）的条目在此时长（秒）内不会被淘汰，超时视为中途失败的残留
+    GRACE = 6 * 60 * 60
+
+    def __init__(self, root: Union[str, Path], max_size: Optional[int] = None) -> None:
+        """
+        :param root: 缓存根目录
+        :param max_size: 容量上限（字节），None 表示不限制
+        """
+        self.root = Path(root)
+        self.max_size = max_size
+
+    def path(self, key: str) -> Path:
+        """获取条目目录（不存在时创建）"""
+        entry = self.root / key
+        entry.mkdir(parents=True, exist_ok=True)
+        return entry
+
+    def exists(self, key: str) -> bool:
+        return (self.root / key / self.META).is_file()
+
+    def _read_meta(self, entry: Path) -> Optional[dict]:
+        try:
+            with open(entry / self.META, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def touch(self, key: str, recount: bool = True, busy: bool = False) -> None:
+        """
+        标记条目被使用
+
+        :param key: 条目 key
+        :param recount: 是否重新统计条目大小，否则沿用上次记录
+        :param busy: 条目正在写入（例如打包进行中），其他进程淘汰时会跳过它
+        """
+        entry = self.path(key)
+        meta = None if recount else self._read_meta(entry)
+        size = meta.get("size", 0) if meta else dir_size(entry)
+
+        data = {"used": time.time(), "size": size}
+        if busy:
+            data["busy"] = True
+
+        with open(entry / self.META, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def _in_use(self, entry: Path) -> bool:
+        """条目是否正在写入：标记为 busy 或缺少元数据，且在宽限期内"""
+        meta = self._read_meta(entry)
+        if meta is not None and not meta.get("busy"):
+            return False
+
+        try:
+            changed = meta.get("used", 0.0) if meta else entry.stat().st_mtime
+        except OSError:
+            return False
+        return time.time() - changed < self.GRACE
+
+    def entries(self) -> list[tuple[str, float, int]]:
+        """返回 (key, 最近使用时间, 大小) 列表，按最近使用时间从旧到新排序"""
+        if not self.root.is_dir():
+            return []
+
+        result = []
+        for entry in self.root.iterdir():
+            if not entry.is_dir():
+                continue
+
+            meta = self._read_meta(entry)
+            if meta is None:
+                # 没有元数据的条目（例如中途失败）视为最旧，宽限期内的由 evict 跳过
+                result.append((entry.name, 0.0, dir_size(entry)))
+            else:
+                result.append((entry.name, meta.get("used", 0.0), meta.get("size", 0)))
+
+        return sorted(result, key=lambda item: item[1])
+
+    def size(self) -> int:
+        return sum(size for _, _, size in self.entries())
+
+    def remove(self, key: str) -> None:
+        shutil.rmtree(self.root / key, ignore_errors=True)
+
+    def evict(self, keep: Iterable[str] = ()) -> list[str]:
+        """
+        淘汰最久未使用的条目直到总大小不超过上限
+
+        :param keep: 不允许淘汰的条目 key
+        :return: 被淘汰的条目 key
+        """
+        if self.max_size is None:
+            return []
+
+        keep = set(keep)
+        entries = self.entries()
+        total = sum(size for _, _, size in entries)
+        removed = []
+
+        for key, _, size in entries:
+            if total <= self.max_size:
+                break
+            if key in keep or self._in_use(self.root / key):
+                continue
+
+            self.remove(key)
+            removed.append(key)
+            total -= size
+
+        return removed
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
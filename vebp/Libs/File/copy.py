@@ -0,0 +1,309 @@
+import errno
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+
+from vebp.Libs.File.tree import iter_tree
+
+# Linux FICLONE ioctl: _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+# 已确认不支持 reflink / copy_file_range 的 (源设备, 目标设备)
+_unsupported: dict[str, set[tuple[int, int]]] = {"reflink": set(), "copy_file_range": set()}
+
+# 不支持加速时回退的 errno
+_FALLBACK_ERRNOS = {
+    errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTTY,
+    errno.EBADF, errno.EPERM, getattr(errno, "ENOTSUP", errno.EOPNOTSUPP),
+}
+
+
+def _reflink(src: str, dst: str) -> None:
+    """克隆到目标旁的临时文件再替换目标，失败时不会留下被截断的目标文件"""
+    import fcntl
+
+    directory, name = os.path.split(os.path.abspath(dst))
+    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.{os.urandom(4).hex()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with open(src, "rb") as fsrc, open(fd, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        shutil.copystat(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _copy_file_range(src: str, dst: str, size: int) -> None:
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        remaining = size
+        while remaining > 0:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), min(remaining, 1 << 30))
+            if copied == 0:
+                break
+            remaining -= copied
+
+
+def copy_file(src: Union[str, Path], dst: Union[str, Path], allow_hardlink: bool = False) -> str:
+    """
+    复制单个文件并保留元数据，优先使用内核加速
+
+    同一文件系统上依次尝试 reflink、硬链接（需显式开启）和 copy_file_range，
+    全部不可用时回退到 shutil.copyfile。
+
+    :param src: 源文件
+    :param dst: 目标文件
+    :param allow_hardlink: 是否允许使用硬链接（目标与源共享内容）
+    :return: 实际使用的复制策略
+    """
+    src, dst = str(src), str(dst)
+    if os.path.isdir(dst):
+        raise IsADirectoryError(errno.EISDIR, "目标是已存在的目录, 无法复制文件", dst)
+
+    src_stat = os.stat(src)
+    dst_dev = os.stat(os.path.dirname(os.path.abspath(dst))).st_dev
+    devices = (src_stat.st_dev, dst_dev)
+    same_fs = src_stat.st_dev == dst_dev
+
+    if os.path.lexists(dst):
+        try:
+            if os.path.samefile(src, dst):
+                return "same"
+        except OSError:
+            pass
+
+        # 目标可能是硬链接，原地写入会改写其它链接的内容
+        if os.lstat(dst).st_nlink > 1:
+            os.remove(dst)
+
+    if sys.platform == "linux" and same_fs and devices not in _unsupported["reflink"]:
+        try:
+            _reflink(src, dst)
+            return "reflink"
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRNOS:
+                raise
+            _unsupported["reflink"].add(devices)
+
+    if allow_hardlink and same_fs:
+        try:
+            if os.path.lexists(dst):
+                os.remove(dst)
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            pass
+
+    if hasattr(os, "copy_file_range") and devices not in _unsupported["copy_file_range"]:
+        try:
+            _copy_file_range(src, dst, src_stat.st_size)
+            shutil.copystat(src, dst)
+            return "copy_file_range"
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRNOS:
+                raise
+            _unsupported["copy_file_range"].add(devices)
+
+    shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+    return "buffered"
+
+
+class CopyStats:
+    """复制进度与吞吐统计，线程安全"""
+
+    def __init__(self, total_files: int = 0, total_bytes: int = 0) -> None:
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.files = 0
+        self.bytes = 0
+        self.failed = 0
+        self.strategies: dict[str, int] = {}
+        self._start = time.perf_counter()
+        self._end: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, size: int, strategy: Optional[str]) -> None:
+        with self._lock:
+            if strategy is None:
+                self.failed += 1
+                return
+
+            self.files += 1
+            self.bytes += size
+            self.strategies[strategy] = self.strategies.get(strategy, 0) + 1
+
+    def finish(self) -> None:
+        self._end = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return (self._end or time.perf_counter()) - self._start
+
+    @property
+    def throughput(self) -> float:
+        """每秒复制字节数"""
+        elapsed = self.elapsed
+        return self.bytes / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        from vebp.Libs.String import format_size
+
+        strategies = ", ".join(f"{k}: {v}" for k, v in sorted(self.strategies.items()))
+        text = (f"复制 {self.files}/{self.total_files} 个文件 ({format_size(self.bytes)}), "
+                f"用时 {self.elapsed:.2f}s, {format_size(self.throughput)}/s")
+        return f"{text} [{strategies}]" if strategies else text
+
+
+class BulkCopier:
+    """
+    批量文件复制引擎
+
+    使用线程池并发复制大量小文件，每个文件通过 copy_file 选择最快的复制策略。
+    """
+
+    def __init__(self, jobs: Optional[int] = None, allow_hardlink: bool = False,
+                 progress: Optional[Callable[[CopyStats], None]] = None) -> None:
+        """
+        :param jobs: 线程数，默认按 CPU 核心数计算
+        :param allow_hardlink: 是否允许使用硬链接
+        :param progress: 每复制一个文件后调用的进度回调
+        """
+        self.jobs = jobs if jobs and jobs > 0 else min(32, (os.cpu_count() or 1) * 4)
+        self.allow_hardlink = allow_hardlink
+        self.progress = progress
+        self.stats = CopyStats()
+        # 复制失败的 (源文件, 目标文件)
+        self.failures: list[tuple[str, str]] = []
+
+    def _copy_one(self, src: str, dst: str, size: int) -> bool:
+        try:
+            strategy = copy_file(src, dst, self.allow_hardlink)
+        except OSError as e:
+            print(f"    复制文件失败: {src} -> {dst}: {str(e)}", file=sys.stderr)
+            self.failures.append((src, dst))
+            strategy = None
+
+        self.stats.record(size, strategy)
+        if self.progress:
+            self.progress(self.stats)
+        return strategy is not None
+
+    def copy_files(self, pairs: Iterable[tuple[Union[str, Path], Union[str, Path]]]) -> bool:
+        """
+        复制 (源文件, 目标文件) 列表，自动创建目标目录
+
+        :return: 全部复制成功时返回 True
+        """
+        return self._copy_jobs([(str(src), str(dst), os.path.getsize(src)) for src, dst in pairs])
+
+    def _copy_jobs(self, jobs: list[tuple[str, str, int]]) -> bool:
+        """复制 (源文件, 目标文件, 大小) 列表"""
+        dirs = {os.path.dirname(os.path.abspath(dst)) for _, dst, _ in jobs}
+        for directory in sorted(dirs):
+            os.makedirs(directory, exist_ok=True)
+
+        self.stats = CopyStats(len(jobs), sum(size for _, _, size in jobs))
+        self.failures = []
+
+        if len(jobs) <= 1 or self.jobs <= 1:
+            results = [self._copy_one(*job) for job in jobs]
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(self.jobs, len(jobs))) as executor:
+                results = list(executor.map(lambda job: self._copy_one(*job), jobs))
+
+        self.stats.finish()
+        return all(results)
+
+    @staticmethod
+    def _within(path: str, root: str) -> bool:
+        """真实路径 path 是否是 root 或在 root 之下"""
+        try:
+            return os.path.commonpath([path, root]) == root
+        except ValueError:
+            # Windows 上位于不同盘符
+            return False
+
+    @staticmethod
+    def _link_dir(src: str, dst: str) -> bool:
+        """
+        在目标位置重建指向目录的符号链接，替换上次复制留下的同名文件、目录或链接
+
+        :return: 创建失败 (如 Windows 没有创建符号链接的权限) 时返回 False
+        """
+        target = os.readlink(src)
+        if os.path.islink(dst):
+            if os.readlink(dst) == target:
+                return True
+            os.unlink(dst)
+        elif os.path.isdir(dst):
+            shutil.rmtree(dst)
+        elif os.path.lexists(dst):
+            os.remove(dst)
+
+        try:
+            os.symlink(target, dst, target_is_directory=True)
+        except OSError:
+            return False
+        return True
+
+    def copy_tree(self, src_dir: Union[str, Path], dst_dir: Union[str, Path],
+                  ignore: Optional[Callable[[str], bool]] = None) -> bool:
+        """
+        递归复制目录内容到目标目录（目标中已有的文件会被覆盖）
+
+        指向目录的符号链接: 相对链接且目标仍在源目录内时（如 macOS framework 的 Versions/Current）在目标中重建链接，
+        其余链接或无法创建链接时与 shutil.copytree(symlinks=False) 相同复制链接目标的内容。
+        指向文件的符号链接总是复制目标文件的内容。
+
+        :param src_dir: 源目录
+        :param dst_dir: 目标目录
+        :param ignore: 传入源路径，返回 True 时跳过该文件或目录
+        :return: 全部复制成功时返回 True
+        """
+        src_dir, dst_dir = str(src_dir), str(dst_dir)
+        os.makedirs(dst_dir, exist_ok=True)
+        root_real = os.path.realpath(src_dir)
+        jobs = []
+
+        # 遍历时已取得文件大小，无需再逐个 stat
+        exclude = (lambda _, entry: ignore(entry.path)) if ignore else None
+        # 需要复制内容的 (源目录, 目标目录)，符号链接的目标按内容复制时加入
+        roots = [(src_dir, dst_dir)]
+        while roots:
+            src_root, dst_root = roots.pop()
+            for entry in iter_tree(src_root, exclude, dirs=True):
+                dst = os.path.join(dst_root, *entry.relpath.split("/"))
+                if not entry.is_dir:
+                    jobs.append((entry.path, dst, entry.size))
+                    continue
+
+                if not os.path.islink(entry.path):
+                    os.makedirs(dst, exist_ok=True)
+                    continue
+
+                real = os.path.realpath(entry.path)
+                if self._within(real, root_real) and not os.path.isabs(os.readlink(entry.path)) and self._link_dir(entry.path, dst):
+                    continue
+
+                # 指向自身上级目录的链接按内容复制会无限递归
+                if self._within(os.path.realpath(os.path.dirname(entry.path)), real):
+                    print(f"    ⚠️ 跳过指向上级目录的符号链接: {entry.path}", file=sys.stderr)
+                    continue
+
+                if os.path.islink(dst):
+                    os.unlink(dst)
+                os.makedirs(dst, exist_ok=True)
+                roots.append((entry.path, dst))
+
+        return self._copy_jobs(jobs)
@@ -0,0 +1,240 @@
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+IGNORE_FILENAME = ".vebpignore"
+# 与 git 在 Windows 上的 core.ignorecase 默认值一致
+IGNORE_CASE = os.name == "nt"
+
+
+def _translate(glob: str) -> str:
+    """把 gitignore 的通配符转换为正则，* 和 ? 不匹配 /，** 匹配任意层目录"""
+    out = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = glob.find("]", i + 2 if glob[i + 1:i + 2] in ("!", "^") else i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+                continue
+            body = glob[i + 1:end]
+            if body[:1] in ("!", "^"):
+                body = "^" + body[1:]
+            out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+            i = end + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+class _Rule:
+    __slots__ = ("pattern", "negate", "dir_only", "regex")
+
+    def __init__(self, pattern: str, negate: bool, dir_only: bool, regex: str) -> None:
+        self.pattern = pattern
+        self.negate = negate
+        self.dir_only = dir_only
+        self.regex = regex
+
+
+class _Group:
+    """
+    连续的同类 (排除/重新包含) 规则
+
+    不含通配符的名称规则放入集合，"*.ext" 形式的规则放入后缀元组，其余规则合并成一个正则，
+    每个条目只需一次集合查找、一次 endswith 和一次正则匹配。
+    """
+
+    __slots__ = ("negate", "names", "dir_names", "suffixes", "dir_suffixes", "regex", "dir_regex")
+
+    def __init__(self, negate: bool, rules: list[_Rule], ignore_case: bool = False) -> None:
+        self.negate = negate
+        names, dir_names, suffixes, dir_suffixes, regexes, dir_regexes = set(), set(), [], [], [], []
+
+        for rule in rules:
+            p = rule.pattern.lower() if ignore_case else rule.pattern
+            if "/" not in p and not re.search(r"[*?\[\\]", p):
+                (dir_names if rule.dir_only else names).add(p)
+            elif "/" not in p and p.startswith("*.") and not re.search(r"[*?\[\\]", p[1:]):
+                (dir_suffixes if rule.dir_only else suffixes).append(p[1:])
+            else:
+                (dir_regexes if rule.dir_only else regexes).append(rule.regex)
+
+        self.names = frozenset(names)
+        self.dir_names = frozenset(dir_names)
+        self.suffixes = tuple(suffixes)
+        self.dir_suffixes = tuple(dir_suffixes)
+        flags = re.IGNORECASE if ignore_case else 0
+        self.regex = re.compile("|".join(regexes), flags) if regexes else None
+        self.dir_regex = re.compile("|".join(dir_regexes), flags) if dir_regexes else None
+
+    def match(self, relpath: str, name: str, is_dir: bool) -> bool:
+        if name in self.names or (self.suffixes and name.endswith(self.suffixes)):
+            return True
+        if self.regex is not None and self.regex.fullmatch(relpath):
+            return True
+
+        if not is_dir:
+            return False
+        if name in self.dir_names or (self.dir_suffixes and name.endswith(self.dir_suffixes)):
+            return True
+        return self.dir_regex is not None and self.dir_regex.fullmatch(relpath) is not None
+
+
+class IgnoreSpec:
+    """
+    .gitignore 风格的排除规则
+
+    规则在构造时编译一次。支持 # 注释、! 重新包含、结尾 / 只匹配目录、以 / 开头或中间含 / 时相对根目录匹配、
+    * ? [...] 和 **。与 git 相同，后面的规则优先，已被排除的目录中的文件无法再被重新包含，
+    因此配合 iter_tree 使用时被排除的目录整个跳过，不会进入。
+
+    用法示例:
+        spec = IgnoreSpec.load(plugin_dir, ["*.psd", "!keep.psd"], defaults=["__pycache__/"])
+        for entry in FolderStream(plugin_dir).iter_tree(spec.exclude):
+            ...
+    """
+
+    def __init__(self, patterns: Iterable[str] = (), ignore_case: bool = IGNORE_CASE) -> None:
+        """
+        :param patterns: 规则列表，格式与 .gitignore 的每一行相同
+        :param ignore_case: 是否不区分大小写，默认 Windows 上不区分
+        """
+        self.ignore_case = ignore_case
+        self.patterns: list[str] = []
+        self._rules: list[_Rule] = []
+        self._groups: list[_Group] = []
+        self.extend(patterns)
+
+    @classmethod
+    def load(cls, root: Union[str, Path], patterns: Optional[Iterable[str]] = None,
+             defaults: Iterable[str] = ()) -> "IgnoreSpec":
+        """
+        读取规则: 默认规则、root/.vebpignore、配置文件中的 exclude，后者优先
+
+        :param root: 规则相对的根目录
+        :param patterns: 配置文件中的 exclude 列表
+        :param defaults: 内置的默认规则，可以用 ! 重新包含
+        """
+        spec = cls(defaults)
+        ignore_file = Path(root) / IGNORE_FILENAME
+        try:
+            with open(ignore_file, "r", encoding="utf-8-sig") as f:
+                spec.extend(f.read().splitlines())
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠️ 读取 {ignore_file} 失败: {str(e)}")
+
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        spec.extend(patterns or [])
+        return spec
+
+    @staticmethod
+    def _compile(line: str) -> Optional[_Rule]:
+        # 行尾未转义的空格忽略
+        line = re.sub(r"(?<!\\)\s+$", "", line.rstrip("\r\n"))
+        if not line or line.startswith("#"):
+            return None
+
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith(("\\!", "\\#")):
+            line = line[1:]
+
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+
+        anchored = "/" in line
+        pattern = line.lstrip("/")
+        regex = _translate(pattern)
+        if not anchored:
+            regex = f"(?:.*/)?{regex}"
+        # 名称规则的快速路径按文件名匹配，需要保存未锚定的原始规则
+        return _Rule(pattern if not anchored else "/" + pattern, negate, dir_only, regex)
+
+    def extend(self, patterns: Iterable[str]) -> "IgnoreSpec":
+        """追加规则（优先级高于已有规则）"""
+        for line in patterns:
+            rule = self._compile(line)
+            if rule is not None:
+                self.patterns.append(line)
+                self._rules.append(rule)
+
+        self._groups = []
+        start = 0
+        for i in range(1, len(self._rules) + 1):
+            if i == len(self._rules) or self._rules[i].negate != self._rules[start].negate:
+                self._groups.append(_Group(self._rules[start].negate, self._rules[start:i], self.ignore_case))
+                start = i
+        return self
+
+    def __bool__(self) -> bool:
+        return bool(self._rules)
+
+    def match(self, relpath: str, is_dir: bool = False) -> bool:
+        """
+        条目自身是否被排除（不检查上级目录，遍历时上级目录已经检查过）
+
+        :param relpath: 相对根目录的路径，使用 / 分隔
+        :param is_dir: 是否是目录
+        """
+        name = relpath.rsplit("/", 1)[-1]
+        if self.ignore_case:
+            name = name.lower()
+        for group in reversed(self._groups):
+            if group.match(relpath, name, is_dir):
+                return not group.negate
+        return False
+
+    def match_path(self, relpath: Union[str, Path], is_dir: bool = False) -> bool:
+        """
+        路径或其任意上级目录是否被排除，用于不经过遍历的单个路径
+
+        :param relpath: 相对根目录的路径
+        :param is_dir: 最后一级是否是目录
+        """
+        parts = Path(relpath).as_posix().strip("/").split("/")
+        for i in range(1, len(parts) + 1):
+            if self.match("/".join(parts[:i]), is_dir or i < len(parts)):
+                return True
+        return False
+
+    def exclude(self, relpath: str, entry: os.DirEntry) -> bool:
+        """iter_tree 的 exclude 回调"""
+        return self.match(relpath, entry.is_dir())
+
+    def under(self, prefix: str):
+        """
+        返回在子目录中遍历时使用的 exclude 回调: 相对路径加上 prefix 后再匹配
+
+        :param prefix: 遍历起点相对规则根目录的路径，空字符串表示就是根目录
+        """
+        prefix = prefix.strip("/")
+        if not prefix:
+            return self.exclude
+        prefix += "/"
+        return lambda relpath, entry: self.match(prefix + relpath, entry.is_dir())
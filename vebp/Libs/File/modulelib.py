@@ -1,12 +1,13 @@
 ﻿import importlib.util
 import sys
+import zipimport
 from pathlib import Path
 from typing import Union
 
 
 class ModuleLoader:
     def __init__(self, package_path: Union[Path, str], package_name: str, main_module_name: str) -> None:
-        self.package_path = package_path
+        self.package_path = Path(package_path)
         self.package_name = package_name
         self.main_module_name = main_module_name
 
@@ -32,18 +33,27 @@ class ModuleLoader:
 
         # 3. 加载主模块
         entry_file = self.package_path / self.main_module_name
-        if not entry_file.exists():
-            # 清理包模块
-            del sys.modules[self.package_name]
-            raise FileNotFoundError(f"入口文件 {self.main_module_name} 不存在")
-
-        # 创建主模块规范
         main_module_name = f"{self.package_name}.main"
-        spec = importlib.util.spec_from_file_location(
-            main_module_name,
-            str(entry_file),
-            submodule_search_locations=[str(self.package_path)],
-        )
+
+        if self.package_path.is_file():
+            # zip 包直接通过 zipimport 导入，子模块由 __path__ 中的 zip 路径解析
+            try:
+                spec = self._zip_spec(main_module_name, entry_file)
+            except (zipimport.ZipImportError, FileNotFoundError):
+                del sys.modules[self.package_name]
+                raise
+        else:
+            if not entry_file.exists():
+                # 清理包模块
+                del sys.modules[self.package_name]
+                raise FileNotFoundError(f"入口文件 {self.main_module_name} 不存在")
+
+            # 创建主模块规范
+            spec = importlib.util.spec_from_file_location(
+                main_module_name,
+                str(entry_file),
+                submodule_search_locations=[str(self.package_path)],
+            )
         if spec is None:
             # 清理包模块
             del sys.modules[self.package_name]
@@ -67,5 +77,15 @@ class ModuleLoader:
 
         return main_module
 
+    def _zip_spec(self, main_module_name: str, entry_file: Path):
+        importer = zipimport.zipimporter(str(self.package_path))
+        entry_name = Path(self.main_module_name).stem
+
+        if importer.find_spec(entry_name) is None:
+            raise FileNotFoundError(f"入口文件 {self.main_module_name} 不存在")
+
+        # zipimporter 按完整模块名的最后一段查找，因此可以直接作为 plugin_x.main 的加载器
+        return importlib.util.spec_from_loader(main_module_name, importer, origin=str(entry_file))
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         return False
\ No newline at end of file
@@ -0,0 +1,244 @@
+import hashlib
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from vebp.Libs.File import FileStream, FolderStream
+from vebp.Libs.File.copy import BulkCopier
+from vebp.Libs.String import format_size
+
+
+class SyncStats:
+    """同步统计：复制、跳过和删除的文件数与字节数"""
+
+    def __init__(self) -> None:
+        self.copied_files = 0
+        self.copied_bytes = 0
+        self.skipped_files = 0
+        self.skipped_bytes = 0
+        self.deleted_files = 0
+
+    def summary(self) -> str:
+        return (f"复制 {self.copied_files} 个文件 ({format_size(self.copied_bytes)}), "
+                f"跳过 {self.skipped_files} 个文件 ({format_size(self.skipped_bytes)}), "
+                f"删除 {self.deleted_files} 个文件")
+
+
+class FolderSync:
+    """
+    增量目录同步
+
+    对比源文件与索引中记录的 size、mtime（可选内容哈希），只复制新增或变化的文件，
+    并删除源中已不存在的文件。
+    """
+
+    VERSION = 1
+
+    def __init__(self, index_path: Union[str, Path], use_hash: bool = False,
+                 copier: Optional[BulkCopier] = None) -> None:
+        """
+        :param index_path: 同步索引文件路径
+        :param use_hash: stat 不一致时是否比较内容哈希
+        :param copier: 用于并发复制变化文件的复制引擎
+        """
+        self.index_path = Path(index_path)
+        self.use_hash = use_hash
+        self.copier = copier or BulkCopier()
+        self.stats = SyncStats()
+
+        self._index: dict[str, list] = self._load()
+
+    def _load(self) -> dict[str, Any]:
+        f = FileStream(self.index_path)
+        if not f.exists:
+            return {}
+
+        try:
+            data = f.read_json()
+        except (ValueError, OSError):
+            return {}
+
+        if data.get("version") != self.VERSION:
+            return {}
+        return data.get("files", {})
+
+    def save(self) -> None:
+        FolderStream(self.index_path.parent).create()
+        FileStream(self.index_path).write_json({
+            "version": self.VERSION,
+            "files": self._index,
+        })
+
+    @staticmethod
+    def _hash(path: Union[str, Path]) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _is_current(self, src: str, src_stat: os.stat_result, dst: str) -> tuple[bool, Optional[str]]:
+        """判断目标文件是否已是最新，返回 (是否最新, 源文件哈希)"""
+        try:
+            dst_stat = os.stat(dst)
+        except FileNotFoundError:
+            return False, None
+
+        record = self._index.get(dst)
+        src_key = [src_stat.st_size, src_stat.st_mtime_ns]
+        dst_key = [dst_stat.st_size, dst_stat.st_mtime_ns]
+
+        if record:
+            if record[2] != dst_key:
+                return False, None
+            if record[0] == src_key:
+                return True, record[1]
+            if self.use_hash and record[1] and src_stat.st_size == dst_stat.st_size:
+                digest = self._hash(src)
+                return digest == record[1], digest
+            return False, None
+
+        # 没有索引记录时退化为 size + mtime 比较（copy2 会保留 mtime）
+        if src_key == dst_key:
+            return True, self._hash(src) if self.use_hash else None
+        return False, None
+
+    def _record(self, src: str, src_stat: os.stat_result, dst: str, digest: Optional[str]) -> None:
+        dst_stat = os.stat(dst)
+        self._index[dst] = [
+            [src_stat.st_size, src_stat.st_mtime_ns],
+            digest,
+            [dst_stat.st_size, dst_stat.st_mtime_ns],
+        ]
+
+    def _check(self, src: str, dst: str) -> Optional[tuple[str, os.stat_result, str, Optional[str]]]:
+        """检查单个文件，已是最新时记录跳过并返回 None，否则返回待复制的条目"""
+        src_stat = os.stat(src)
+
+        current, digest = self._is_current(src, src_stat, dst)
+        if current:
+            self.stats.skipped_files += 1
+            self.stats.skipped_bytes += src_stat.st_size
+            self._record(src, src_stat, dst, digest)
+            return None
+
+        if os.path.isdir(dst):
+            self._remove(dst)
+        return src, src_stat, dst, digest
+
+    def _copy(self, pending: list[tuple[str, os.stat_result, str, Optional[str]]]) -> bool:
+        """并发复制变化的文件并更新索引"""
+        if not pending:
+            return True
+
+        success = self.copier.copy_files((src, dst) for src, _, dst, _ in pending)
+        failures = set(self.copier.failures)
+
+        for src, src_stat, dst, digest in pending:
+            if (src, dst) in failures:
+                self._index.pop(dst, None)
+                continue
+
+            if self.use_hash and digest is None:
+                digest = self._hash(src)
+
+            self.stats.copied_files += 1
+            self.stats.copied_bytes += src_stat.st_size
+            self._record(src, src_stat, dst, digest)
+
+        return success
+
+    def sync_file(self, src: Union[str, Path], dst: Union[str, Path]) -> bool:
+        """同步单个文件，失败时返回 False"""
+        item = self._check(str(src), str(dst))
+        return self._copy([item]) if item else True
+
+    def _remove(self, path: str) -> None:
+        if os.path.isdir(path) and not os.path.islink(path):
+            for root, _, files in os.walk(path):
+                for name in files:
+                    self._index.pop(os.path.join(root, name), None)
+                    self.stats.deleted_files += 1
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+            self._index.pop(path, None)
+            self.stats.deleted_files += 1
+
+    @staticmethod
+    def _walk(src_dir: str, exclude: Optional[Callable[[str, os.DirEntry], bool]]):
+        """
+        与 os.walk 相同的自顶向下遍历（不进入指向目录的符号链接），同时应用排除回调
+
+        :return: (相对路径, 目录, 子目录名列表, 文件名列表) 迭代器
+        """
+        stack = [""]
+        while stack:
+            relative = stack.pop()
+            root = os.path.join(src_dir, relative) if relative else src_dir
+            try:
+                with os.scandir(root) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+
+            dirs, files, walk = [], [], []
+            prefix = relative.replace(os.sep, "/") + "/" if relative else ""
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if exclude is not None and exclude(prefix + entry.name, entry):
+                    continue
+
+                if is_dir:
+                    dirs.append(entry.name)
+                    if not entry.is_symlink():
+                        walk.append(os.path.join(relative, entry.name))
+                else:
+                    files.append(entry.name)
+
+            yield relative or ".", root, dirs, files
+            stack.extend(reversed(walk))
+
+    def sync_tree(self, src_dir: Union[str, Path], dst_dir: Union[str, Path],
+                  exclude: Optional[Callable[[str, os.DirEntry], bool]] = None) -> bool:
+        """
+        将源目录同步到目标目录
+
+        :param src_dir: 源目录
+        :param dst_dir: 目标目录
+        :param exclude: 与 iter_tree 相同的排除回调，被排除的文件和目录视为源中不存在，目标中已有的会被删除
+        :return: 全部文件同步成功时返回 True
+        """
+        src_dir, dst_dir = str(src_dir), str(dst_dir)
+        success = True
+        pending = []
+
+        for relative, root, dirs, files in self._walk(src_dir, exclude):
+            dest_root = os.path.normpath(os.path.join(dst_dir, relative))
+
+            if os.path.isfile(dest_root):
+                self._remove(dest_root)
+            FolderStream(dest_root).create()
+
+            # 删除源中已不存在的文件和目录
+            expected = set(dirs) | set(files)
+            with os.scandir(dest_root) as entries:
+                stale = [entry.path for entry in entries if entry.name not in expected]
+            for path in stale:
+                self._remove(path)
+
+            for name in files:
+                try:
+                    item = self._check(os.path.join(root, name), os.path.join(dest_root, name))
+                    if item:
+                        pending.append(item)
+                except OSError as e:
+                    print(f"    同步文件失败: {os.path.join(root, name)}: {str(e)}", file=sys.stderr)
+                    success = False
+
+        return self._copy(pending) and success
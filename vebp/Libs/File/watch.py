@@ -0,0 +1,227 @@
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+# inotify 事件掩码 (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+               | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT = struct.Struct("iIII")
+
+
+def _tree_dirs(root: Path) -> list[Path]:
+    return [Path(current) for current, _, _ in os.walk(root)]
+
+
+class PollingWatcher:
+    """通过定期比较 stat 快照 (mtime, size) 检测文件变化，适用于所有平台"""
+
+    def __init__(self, interval: float = 0.5) -> None:
+        """
+        :param interval: 两次扫描的间隔（秒）
+        """
+        self.interval = interval
+        self._files: list[Path] = []
+        self._trees: list[Path] = []
+        self._snapshot: dict[Path, Optional[tuple[int, int]]] = {}
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _scan(self) -> dict[Path, Optional[tuple[int, int]]]:
+        snapshot = {path: self._stat(path) for path in self._files}
+        for root in self._trees:
+            for current, _, names in os.walk(root):
+                for name in names:
+                    path = Path(current) / name
+                    snapshot[path] = self._stat(path)
+        return snapshot
+
+    def watch(self, files: Iterable[Path], trees: Iterable[Path]) -> None:
+        """
+        设置要监视的文件和目录树（替换之前的设置）
+
+        :param files: 单个文件，不存在的文件会在创建时报告
+        :param trees: 递归监视的目录
+        """
+        self._files = [Path(p) for p in files]
+        self._trees = [Path(p) for p in trees]
+        self._snapshot = self._scan()
+
+    def poll(self, timeout: Optional[float] = None) -> set[Path]:
+        """
+        等待文件变化
+
+        :param timeout: 最长等待时间（秒），None 表示一直等待
+        :return: 发生变化的路径，超时返回空集合
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait = self.interval if deadline is None else min(self.interval, max(0.0, deadline - time.monotonic()))
+            time.sleep(wait)
+
+            snapshot = self._scan()
+            changed = {path for path in snapshot.keys() | self._snapshot.keys()
+                       if snapshot.get(path) != self._snapshot.get(path)}
+            self._snapshot = snapshot
+
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """通过 ctypes 调用 Linux inotify 监视目录，事件到达时立即返回"""
+
+    def __init__(self) -> None:
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+
+        self._wds: dict[int, Path] = {}
+        self._dirs: dict[Path, int] = {}
+
+    def _add(self, directory: Path) -> None:
+        if directory in self._dirs:
+            return
+
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd >= 0:
+            self._wds[wd] = directory
+            self._dirs[directory] = wd
+
+    def _remove(self, directory: Path) -> None:
+        wd = self._dirs.pop(directory, None)
+        if wd is not None:
+            self._libc.inotify_rm_watch(self._fd, wd)
+            self._wds.pop(wd, None)
+
+    def watch(self, files: Iterable[Path], trees: Iterable[Path]) -> None:
+        """
+        设置要监视的文件和目录树（替换之前的设置）
+
+        inotify 监视文件所在的目录而不是文件本身，编辑器先写临时文件再重命名时也能收到事件。
+        """
+        wanted = set()
+        for path in files:
+            parent = Path(path).parent
+            if parent.is_dir():
+                wanted.add(parent)
+        for root in trees:
+            if Path(root).is_dir():
+                wanted.update(_tree_dirs(Path(root)))
+
+        for directory in set(self._dirs) - wanted:
+            self._remove(directory)
+        for directory in wanted:
+            self._add(directory)
+
+    def poll(self, timeout: Optional[float] = None) -> set[Path]:
+        """
+        等待文件变化
+
+        :param timeout: 最长等待时间（秒），None 表示一直等待
+        :return: 发生变化的路径（事件队列溢出时包含被监视的目录本身），超时返回空集合
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                # 事件丢失，报告所有被监视的目录
+                changed.update(self._dirs)
+                continue
+
+            directory = self._wds.get(wd)
+            if directory is None:
+                continue
+
+            if mask & IN_IGNORED:
+                self._wds.pop(wd, None)
+                self._dirs.pop(directory, None)
+                continue
+
+            changed.add(directory / os.fsdecode(name) if name else directory)
+
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(polling: bool = False, interval: float = 0.5) -> Union[InotifyWatcher, PollingWatcher]:
+    """
+    创建文件监视器，Linux 上优先使用 inotify，不可用时回退到轮询
+
+    :param polling: 强制使用轮询
+    :param interval: 轮询间隔（秒）
+    """
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(interval)
+
+
+def wait_for_changes(watcher: Union[InotifyWatcher, PollingWatcher], debounce: float = 0.3) -> set[Path]:
+    """
+    阻塞直到有文件变化，并合并随后 debounce 秒内的连续变化
+
+    :param watcher: 文件监视器
+    :param debounce: 静默多少秒后认为一批变化结束
+    :return: 本批次所有发生变化的路径
+    """
+    changed = set()
+    while not changed:
+        changed = watcher.poll(None)
+
+    while True:
+        more = watcher.poll(debounce)
+        if not more:
+            return changed
+        changed |= more
@@ -1,6 +1,15 @@
-﻿import tempfile
+﻿import hashlib
+import importlib.machinery
+import os
+import shutil
+import stat
+import struct
+import tempfile
+import time
 import zipfile
+import zlib
 from pathlib import Path
+from typing import BinaryIO, Iterable, Optional, Union
 
 
 class ZipContent:
@@ -34,4 +43,381 @@ class ZipContent:
         退出上下文时自动清理临时目录
         """
         if self.temp_dir:
-            self.temp_dir.cleanup()
\ No newline at end of file
+            self.temp_dir.cleanup()
+
+
+def is_native(name: str) -> bool:
+    """判断 zip 成员是否为无法通过 zipimport 导入的原生扩展"""
+    return name.endswith(tuple(importlib.machinery.EXTENSION_SUFFIXES)) or name.endswith((".dll", ".so", ".dylib"))
+
+
+def zip_member_hash(infos: Iterable[zipfile.ZipInfo]) -> str:
+    """根据中央目录中的文件名、CRC 和大小计算内容哈希，无需解压"""
+    h = hashlib.sha256()
+    for info in sorted(infos, key=lambda i: i.filename):
+        h.update(f"{info.filename}\0{info.CRC}\0{info.file_size}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+class ZipExtractCache:
+    """
+    zip 内容的持久解压缓存
+
+    条目按成员哈希命名，内容不变时直接复用已解压的目录，只在首次使用时解压一次。
+    """
+
+    def __init__(self, root: Union[str, Path]) -> None:
+        """
+        :param root: 缓存根目录
+        """
+        self.root = Path(root)
+
+    def extract(self, zip_file: zipfile.ZipFile, prefix: str = "", name: Optional[str] = None) -> Path:
+        """
+        解压 zip 中 prefix 下的成员（去掉 prefix）到缓存目录
+
+        :param zip_file: 已打开的 zip 文件
+        :param prefix: 成员前缀，例如 "dependencies/numpy/"
+        :param name: 缓存条目名前缀，默认取 zip 文件名
+        :return: 解压后的目录
+        """
+        infos = [i for i in zip_file.infolist() if i.filename.startswith(prefix) and not i.is_dir()]
+        name = name or Path(str(zip_file.filename)).stem
+        target = self.root / f"{name}-{zip_member_hash(infos)[:16]}"
+
+        if target.is_dir():
+            return target
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".extract-", dir=self.root))
+        try:
+            for info in infos:
+                relative = info.filename[len(prefix):]
+                destination = staging.joinpath(*relative.split("/"))
+                if not destination.resolve().is_relative_to(staging.resolve()):
+                    raise ValueError(f"非法的 zip 成员路径: {info.filename}")
+
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                with zip_file.open(info) as src, open(destination, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+
+                mode = info.external_attr >> 16
+                if mode:
+                    os.chmod(destination, mode & 0o777)
+
+            try:
+                os.rename(staging, target)
+            except OSError:
+                # 其它进程已经完成了同一条目的解压
+                if not target.is_dir():
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        return target
+
+
+# 已经压缩过的文件类型，再 deflate 只会浪费 CPU
+STORED_SUFFIXES = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico",
+    ".zip", ".whl", ".egg", ".jar", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".zst",
+    ".so", ".pyd", ".dll", ".dylib",
+    ".mp3", ".mp4", ".ogg", ".woff", ".woff2",
+})
+
+_ZIP64_LIMIT = 0xFFFFFFFF
+# 32 位字段的占位值，表示真实值在 Zip64 扩展字段中
+_ZIP64_MARKER = 0xFFFFFFFF
+_CHUNK = 1024 * 1024
+# 单个条目在内存中缓冲的最大压缩数据量，超过后写入临时文件
+_SPOOL_SIZE = 16 * 1024 * 1024
+# 已提交压缩但尚未写入归档的条目最多占用的内存缓冲
+_WINDOW_SIZE = 64 * 1024 * 1024
+
+
+class _CompressedEntry:
+    """线程池中压缩完成、等待按顺序写入的条目"""
+
+    def __init__(self, arcname: str, data: BinaryIO, method: int, crc: int,
+                 size: int, compressed_size: int, mode: int, date_time: tuple) -> None:
+        self.arcname = arcname
+        self.data = data
+        self.method = method
+        self.crc = crc
+        self.size = size
+        self.compressed_size = compressed_size
+        self.mode = mode
+        self.date_time = date_time
+
+
+class ZipStreamWriter:
+    """
+    流式 zip 写入器
+
+    直接从源文件读取，每个条目在线程池中独立压缩，再按添加顺序写入归档，无需先复制到临时目录。
+    已压缩的文件类型和压缩后没有变小的条目以 STORED 方式存储，超过 4 GiB 的条目和归档自动使用 Zip64。
+    """
+
+    def __init__(self, path: Union[str, Path], level: int = 6, jobs: Optional[int] = None,
+                 stored_suffixes: Iterable[str] = STORED_SUFFIXES, reproducible: bool = False) -> None:
+        """
+        :param path: 输出的 zip 文件路径
+        :param level: deflate 压缩级别 (0-9)，0 表示全部存储不压缩
+        :param jobs: 压缩线程数，默认按 CPU 核心数计算
+        :param stored_suffixes: 直接存储不压缩的文件后缀
+        :param reproducible: 使用固定的时间戳 (SOURCE_DATE_EPOCH 或 1980-01-01) 和规范化的权限 (644/755)，
+                             相同的输入总是生成逐字节相同的归档
+        """
+        if not 0 <= level <= 9:
+            raise ValueError(f"无效的压缩级别: {level} (可选: 0-9)")
+
+        self.path = Path(path)
+        self.level = level
+        self.jobs = jobs if jobs and jobs > 0 else min(32, os.cpu_count() or 1)
+        self.stored_suffixes = frozenset(suffix.lower() for suffix in stored_suffixes)
+        self.reproducible = reproducible
+        self._fixed_time = self._date_time(float(os.environ.get("SOURCE_DATE_EPOCH", 0)), utc=True) \
+            if reproducible else None
+
+        self.files = 0
+        self.stored = 0
+        self.bytes = 0
+        self.compressed_bytes = 0
+
+        self._fp = open(self.path, "wb")
+        self._central: list[bytes] = []
+        self._names: set[str] = set()
+        self._start = time.perf_counter()
+
+    def __enter__(self) -> "ZipStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._fp.close()
+
+    @staticmethod
+    def _date_time(mtime: float, utc: bool = False) -> tuple:
+        # zip 的 DOS 时间戳只能表示 1980 年之后
+        return max((time.gmtime if utc else time.localtime)(mtime)[:6], (1980, 1, 1, 0, 0, 0))
+
+    def _entry_meta(self, mode: int, mtime: float) -> tuple[int, tuple]:
+        """返回写入归档的 (权限, 时间戳)"""
+        if self.reproducible:
+            return (0o755 if mode & 0o111 else 0o644), self._fixed_time
+        return mode, self._date_time(mtime)
+
+    def _compress(self, source: Path, arcname: str) -> _CompressedEntry:
+        st = os.stat(source)
+        out = tempfile.SpooledTemporaryFile(max_size=_SPOOL_SIZE)
+        crc = 0
+        stored = self.level == 0 or source.suffix.lower() in self.stored_suffixes
+
+        compressor = None if stored else zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        with open(source, "rb") as f:
+            while chunk := f.read(_CHUNK):
+                crc = zlib.crc32(chunk, crc)
+                out.write(chunk if compressor is None else compressor.compress(chunk))
+        if compressor is not None:
+            out.write(compressor.flush())
+
+        size = st.st_size
+        compressed_size = out.tell()
+
+        # 压缩后没有变小（已压缩的数据或很小的文件）时改为直接存储
+        if compressor is not None and compressed_size >= size:
+            out.close()
+            out = tempfile.SpooledTemporaryFile(max_size=_SPOOL_SIZE)
+            with open(source, "rb") as f:
+                shutil.copyfileobj(f, out, _CHUNK)
+            compressor = None
+            compressed_size = out.tell()
+
+        out.seek(0)
+        method = zipfile.ZIP_STORED if compressor is None else zipfile.ZIP_DEFLATED
+        return _CompressedEntry(arcname, out, method, crc, size, compressed_size,
+                                *self._entry_meta(stat.S_IMODE(st.st_mode), st.st_mtime))
+
+    def _write(self, entry: _CompressedEntry) -> None:
+        if entry.arcname in self._names:
+            raise ValueError(f"重复的 zip 成员: {entry.arcname}")
+        self._names.add(entry.arcname)
+
+        name = entry.arcname.encode("utf-8")
+        offset = self._fp.tell()
+        zip64 = entry.size >= _ZIP64_LIMIT or entry.compressed_size >= _ZIP64_LIMIT
+        version = 45 if zip64 or offset >= _ZIP64_LIMIT else 20
+
+        year, month, day, hour, minute, second = entry.date_time
+        dos_time = hour << 11 | minute << 5 | second // 2
+        dos_date = (year - 1980) << 9 | month << 5 | day
+        # bit 11: 文件名使用 UTF-8 编码
+        flags = 0x800
+
+        if zip64:
+            local_extra = struct.pack("<HHQQ", 1, 16, entry.size, entry.compressed_size)
+            local_sizes = (_ZIP64_MARKER, _ZIP64_MARKER)
+        else:
+            local_extra = b""
+            local_sizes = (entry.compressed_size, entry.size)
+
+        self._fp.write(struct.pack("<IHHHHHIIIHH", 0x04034B50, version, flags, entry.method, dos_time, dos_date,
+                                   entry.crc, *local_sizes, len(name), len(local_extra)))
+        self._fp.write(name)
+        self._fp.write(local_extra)
+        shutil.copyfileobj(entry.data, self._fp, _CHUNK)
+        entry.data.close()
+
+        # 中央目录中只有超出 32 位的字段放入 Zip64 扩展字段
+        extra_fields = []
+        sizes = [entry.compressed_size, entry.size]
+        if entry.size >= _ZIP64_LIMIT:
+            extra_fields.append(entry.size)
+            sizes[1] = _ZIP64_MARKER
+        if entry.compressed_size >= _ZIP64_LIMIT:
+            extra_fields.append(entry.compressed_size)
+            sizes[0] = _ZIP64_MARKER
+        header_offset = offset
+        if offset >= _ZIP64_LIMIT:
+            extra_fields.append(offset)
+            header_offset = _ZIP64_MARKER
+        extra = struct.pack(f"<HH{len(extra_fields)}Q", 1, 8 * len(extra_fields), *extra_fields) if extra_fields else b""
+
+        # 创建系统为 Unix (3)，外部属性高 16 位为文件权限
+        self._central.append(struct.pack(
+            "<IHHHHHHIIIHHHHHII", 0x02014B50, 3 << 8 | version, version, flags, entry.method, dos_time, dos_date,
+            entry.crc, *sizes, len(name), len(extra), 0, 0, 0, (stat.S_IFREG | entry.mode) << 16, header_offset,
+        ) + name + extra)
+
+        self.files += 1
+        self.bytes += entry.size
+        self.compressed_bytes += entry.compressed_size
+        if entry.method == zipfile.ZIP_STORED:
+            self.stored += 1
+
+    def add_files(self, entries: Iterable[tuple[Union[str, Path], str]]) -> None:
+        """
+        添加文件，压缩并发进行，写入顺序与 entries 的顺序一致
+
+        :param entries: (源文件, 归档内路径) 列表
+        """
+        entries = [(Path(source), arcname.replace(os.sep, "/")) for source, arcname in entries]
+        if not entries:
+            return
+
+        if self.jobs <= 1 or len(entries) == 1:
+            for source, arcname in entries:
+                self._write(self._compress(source, arcname))
+            return
+
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+
+        # 按条目数量和内存缓冲的字节数限制已提交但尚未写入的条目，
+        # 超过 _SPOOL_SIZE 的条目写入临时文件，只按 _SPOOL_SIZE 计入
+        window = self.jobs * 4
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            pending = deque()
+            buffered = 0
+            try:
+                for source, arcname in entries:
+                    try:
+                        cost = min(os.stat(source).st_size, _SPOOL_SIZE)
+                    except OSError:
+                        cost = 0
+                    while pending and (len(pending) >= window or buffered + cost > _WINDOW_SIZE):
+                        future, done = pending.popleft()
+                        buffered -= done
+                        self._write(future.result())
+                    pending.append((executor.submit(self._compress, source, arcname), cost))
+                    buffered += cost
+                while pending:
+                    self._write(pending.popleft()[0].result())
+            finally:
+                for future, _ in pending:
+                    future.cancel()
+
+    def add_zip(self, source: Union[str, Path], prefix: str = "", exclude: Iterable[str] = ()) -> None:
+        """
+        原样复制另一个 zip 中已压缩的成员，不解压也不重新压缩
+
+        :param source: 来源 zip 文件
+        :param prefix: 加在成员路径前的前缀，例如 "dependencies/requests/"
+        :param exclude: 跳过的归档内路径（加上前缀之后）
+        """
+        exclude = set(exclude)
+        with zipfile.ZipFile(source, "r") as z, open(source, "rb") as f:
+            for info in z.infolist():
+                arcname = prefix + info.filename
+                if info.is_dir() or arcname in exclude:
+                    continue
+                if info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED) or info.flag_bits & 0x1:
+                    raise ValueError(f"不支持直接复制的 zip 成员: {info.filename}")
+
+                # 跳过本地文件头，文件名和扩展字段的长度以本地文件头中的为准
+                f.seek(info.header_offset + 26)
+                name_length, extra_length = struct.unpack("<HH", f.read(4))
+                f.seek(name_length + extra_length, os.SEEK_CUR)
+
+                out = tempfile.SpooledTemporaryFile(max_size=_SPOOL_SIZE)
+                remaining = info.compress_size
+                while remaining > 0:
+                    chunk = f.read(min(_CHUNK, remaining))
+                    if not chunk:
+                        raise ValueError(f"zip 成员数据不完整: {info.filename}")
+                    out.write(chunk)
+                    remaining -= len(chunk)
+                out.seek(0)
+
+                mode = stat.S_IMODE(info.external_attr >> 16) or 0o644
+                self._write(_CompressedEntry(arcname, out, info.compress_type, info.CRC, info.file_size,
+                                             info.compress_size,
+                                             *self._entry_meta(mode, time.mktime(info.date_time + (0, 0, -1)))))
+
+    def add_bytes(self, arcname: str, data: bytes, mode: int = 0o644) -> None:
+        """添加内存中的数据"""
+        compressed = zlib.compressobj(self.level, zlib.DEFLATED, -15) if self.level else None
+        payload = compressed.compress(data) + compressed.flush() if compressed else data
+        method = zipfile.ZIP_DEFLATED
+        if compressed is None or len(payload) >= len(data):
+            payload, method = data, zipfile.ZIP_STORED
+
+        out = tempfile.SpooledTemporaryFile(max_size=_SPOOL_SIZE)
+        out.write(payload)
+        out.seek(0)
+        self._write(_CompressedEntry(arcname, out, method, zlib.crc32(data), len(data), len(payload),
+                                     *self._entry_meta(mode, time.time())))
+
+    def close(self, comment: bytes = b"") -> None:
+        """写入中央目录并关闭文件"""
+        if self._fp.closed:
+            return
+
+        cd_offset = self._fp.tell()
+        for record in self._central:
+            self._fp.write(record)
+        cd_size = self._fp.tell() - cd_offset
+        count = len(self._central)
+
+        if count >= 0xFFFF or cd_offset >= _ZIP64_LIMIT or cd_size >= _ZIP64_LIMIT:
+            eocd64_offset = self._fp.tell()
+            self._fp.write(struct.pack("<IQHHIIQQQQ", 0x06064B50, 44, 3 << 8 | 45, 45, 0, 0,
+                                       count, count, cd_size, cd_offset))
+            self._fp.write(struct.pack("<IIQI", 0x07064B50, 0, eocd64_offset, 1))
+            count = min(count, 0xFFFF)
+            cd_size = cd_size if cd_size < _ZIP64_LIMIT else _ZIP64_MARKER
+            cd_offset = cd_offset if cd_offset < _ZIP64_LIMIT else _ZIP64_MARKER
+
+        comment = comment[:0xFFFF]
+        self._fp.write(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, count, count, cd_size, cd_offset, len(comment)))
+        self._fp.write(comment)
+        self._fp.close()
+
+    def summary(self) -> str:
+        from vebp.Libs.String import format_size
+
+        ratio = self.compressed_bytes / self.bytes * 100 if self.bytes else 100.0
+        return (f"写入 {self.files} 个文件 ({format_size(self.bytes)} -> {format_size(self.compressed_bytes)}, "
+                f"{ratio:.0f}%), 直接存储 {self.stored} 个, 用时 {time.perf_counter() - self._start:.2f}s")
@@ -29,4 +29,13 @@ def get_fs(s: str, context: dict) -> str:
         # 替换已知占位符，未知保留原样
         return str(context.get(placeholder, match.group(2)))
 
-    return re.sub(pattern, replace, s)
\ No newline at end of file
+    return re.sub(pattern, replace, s)
+
+
+def format_size(size: float) -> str:
+    """将字节数格式化为易读的字符串"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
@@ -0,0 +1,277 @@
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+from vebp.Libs.File import FileStream
+
+_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+_EXTRA_MARKER = re.compile(r"""\bextra\s*==""")
+
+
+def normalize_name(name: str) -> str:
+    """按 PEP 503 规范化分发包名: 不区分大小写, 连续的 - _ . 视为同一个分隔符"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def parse_requirement(line: str) -> Optional[tuple[str, str, str]]:
+    """
+    拆分一条需求 (requirements.txt 的一行或 Requires-Dist)
+
+    :return: (包名, 版本约束, 环境标记)，不是有效需求时返回 None
+    """
+    line = line.split(" #", 1)[0].strip()
+    if not line or line.startswith(("#", "-")):
+        return None
+
+    requirement, _, marker = line.partition(";")
+    match = _NAME.match(requirement)
+    if not match:
+        return None
+
+    spec = requirement[match.end():].strip()
+    # 去掉 extras: name[a,b]
+    if spec.startswith("["):
+        spec = spec[spec.find("]") + 1:].strip()
+    return match.group(1), spec.strip("() "), marker.strip()
+
+
+def satisfies(version: str, specifier: str) -> bool:
+    """
+    版本是否满足约束 (PEP 440)，约束或版本无法解析时视为满足
+
+    :param version: 已安装的版本
+    :param specifier: 约束，如 ">=2.0,<3"
+    """
+    if not specifier or not version:
+        return True
+
+    try:
+        from packaging.specifiers import InvalidSpecifier, SpecifierSet
+        from packaging.version import InvalidVersion
+    except ImportError:
+        return True
+
+    try:
+        return SpecifierSet(specifier).contains(version, prereleases=True)
+    except (InvalidSpecifier, InvalidVersion):
+        return True
+
+
+class SiteIndex:
+    """
+    site-packages 的分发包元数据索引
+
+    从 *.dist-info 的 METADATA、RECORD、top_level.txt 一次性建立 包名 -> 顶层模块 -> 文件列表 的映射，
+    以 site-packages 目录的 mtime 为签名缓存到磁盘（安装、升级或卸载包都会改变该目录的 mtime），
+    之后按包名或模块名查找都是一次字典访问。
+    """
+
+    VERSION = 2
+
+    # site-packages 路径到索引实例的缓存，守护进程中跨请求复用
+    _instances: dict[str, "SiteIndex"] = {}
+
+    def __init__(self, site_packages: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None) -> None:
+        """
+        :param site_packages: site-packages 目录
+        :param cache_dir: 索引缓存目录，None 表示不写入磁盘
+        """
+        self.site_packages = Path(site_packages)
+        self.cache_file = None
+        if cache_dir is not None:
+            digest = hashlib.sha1(str(self.site_packages.resolve()).encode("utf-8")).hexdigest()[:16]
+            self.cache_file = Path(cache_dir) / f"{digest}.json"
+
+        self.signature = self._signature()
+        self.distributions: dict[str, dict[str, Any]] = {}
+        self.modules: dict[str, str] = {}
+        self._load()
+
+    @classmethod
+    def for_site(cls, site_packages: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None) -> "SiteIndex":
+        """获取 site-packages 的索引，签名未变化时复用进程内已建立的实例"""
+        key = str(site_packages)
+        index = cls._instances.get(key)
+        if index is None or index.signature != index._signature():
+            index = cls._instances[key] = cls(site_packages, cache_dir)
+        return index
+
+    def _signature(self) -> Optional[int]:
+        try:
+            return os.stat(self.site_packages).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self) -> None:
+        if self.cache_file is not None and self.cache_file.is_file():
+            try:
+                data = FileStream(self.cache_file).read_json()
+            except (OSError, ValueError):
+                data = {}
+
+            if data.get("version") == self.VERSION and data.get("signature") == self.signature:
+                self.distributions = data["distributions"]
+                self._index_modules()
+                return
+
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """扫描 site-packages 重新建立索引并写入缓存"""
+        self.distributions = {}
+        if self.site_packages.is_dir():
+            with os.scandir(self.site_packages) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".dist-info") and entry.is_dir():
+                        record = self._read_dist_info(Path(entry.path))
+                        if record is not None:
+                            self.distributions[normalize_name(record["name"])] = record
+        self._index_modules()
+
+        if self.cache_file is not None:
+            try:
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                FileStream(self.cache_file).write_json({
+                    "version": self.VERSION,
+                    "site_packages": str(self.site_packages),
+                    "signature": self.signature,
+                    "distributions": self.distributions,
+                })
+            except OSError as e:
+                print(f"⚠️ 写入 site-packages 索引失败: {str(e)}")
+
+    def _index_modules(self) -> None:
+        self.modules = {}
+        for key, record in self.distributions.items():
+            for module in record["top_level"]:
+                self.modules.setdefault(module, key)
+
+    @staticmethod
+    def _read_dist_info(dist_info: Path) -> Optional[dict[str, Any]]:
+        """读取一个 dist-info 目录，返回 name、version、top_level、files、record_hash、requires"""
+        # 只在重建索引时需要，延迟导入以加快启动
+        import csv
+        from email.parser import HeaderParser
+
+        try:
+            with open(dist_info / "METADATA", "r", encoding="utf-8", errors="replace") as f:
+                metadata = HeaderParser().parse(f)
+        except OSError:
+            return None
+
+        name = metadata.get("Name")
+        if not name:
+            return None
+
+        files = []
+        record_hash = ""
+        try:
+            with open(dist_info / "RECORD", "rb") as f:
+                record = f.read()
+            record_hash = hashlib.sha256(record).hexdigest()
+            for row in csv.reader(record.decode("utf-8").splitlines()):
+                # 只保留 site-packages 内的文件，跳过 dist-info 自身和安装到 bin/ 等位置的文件
+                if row and not row[0].startswith(("..", "/")) and not row[0].startswith(dist_info.name):
+                    files.append(row[0])
+        except (OSError, UnicodeDecodeError):
+            pass
+
+        top_level = []
+        try:
+            with open(dist_info / "top_level.txt", "r", encoding="utf-8") as f:
+                top_level = [line.strip() for line in f if line.strip()]
+        except OSError:
+            # 没有 top_level.txt 时从 RECORD 推断
+            for path in files:
+                first = path.split("/", 1)[0]
+                module = first[:-3] if first.endswith(".py") else first
+                if "/" in path or first.endswith(".py"):
+                    if module != "__pycache__" and module not in top_level:
+                        top_level.append(module)
+
+        if not files:
+            # 没有 RECORD 的安装方式：按顶层模块遍历目录
+            files = SiteIndex.module_files(dist_info.parent, top_level)
+
+        return {
+            "name": name,
+            "version": metadata.get("Version", ""),
+            "dist_info": dist_info.name,
+            "top_level": top_level,
+            "files": files,
+            "record_hash": record_hash,
+            "requires": metadata.get_all("Requires-Dist") or [],
+        }
+
+    @staticmethod
+    def module_files(site_packages: Path, modules: list[str]) -> list[str]:
+        """遍历顶层模块得到文件列表 (相对 site-packages)"""
+        files = []
+        for module in modules:
+            package = site_packages / module
+            if package.is_dir():
+                files.extend((Path(root) / name).relative_to(site_packages).as_posix()
+                             for root, _, names in os.walk(package) for name in names)
+            elif (site_packages / f"{module}.py").is_file():
+                files.append(f"{module}.py")
+        return files
+
+    def get(self, name: str) -> Optional[dict[str, Any]]:
+        """
+        按分发包名或顶层模块名查找
+
+        :param name: 分发包名 (如 PyYAML) 或模块名 (如 yaml)
+        :return: 分发包记录，找不到时返回 None
+        """
+        record = self.distributions.get(normalize_name(name))
+        if record is None:
+            key = self.modules.get(name) or self.modules.get(name.replace("-", "_"))
+            record = self.distributions.get(key) if key else None
+        return record
+
+    @staticmethod
+    def requirements(record: dict[str, Any]) -> list[tuple[str, str]]:
+        """分发包的运行时依赖 [(包名, 版本约束)]，忽略只在 extras 中需要的依赖"""
+        requirements = []
+        for line in record["requires"]:
+            parsed = parse_requirement(line)
+            if parsed and not _EXTRA_MARKER.search(parsed[2]):
+                requirements.append((parsed[0], parsed[1]))
+        return requirements
+
+    def closure(self, requirements: Iterable[tuple[str, str]]) \
+            -> tuple[list[dict[str, Any]], list[str], list[tuple[str, str, str, str]]]:
+        """
+        沿 Requires-Dist 求依赖闭包，并检查每条约束是否被已安装的版本满足
+
+        只跟随已安装的依赖；环境标记除 extra 外不求值，未安装的条件依赖视为不需要。
+
+        :param requirements: 直接依赖 [(包名, 版本约束)]
+        :return: (按发现顺序排列的分发包记录, 找不到的直接依赖,
+                  不满足的约束 [(提出约束的包, 包名, 已安装版本, 约束)]，直接依赖的提出者为空字符串)
+        """
+        resolved: dict[str, dict[str, Any]] = {}
+        missing = []
+        unsatisfied = []
+        pending = [("", name, spec) for name, spec in requirements]
+
+        while pending:
+            parent, name, spec = pending.pop(0)
+            record = self.get(name)
+            if record is None:
+                if not parent:
+                    missing.append(name)
+                continue
+
+            if not satisfies(record["version"], spec):
+                unsatisfied.append((parent, record["name"], record["version"], spec))
+
+            key = normalize_name(record["name"])
+            if key in resolved:
+                continue
+            resolved[key] = record
+            pending.extend((record["name"], dep, dep_spec) for dep, dep_spec in self.requirements(record))
+
+        return list(resolved.values()), missing, unsatisfied
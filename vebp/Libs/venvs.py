@@ -1,5 +1,8 @@
-﻿import platform
+﻿import os
+import platform
+import subprocess
 from pathlib import Path
+from typing import Optional, Union
 
 from vebp.Libs.File.path import MPath_
 
@@ -17,4 +20,56 @@ def get_venv_python(venv: str = ".venv"):
 
     if python_path.exists():
         return python_path
-    return "python.exe"
\ No newline at end of file
+    return "python.exe"
+
+
+def get_venv_site_packages(venv: str = ".venv"):
+    venv_dir = MPath_.cwd / Path(venv)
+
+    if not venv_dir.exists():
+        return None
+
+    if platform.system() == "Windows":
+        site_packages = venv_dir / "Lib" / "site-packages"
+        return site_packages if site_packages.exists() else None
+
+    for site_packages in sorted((venv_dir / "lib").glob("python*/site-packages")):
+        return site_packages
+
+    return None
+
+
+# 解释器路径到 ((size, mtime), site-packages) 的缓存，守护进程中跨请求复用
+_site_packages_cache: dict[str, tuple[tuple[int, int], Path]] = {}
+
+
+def query_site_packages(python_path: Union[str, Path]) -> Optional[Path]:
+    """
+    启动解释器查询其 site-packages 目录，结果按解释器文件缓存
+
+    :param python_path: Python 解释器路径
+    :return: site-packages 目录，查询失败时返回 None
+    """
+    key = str(python_path)
+    try:
+        st = os.stat(key)
+        signature = (st.st_size, st.st_mtime_ns)
+    except OSError:
+        signature = None
+
+    cached = _site_packages_cache.get(key)
+    if cached and signature and cached[0] == signature:
+        return cached[1]
+
+    # Windows 上第一项是环境根目录，Linux/macOS 的虚拟环境只有一项，site-packages 总是最后一项
+    result = subprocess.run(
+        [key, "-c", "import site; print(site.getsitepackages()[-1])"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    site_packages = Path(result.stdout.strip())
+
+    if signature:
+        _site_packages_cache[key] = (signature, site_packages)
+    return site_packages
@@ -1,14 +1,17 @@
 import sys
 import os
+import zipfile
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List
 
 from vebp.Libs.File import FolderStream, FileStream
 from vebp.Libs.File.modulelib import ModuleLoader
-from vebp.Libs.File.zip import ZipContent
-from vebp.Data.PluginConfig import PluginConfig
+from vebp.Libs.File.zip import ZipExtractCache
 from vebp.Data.globals import get_config
 from vebp.Plugin import Plugin
+from vebp.Plugin.index import PluginIndex
+from vebp.Plugin.store import DependencyStore
+from vebp.Plugin.timing import PluginTimings
 
 
 class PluginManager:
@@ -20,94 +23,265 @@ class PluginManager:
         self.plugins: Dict[str, Plugin] = {}
         # 记录插件包名到路径的映射
         self.package_paths: Dict[str, str] = {}
-        # 记录每个插件添加的依赖路径
+        # 记录每个插件使用的依赖键
         self.dependency_paths: Dict[str, List[str]] = {}
+        # 按版本在插件之间共享的依赖目录
+        self.dependency_store = DependencyStore()
+        # 插件清单索引
+        self.index: Optional[PluginIndex] = None
+        # 插件命名空间到清单记录的映射
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # 已并发准备好的 (导入路径, [(依赖键, 依赖目录), ...])
+        self._prepared: Dict[str, tuple[Path, List[tuple[str, Path]]]] = {}
+        # 各插件的加载耗时
+        self.timings = PluginTimings()
+        # 钩子分发表: {钩子名称: [(命名空间, 钩子函数), ...]}，按需构建
+        self._dispatch: Dict[str, List[tuple[str, Callable]]] = {}
+
+    def _jobs(self, jobs: Optional[int] = None) -> int:
+        if jobs is None:
+            jobs = get_config().get("plugins", 0, "jobs")
+        try:
+            jobs = int(jobs)
+        except (TypeError, ValueError):
+            return 1
+        return jobs if jobs > 0 else min(16, (os.cpu_count() or 1) * 2)
 
-    def load_plugins(self):
+    def load_plugins(self, jobs: Optional[int] = None):
         """
         加载指定目录下的所有插件
+
+        插件只登记清单索引中的元数据，模块在首次调用其钩子时才导入。
+        索引未命中的插件（读取 zip、解析 vebp-plugin.json 和扫描依赖目录）在线程池中并发处理，
+        登记顺序按路径排序，与并发数无关。
+
+        :param jobs: 线程数，默认读取配置 plugins.jobs，0 表示按 CPU 核心数计算
         """
         plugin_dir = get_config().get("plugins", "plugins", "src")
 
         f = FolderStream(plugin_dir).create()
+        self.index = PluginIndex(plugin_dir)
+
+        dir_info = f.walk()
+        paths = sorted([fs.path for fs in dir_info.files] + [ff.path for ff in dir_info.folders], key=str)
+
+        # 先只比较签名，索引全部命中时无需启动线程池
+        entries = [self._discover_plugin(path, scan=False) for path in paths]
+        misses = [i for i, entry in enumerate(entries) if entry is None]
+
+        jobs = min(self._jobs(jobs), len(misses))
+        if jobs > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                scanned = list(executor.map(self._discover_plugin, [paths[i] for i in misses]))
+        else:
+            scanned = [self._discover_plugin(paths[i]) for i in misses]
 
-        for fs in f.walk().files:
-            self.load_plugin(fs.path)
+        for i, entry in zip(misses, scanned):
+            entries[i] = entry
 
-        for ff in f.walk().folders:
-            self.load_plugin(ff.path)
+        for entry in entries:
+            if entry is not None:
+                self._register_plugin(entry)
+
+        self.index.save()
 
     def load_plugin(self, plugin_name: str | Path):
+        entry = self._discover_plugin(plugin_name)
+        if entry is not None:
+            self._register_plugin(entry)
+
+    def _discover_plugin(self, plugin_name: str | Path, scan: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        读取插件清单记录，不是插件或解析失败时返回 None
+
+        :param plugin_name: 插件目录或 zip 文件
+        :param scan: 索引未命中时是否读取插件内容，为 False 时只查询索引
+        """
         try:
             plugin = Path(str(plugin_name))
 
-            if FileStream(plugin).suffix == ".zip":
-                with ZipContent(plugin) as zipf:
-                    self._load_single_plugin(zipf)
+            if plugin.name.startswith("."):
+                return None
+
+            if FileStream(plugin).suffix != ".zip" and not plugin.is_dir():
+                return None
+
+            if self.index is None:
+                self.index = PluginIndex(get_config().get("plugins", "plugins", "src"))
 
-            if plugin.is_dir():
-                self._load_single_plugin(plugin)
+            with self.timings.measure(str(plugin), "discover"):
+                entry = self.index.lookup(plugin) if scan else self.index.cached(plugin)
+
+            if entry and entry["namespace"]:
+                self.timings.rename(str(plugin), entry["namespace"])
+            return entry
 
         except Exception as e:
             print(f"🔥 解析失败[{plugin_name}]: {str(e)}]")
+            return None
+
+    def _native_cache(self) -> ZipExtractCache:
+        """原生扩展的持久解压缓存"""
+        plugin_dir = get_config().get("plugins", "plugins", "src")
+        return ZipExtractCache(Path(plugin_dir) / ".cache" / "native")
+
+    def _prepare_plugin(self, plugin: Plugin) -> tuple[Path, List[tuple[str, Path]]]:
+        """
+        计算插件的导入路径和依赖目录，必要时把原生扩展解压到持久缓存
+
+        纯 Python 的 zip 插件和依赖直接以 zip 内路径导入（zipimport）；
+        包含原生扩展的依赖或插件解压到缓存后再导入。
+        锁文件中记录了版本的依赖如果已由其它插件提供，直接复用其目录，无需再解压。
+
+        :return: (插件导入路径, [(依赖键, 依赖目录), ...])
+        """
+        with self.timings.measure(plugin.namespace, "prepare"):
+            entry = self._entries.get(plugin.namespace, {})
+            plugin_path = Path(plugin.path)
+            dependencies = entry.get("dependencies", [])
+            lock = entry.get("lock", {})
+            is_zip = plugin_path.suffix == ".zip"
+
+            root = plugin_path
+            if is_zip and entry.get("native"):
+                # 插件自身包含原生扩展时无法从 zip 导入，整体解压到持久缓存
+                with zipfile.ZipFile(plugin_path, "r") as z:
+                    root = self._native_cache().extract(z, name=plugin.namespace)
+
+            result = []
+            z = None
+            try:
+                for name, native in dependencies:
+                    version = lock.get(name)
+                    path = root / "dependencies" / name
+                    key = DependencyStore.key(name, version, path)
+
+                    shared = self.dependency_store.get(key)
+                    if shared is not None:
+                        path = shared
+                    elif is_zip and native and root == plugin_path:
+                        # 同一版本的原生依赖解压到同一个缓存条目
+                        z = z or zipfile.ZipFile(plugin_path, "r")
+                        path = self._native_cache().extract(
+                            z, f"dependencies/{name}/", f"{name}-{version}" if version else f"{plugin.namespace}-{name}")
+                        key = DependencyStore.key(name, version, path)
+
+                    result.append((key, path))
+            finally:
+                if z is not None:
+                    z.close()
+
+            return root, result
+
+    def preload_plugins(self, jobs: Optional[int] = None):
+        """
+        立即导入所有已启用但尚未导入的插件
+
+        依赖准备（原生扩展解压等 I/O）在线程池中并发进行，模块按命名空间顺序依次执行。
+
+        :param jobs: 线程数，默认读取配置 plugins.jobs
+        """
+        pending = [p for _, p in sorted(self.plugins.items()) if p.action and not p.loaded]
+        if not pending:
+            return
+
+        jobs = min(self._jobs(jobs), len(pending))
 
-    def _add_dependencies_to_path(self, plugin_dir: Path, namespace: str):
-        """将插件的依赖目录添加到系统路径"""
-        dependencies_dir = plugin_dir / "dependencies"
-        added_paths = []
+        def prepare(plugin: Plugin):
+            try:
+                return self._prepare_plugin(plugin)
+            except Exception as e:
+                return e
 
-        # 检查依赖目录是否存在
-        if dependencies_dir.exists() and dependencies_dir.is_dir():
-            print(f"🔍 为插件 {namespace} 添加依赖路径: {dependencies_dir}")
+        if jobs > 1:
+            from concurrent.futures import ThreadPoolExecutor
 
-            # 遍历依赖目录中的所有子目录
-            for item in dependencies_dir.iterdir():
-                if item.is_dir():
-                    # 添加到系统路径
-                    sys.path.insert(0, str(item))
-                    added_paths.append(str(item))
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                prepared = list(executor.map(prepare, pending))
+        else:
+            prepared = [prepare(plugin) for plugin in pending]
+
+        for plugin, result in zip(pending, prepared):
+            if isinstance(result, Exception):
+                print(f"🔥 解析失败[{plugin.path}]: {str(result)}]")
+                plugin.disable()
+                continue
+
+            self._prepared[plugin.namespace] = result
+            try:
+                plugin.module
+            except Exception as e:
+                print(f"🔥 解析失败[{plugin.path}]: {str(e)}]")
+                plugin.disable()
+
+    def _add_dependencies_to_path(self, dependencies: List[tuple[str, Path]], namespace: str):
+        """
+        将插件的依赖目录添加到系统路径
 
-                    # 对于 Windows 系统，将 .libs 目录添加到 PATH
-                    if sys.platform == "win32":
-                        libs_path = item / ".libs"
-                        if libs_path.exists() and libs_path.is_dir():
-                            os.environ["PATH"] = str(libs_path) + os.pathsep + os.environ["PATH"]
-                            added_paths.append(str(libs_path))
+        同一版本的依赖只添加一次，按引用计数在最后一个使用它的插件卸载时移除
+        """
+        if not dependencies:
+            return
 
-            # 保存添加的路径，以便卸载时移除
-            self.dependency_paths[namespace] = added_paths
+        print(f"🔍 为插件 {namespace} 添加依赖路径: {', '.join(item.name for _, item in dependencies)}")
+
+        keys = []
+        for key, item in dependencies:
+            name, _, version = key.partition("==")
+            if version:
+                others = [v for v in self.dependency_store.active_versions(name) if v != version]
+                if others:
+                    print(f"⚠️ 插件 {namespace} 需要 {name} {version}, 但已加载 {', '.join(others)}, 导入时以先加入的为准")
+
+            paths = [str(item)]
+            # 对于 Windows 系统，将 .libs 目录添加到 PATH
+            if sys.platform == "win32":
+                libs_path = item / ".libs"
+                if libs_path.exists() and libs_path.is_dir():
+                    paths.append(str(libs_path))
+
+            if self.dependency_store.acquire(key, paths):
+                sys.path.insert(0, paths[0])
+                for libs_path in paths[1:]:
+                    os.environ["PATH"] = libs_path + os.pathsep + os.environ["PATH"]
+            else:
+                print(f"  ♻️ 复用共享依赖: {key}")
+            keys.append(key)
+
+        # 保存使用的依赖，以便卸载时释放
+        self.dependency_paths[namespace] = keys
 
     def _remove_dependencies_from_path(self, namespace: str):
-        """从系统路径中移除插件的依赖"""
+        """释放插件使用的依赖，没有其它插件使用时从系统路径中移除"""
         if namespace in self.dependency_paths:
-            for path in self.dependency_paths[namespace]:
-                # 从 sys.path 中移除
-                if path in sys.path:
-                    sys.path.remove(path)
-                    print(f"➖ 移除依赖路径: {path}")
-
-                # 对于 Windows 系统，从 PATH 中移除 .libs 目录
-                if sys.platform == "win32" and ".libs" in path:
-                    path_var = os.environ["PATH"]
-                    if path in path_var:
-                        new_path = path_var.replace(path + os.pathsep, "").replace(path, "")
-                        os.environ["PATH"] = new_path
+            for key in self.dependency_paths[namespace]:
+                for path in self.dependency_store.release(key):
+                    # 从 sys.path 中移除
+                    if path in sys.path:
+                        sys.path.remove(path)
+                        sys.path_importer_cache.pop(path, None)
+                        print(f"➖ 移除依赖路径: {path}")
+
+                    # 对于 Windows 系统，从 PATH 中移除 .libs 目录
+                    if sys.platform == "win32" and ".libs" in path:
+                        path_var = os.environ["PATH"]
+                        if path in path_var:
+                            new_path = path_var.replace(path + os.pathsep, "").replace(path, "")
+                            os.environ["PATH"] = new_path
 
             # 清理记录
             del self.dependency_paths[namespace]
 
-    def _load_single_plugin(self, plugin_path: Path):
+    def _register_plugin(self, entry: Dict[str, Any]):
         """
-        加载单个插件
+        根据清单索引记录登记单个插件（不导入模块）
 
-        :param plugin_path: 插件路径
+        :param entry: PluginIndex.lookup 返回的记录
         """
-        plugin_dir = Path(plugin_path)
-
-        meta = PluginConfig(plugin_dir / PluginConfig.FILENAME)
-
-        namespace = meta.get("namespace", None)
-        author = meta.get("author", "null")
+        namespace = entry["namespace"]
+        author = entry["author"]
 
         if not namespace:
             return
@@ -120,29 +294,49 @@ class PluginManager:
         if package_name in sys.modules:
             return
 
-        # 添加依赖路径到系统路径
-        self._add_dependencies_to_path(plugin_dir, namespace)
-
-        try:
-            with ModuleLoader(plugin_dir, package_name, "main.py") as module:
-                main_module = module
-        except Exception as e:
-            # 加载失败时移除依赖路径
-            self._remove_dependencies_from_path(namespace)
-            raise e
-
-        # 创建并存储 PluginConfig 实例
+        # 创建并存储 PluginConfig 实例，模块延迟导入
         plugin = Plugin(
             namespace=namespace,
             author=author,
-            module=main_module,
+            module=None,
             package_name=package_name,
-            meta=meta.file
+            meta=entry["meta"],
+            loader=self._load_single_plugin,
+            hooks=entry["hooks"],
+            path=entry["path"],
+            on_change=self._invalidate_hooks
         )
         self.plugins[namespace] = plugin
-        self.package_paths[package_name] = str(plugin_dir)
+        self._entries[namespace] = entry
+        self._invalidate_hooks()
+
+    def _load_single_plugin(self, plugin: Plugin) -> Any:
+        """
+        加载单个插件，由 Plugin 在首次使用时调用
+
+        :param plugin: 已登记的插件
+        :return: 插件主模块
+        """
+        namespace = plugin.namespace
+        prepared = self._prepared.pop(namespace, None)
+        plugin_dir, dependencies = prepared or self._prepare_plugin(plugin)
 
-        print(f"✅ 插件加载成功: {namespace} by {author}")
+        with self.timings.measure(namespace, "import"):
+            # 添加依赖路径到系统路径
+            self._add_dependencies_to_path(dependencies, namespace)
+
+            try:
+                with ModuleLoader(plugin_dir, plugin.package_name, "main.py") as module:
+                    main_module = module
+            except Exception as e:
+                # 加载失败时移除依赖路径
+                self._remove_dependencies_from_path(namespace)
+                raise e
+
+        self.package_paths[plugin.package_name] = str(plugin_dir)
+
+        print(f"✅ 插件加载成功: {namespace} by {plugin.author}")
+        return main_module
 
     def run_hook(self, namespace: str, hook_name: str, *args, **kwargs) -> Any:
         """
@@ -160,10 +354,61 @@ class PluginManager:
         print(f"插件未加载: {namespace}")
         return None
 
+    def _invalidate_hooks(self):
+        """插件增减或启用状态变化后清空钩子分发表"""
+        self._dispatch.clear()
+
+    def _build_dispatch(self, hook_name: str) -> List[tuple[str, Callable]]:
+        """
+        构建单个钩子的分发表，只会导入声明了该钩子的已启用插件
+
+        :param hook_name: 钩子名称（不需要带 _hook 后缀）
+        :return: [(命名空间, 钩子函数), ...]
+        """
+        table = []
+        for plugin in self.plugins.values():
+            if not plugin.action:
+                continue
+
+            try:
+                # 钩子未知的插件在 has_hook 中导入，导入失败与 get_hook 相同处理
+                if not plugin.has_hook(hook_name):
+                    continue
+                hook_func = plugin.get_hook(hook_name)
+            except TypeError:
+                raise
+            except Exception as e:
+                print(f"🔥 解析失败[{plugin.path or plugin.namespace}]: {str(e)}]")
+                plugin.disable()
+                continue
+
+            if hook_func is not None:
+                table.append((plugin.namespace, hook_func))
+
+        self._dispatch[hook_name] = table
+        return table
+
     def run_hook_all(self, hook_name: str, *args, **kwargs) -> list[Any]:
-        if not self.plugins: return []
+        """
+        按插件登记顺序执行所有已启用插件的钩子函数，未定义该钩子的插件直接跳过
 
-        return [n.run_hook(hook_name, *args, **kwargs) for n in self.plugins.values()]
+        :param hook_name: 钩子名称（不需要带 _hook 后缀）
+        :param args: 传递给钩子函数的参数
+        :param kwargs: 传递给钩子函数的关键字参数
+        :return: 各钩子函数的返回值
+        """
+        table = self._dispatch.get(hook_name)
+        if table is None:
+            table = self._build_dispatch(hook_name)
+
+        results = []
+        for namespace, hook_func in table:
+            try:
+                results.append(hook_func(*args, **kwargs))
+            except Exception as e:
+                print(f"⚠️ 钩子执行失败 [{namespace}.{hook_name}_hook]: {str(e)}")
+                raise
+        return results
 
     def get_plugin(self, namespace: str) -> Optional[Plugin]:
         """
@@ -204,7 +449,12 @@ class PluginManager:
 
             # 清理插件记录
             del self.plugins[namespace]
+            self._invalidate_hooks()
+            self._entries.pop(namespace, None)
+            self._prepared.pop(namespace, None)
             if package_name in self.package_paths:
+                # zip 插件的导入器会缓存 zip 目录，需要一并清理
+                sys.path_importer_cache.pop(self.package_paths[package_name], None)
                 del self.package_paths[package_name]
 
             print(f"✅ 插件已卸载: {namespace}")
@@ -212,6 +462,7 @@ class PluginManager:
             print(f"⚠️ 插件未加载: {namespace}")
 
     def enable(self, namespace: str):
+        # 插件会通过 on_change 回调清空钩子分发表
         self.get_plugin(namespace).enable()
 
     def disable(self, namespace: str):
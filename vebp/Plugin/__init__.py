@@ -1,22 +1,34 @@
-﻿from typing import Any
+﻿from typing import Any, Callable, Optional
 
 
 class Plugin:
-    def __init__(self, namespace: str, author: str, module: Any, package_name: str, meta: dict[str, Any]):
+    def __init__(self, namespace: str, author: str, module: Any, package_name: str, meta: dict[str, Any],
+                 loader: Optional[Callable[["Plugin"], Any]] = None, hooks: Optional[list[str]] = None,
+                 path: Optional[str] = None, on_change: Optional[Callable[[], None]] = None):
         """
         插件类封装
 
         :param namespace: 插件命名空间
         :param author: 插件作者
-        :param module: 插件主模块
+        :param module: 插件主模块，为 None 时在首次访问时通过 loader 导入
         :param package_name: 插件包名
         :param meta: 插件元数据
+        :param loader: 延迟导入插件主模块的函数
+        :param hooks: 插件声明的钩子名称，None 表示未知
+        :param path: 插件目录或 zip 文件路径
+        :param on_change: 启用状态变化时的回调，插件管理器用它清空钩子分发表
         """
         self._namespace = namespace
         self._author = author
-        self.module = module
+        self._module = module
+        self._loader = loader
         self.package_name = package_name
         self.meta = meta
+        self.hooks = hooks
+        self.path = path
+        self._on_change = on_change
+        # 钩子名称到钩子函数的缓存，未定义的钩子记录为 None
+        self._hook_cache: dict[str, Optional[Callable]] = {}
 
         self._action = True
 
@@ -32,6 +44,43 @@ class Plugin:
     def action(self):
         return self._action
 
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    @property
+    def module(self) -> Any:
+        """插件主模块，首次访问时导入"""
+        if self._module is None and self._loader is not None:
+            loader, self._loader = self._loader, None
+            self._module = loader(self)
+        return self._module
+
+    def has_hook(self, hook_name: str) -> bool:
+        """根据声明的钩子判断，无需导入插件模块；钩子未知 (hooks 为 None) 时导入模块判断"""
+        if self.hooks is not None and not self.loaded:
+            return hook_name in self.hooks
+        return hasattr(self.module, f"{hook_name}_hook")
+
+    def get_hook(self, hook_name: str) -> Optional[Callable]:
+        """
+        获取钩子函数，首次获取时导入插件模块并缓存结果
+
+        :param hook_name: 钩子名称（不需要带 _hook 后缀）
+        :return: 钩子函数，未定义时返回 None
+        """
+        if hook_name in self._hook_cache:
+            return self._hook_cache[hook_name]
+
+        hook_func_name = f"{hook_name}_hook"
+        hook_func = getattr(self.module, hook_func_name, None) if self.has_hook(hook_name) else None
+
+        if hook_func is not None and not callable(hook_func):
+            raise TypeError(f"插件 {self._namespace} 的 {hook_func_name} 不是可调用函数")
+
+        self._hook_cache[hook_name] = hook_func
+        return hook_func
+
     def run_hook(self, hook_name: str, *args, **kwargs) -> Any:
         """
         执行插件的钩子函数
@@ -46,14 +95,18 @@ class Plugin:
 
         hook_func_name = f"{hook_name}_hook"
 
-        if not hasattr(self.module, hook_func_name):
-            print(f"插件 {self._namespace} 未定义钩子函数: {hook_func_name}")
+        try:
+            hook_func = self.get_hook(hook_name)
+        except TypeError:
+            raise
+        except Exception as e:
+            print(f"🔥 解析失败[{self.path or self._namespace}]: {str(e)}]")
+            self.disable()
             return None
 
-        hook_func = getattr(self.module, hook_func_name)
-
-        if not callable(hook_func):
-            raise TypeError(f"插件 {self._namespace} 的 {hook_func_name} 不是可调用函数")
+        if hook_func is None:
+            print(f"插件 {self._namespace} 未定义钩子函数: {hook_func_name}")
+            return None
 
         try:
             return hook_func(*args, **kwargs)
@@ -66,7 +119,13 @@ class Plugin:
         return self.meta.copy()
 
     def enable(self):
-        self._action = True
+        self._set_action(True)
 
     def disable(self):
-        self._action = False
\ No newline at end of file
+        self._set_action(False)
+
+    def _set_action(self, action: bool):
+        changed = self._action != action
+        self._action = action
+        if changed and self._on_change is not None:
+            self._on_change()
\ No newline at end of file
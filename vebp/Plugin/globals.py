@@ -30,4 +30,14 @@ def reset_plugin_manager():
     在正常运行时通常不需要调用此函数
     """
     global _global_plugin_manager
-    _global_plugin_manager = None
\ No newline at end of file
+    _global_plugin_manager = None
+
+
+def set_plugin_manager(value: PluginManager):
+    """
+    替换全局插件管理器实例
+
+    守护进程在处理请求前切换为缓存的实例
+    """
+    global _global_plugin_manager
+    _global_plugin_manager = value
@@ -0,0 +1,270 @@
+import json
+import os
+import threading
+import zipfile
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from vebp.Data.PluginConfig import PluginConfig
+from vebp.Libs.File import FileStream
+from vebp.Libs.File.zip import is_native
+from vebp.Plugin.store import LOCK_FILENAME, read_lock
+
+
+def _module_names(tree) -> Optional[list[str]]:
+    """
+    模块作用域中绑定的名称
+
+    包括 def、class、import 的别名以及赋值、for、with、except 等的目标，也会进入顶层的 if、try、with 等语句块，
+    但不进入函数和类的内部。使用 from ... import * 时无法确定名称，返回 None。
+    """
+    import ast
+
+    names: dict[str, None] = {}
+    stack = list(reversed(tree.body))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names[node.name] = None
+            continue
+        if isinstance(node, (ast.Lambda, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)):
+            continue
+
+        if isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                if alias.name == "*":
+                    return None
+                names[alias.asname or alias.name] = None
+            continue
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                names[alias.asname or alias.name.split(".")[0]] = None
+            continue
+
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            names[node.id] = None
+        elif isinstance(node, (ast.ExceptHandler, ast.MatchAs, ast.MatchStar)) and node.name:
+            names[node.name] = None
+        elif isinstance(node, ast.MatchMapping) and node.rest:
+            names[node.rest] = None
+
+        stack.extend(reversed(list(ast.iter_child_nodes(node))))
+    return list(names)
+
+
+def _is_dynamic(tree) -> bool:
+    """模块是否可能以 AST 无法确定的方式定义名称: globals()、vars()、exec、sys.modules、函数中的 global *_hook"""
+    import ast
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id in ("globals", "vars", "exec"):
+            return True
+        if isinstance(node, ast.Attribute) and node.attr == "modules" \
+                and isinstance(node.value, ast.Name) and node.value.id == "sys":
+            return True
+        if isinstance(node, ast.Global) and any(name.endswith("_hook") for name in node.names):
+            return True
+    return False
+
+
+def find_hooks(source: Union[str, bytes]) -> Optional[list[str]]:
+    """
+    从 main.py 源码中找出模块级的钩子名称（不带 _hook 后缀）
+
+    除了 def 定义的函数，导入 (from .impl import build_hook) 和赋值 (build_hook = make_hook()) 得到的钩子，
+    以及定义在顶层 if、try 等语句块中的钩子也会被找到。
+    模块定义了 __getattr__、使用 import * 或动态定义名称时无法确定钩子，返回 None，由插件在判断钩子时导入模块。
+
+    :return: 钩子名称列表，无法确定时为 None
+    """
+    # 只在索引未命中时需要解析源码，延迟导入 ast 以加快启动
+    import ast
+
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    names = _module_names(tree)
+    if names is None or "__getattr__" in names or _is_dynamic(tree):
+        return None
+
+    return [name[:-len("_hook")] for name in names if name.endswith("_hook")]
+
+
+class PluginIndex:
+    """
+    插件清单索引
+
+    缓存每个插件的命名空间、作者、声明的钩子、依赖目录及其锁定版本和文件签名 (size, mtime)，
+    签名未变化时无需读取插件文件即可完成发现，插件模块延迟到首次调用钩子时才导入。
+    lookup 可以在多个线程中并发调用。
+    """
+
+    FILENAME = ".vebp-plugins.json"
+    VERSION = 4
+
+    def __init__(self, plugin_dir: Union[str, Path]) -> None:
+        """
+        :param plugin_dir: 插件目录，索引文件保存在该目录下
+        """
+        self.path = Path(plugin_dir) / self.FILENAME
+        self._entries: dict[str, dict[str, Any]] = self._load()
+        self._seen: set[str] = set()
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        f = FileStream(self.path)
+        if not f.exists:
+            return {}
+
+        try:
+            data = f.read_json()
+        except (ValueError, OSError):
+            return {}
+
+        if data.get("version") != self.VERSION:
+            return {}
+        return data.get("plugins", {})
+
+    def _is_stale(self, key: str) -> bool:
+        # 插件目录外的插件（配置中 add 的插件）只在文件不存在时移除
+        if Path(key).parent == self.path.parent.absolute():
+            return key not in self._seen
+        return not os.path.exists(key)
+
+    def save(self) -> None:
+        """写回索引并移除已不存在的插件记录"""
+        with self._lock:
+            stale = [key for key in self._entries if self._is_stale(key)]
+            for key in stale:
+                del self._entries[key]
+
+        if not self._dirty and not stale:
+            return
+
+        try:
+            FileStream(self.path).write_json({
+                "version": self.VERSION,
+                "plugins": self._entries,
+            })
+            self._dirty = False
+        except OSError as e:
+            print(f"⚠️ 写入插件索引失败: {str(e)}")
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[list[int]]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    def _signature(self, path: Path) -> Optional[list]:
+        if path.suffix == ".zip":
+            return [self._stat(path)]
+        if path.is_dir():
+            return [self._stat(path / PluginConfig.FILENAME), self._stat(path / "main.py"),
+                    self._stat(path / "dependencies"), self._stat(path / LOCK_FILENAME)]
+        return None
+
+    @staticmethod
+    def _scan(path: Path) -> tuple[dict[str, Any], Optional[bytes], list[list], bool, dict[str, str]]:
+        """
+        读取插件元数据、main.py 源码、依赖目录和锁文件
+
+        :return: (元数据, main.py 源码, [[依赖名, 是否包含原生扩展], ...], 插件自身是否包含原生扩展, {依赖名: 版本})
+        """
+        if path.suffix == ".zip":
+            with zipfile.ZipFile(path, "r") as z:
+                names = z.namelist()
+                if PluginConfig.FILENAME not in names:
+                    raise FileNotFoundError(f"File {path / PluginConfig.FILENAME} not found")
+                meta = json.loads(z.read(PluginConfig.FILENAME).decode("utf-8"))
+                source = z.read("main.py") if "main.py" in names else None
+                lock = read_lock(path, z) if LOCK_FILENAME in names else {}
+
+            dependencies: dict[str, bool] = {}
+            native = False
+            for name in names:
+                parts = name.split("/")
+                if parts[0] != "dependencies":
+                    native = native or is_native(name)
+                elif len(parts) >= 3 and parts[1]:
+                    dependencies[parts[1]] = dependencies.get(parts[1], False) or is_native(name)
+
+            return meta, source, [[k, v] for k, v in sorted(dependencies.items())], native, lock
+
+        meta = PluginConfig(path / PluginConfig.FILENAME).file
+        main = path / "main.py"
+        dependencies_dir = path / "dependencies"
+        dependencies = []
+        if dependencies_dir.is_dir():
+            with os.scandir(dependencies_dir) as entries:
+                dependencies = sorted([entry.name, False] for entry in entries if entry.is_dir())
+
+        return meta, main.read_bytes() if main.is_file() else None, dependencies, False, read_lock(path)
+
+    def cached(self, plugin_path: Union[str, Path]) -> Optional[dict[str, Any]]:
+        """
+        只比较文件签名获取插件记录，不读取插件内容
+
+        :param plugin_path: 插件目录或 zip 文件
+        :return: 签名未变化时返回记录，否则返回 None
+        """
+        path = Path(os.path.abspath(str(plugin_path)))
+        signature = self._signature(path)
+        if signature is None:
+            return None
+
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.get("signature") == signature:
+                self._seen.add(key)
+                return entry
+        return None
+
+    def lookup(self, plugin_path: Union[str, Path]) -> Optional[dict[str, Any]]:
+        """
+        获取插件记录，签名变化时重新读取插件
+
+        :param plugin_path: 插件目录或 zip 文件
+        :return: 包含 path、namespace、author、hooks (无法确定时为 None)、dependencies、native、lock、meta 的记录，不是插件时返回 None
+        """
+        path = Path(os.path.abspath(str(plugin_path)))
+        signature = self._signature(path)
+        if signature is None:
+            return None
+
+        key = str(path)
+        with self._lock:
+            self._seen.add(key)
+            entry = self._entries.get(key)
+
+        if entry and entry.get("signature") == signature:
+            return entry
+
+        meta, source, dependencies, native, lock = self._scan(path)
+        # 无法确定钩子时记录为 None，Plugin.has_hook 会导入模块判断
+        hooks = find_hooks(source) if source is not None else None
+        declared = meta.get("hooks", [])
+        if hooks is not None and isinstance(declared, list):
+            hooks.extend(h for h in declared if h not in hooks)
+
+        entry = {
+            "path": key,
+            "signature": signature,
+            "namespace": meta.get("namespace", None),
+            "author": meta.get("author", "null"),
+            "hooks": hooks,
+            "dependencies": dependencies,
+            "native": native,
+            "lock": lock,
+            "meta": meta,
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._dirty = True
+        return entry
@@ -0,0 +1,99 @@
+import json
+import zipfile
+from pathlib import Path
+from typing import Optional
+
+from vebp.Libs.metadata import normalize_name
+
+# 插件打包时记录依赖解析结果的锁文件，位于插件根目录
+LOCK_FILENAME = "vebp-lock.json"
+LOCK_VERSION = 1
+
+
+def read_lock(plugin_path: Path, z: Optional[zipfile.ZipFile] = None) -> dict[str, str]:
+    """
+    读取插件锁文件中的依赖版本
+
+    :param plugin_path: 插件目录或 zip 文件
+    :param z: 已打开的 zip 文件
+    :return: {依赖目录名: 版本}，没有锁文件时为空
+    """
+    try:
+        if z is not None:
+            data = json.loads(z.read(LOCK_FILENAME).decode("utf-8"))
+        else:
+            data = json.loads((plugin_path / LOCK_FILENAME).read_text(encoding="utf-8"))
+    except (KeyError, OSError, ValueError):
+        return {}
+
+    if data.get("version") != LOCK_VERSION:
+        return {}
+    return {name: package.get("version", "") for name, package in data.get("packages", {}).items()}
+
+
+class DependencyStore:
+    """
+    插件依赖的共享存储
+
+    以 (规范化包名, 版本) 为键，同一版本的依赖只把第一个提供它的插件中的目录加入 sys.path，
+    之后加载的插件复用该目录并增加引用计数，最后一个使用者卸载时才移除。
+    没有锁文件记录版本的依赖以目录本身为键，不与其他插件共享。
+    """
+
+    def __init__(self) -> None:
+        # 键 -> 加入的路径 (依赖目录以及 Windows 上的 .libs 目录)
+        self._paths: dict[str, list[str]] = {}
+        self._refs: dict[str, int] = {}
+
+    @staticmethod
+    def key(name: str, version: Optional[str], path: Path) -> str:
+        """
+        :param name: 依赖目录名 (分发包名)
+        :param version: 锁文件中记录的版本，None 表示未知
+        :param path: 依赖目录
+        """
+        if version:
+            return f"{normalize_name(name)}=={version}"
+        return str(path)
+
+    def get(self, key: str) -> Optional[Path]:
+        """已加入 sys.path 的共享依赖目录"""
+        paths = self._paths.get(key)
+        return Path(paths[0]) if paths else None
+
+    def active_versions(self, name: str) -> list[str]:
+        """同名依赖已加入 sys.path 的版本"""
+        prefix = f"{normalize_name(name)}=="
+        return [key[len(prefix):] for key in self._paths if key.startswith(prefix)]
+
+    def acquire(self, key: str, paths: list[str]) -> bool:
+        """
+        增加引用
+
+        :param key: 依赖键
+        :param paths: 首次使用时需要加入的路径
+        :return: 是否是首次使用（调用方需要把 paths 加入 sys.path）
+        """
+        if key in self._refs:
+            self._refs[key] += 1
+            return False
+
+        self._refs[key] = 1
+        self._paths[key] = paths
+        return True
+
+    def release(self, key: str) -> list[str]:
+        """
+        减少引用
+
+        :return: 引用归零时需要移除的路径，否则为空
+        """
+        if key not in self._refs:
+            return []
+
+        self._refs[key] -= 1
+        if self._refs[key] > 0:
+            return []
+
+        del self._refs[key]
+        return self._paths.pop(key)
@@ -0,0 +1,63 @@
+import contextlib
+import threading
+import time
+from typing import Iterator
+
+
+class PluginTimings:
+    """记录每个插件在各加载阶段的耗时，线程安全"""
+
+    PHASES = ("discover", "prepare", "import")
+
+    def __init__(self) -> None:
+        self._timings: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, phase: str, elapsed: float) -> None:
+        with self._lock:
+            phases = self._timings.setdefault(name, {})
+            phases[phase] = phases.get(phase, 0.0) + elapsed
+
+    @contextlib.contextmanager
+    def measure(self, name: str, phase: str) -> Iterator[None]:
+        """
+        统计代码块耗时并计入指定插件的阶段
+
+        :param name: 插件名称（命名空间或路径）
+        :param phase: 阶段名称
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, phase, time.perf_counter() - start)
+
+    def rename(self, old: str, new: str) -> None:
+        """发现阶段以路径记录，得到命名空间后合并到命名空间下"""
+        with self._lock:
+            if old == new or old not in self._timings:
+                return
+            phases = self._timings.setdefault(new, {})
+            for phase, elapsed in self._timings.pop(old).items():
+                phases[phase] = phases.get(phase, 0.0) + elapsed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._timings.clear()
+
+    def report(self) -> None:
+        """按总耗时从高到低打印每个插件各阶段的耗时"""
+        if not self._timings:
+            print("  没有插件加载记录")
+            return
+
+        rows = sorted(self._timings.items(), key=lambda item: sum(item[1].values()), reverse=True)
+        width = max(4, max(len(name) for name, _ in rows))
+
+        header = "".join(f"{phase:>10}" for phase in self.PHASES)
+        print("\n⏱️ 插件加载耗时 (ms):")
+        # 中文表头在终端中占两个字符宽度
+        print(f"  {'插件':<{width - 2}}{header}{'total':>10}")
+        for name, phases in rows:
+            cells = "".join(f"{phases.get(phase, 0.0) * 1000:>10.1f}" for phase in self.PHASES)
+            print(f"  {name:<{width}}{cells}{sum(phases.values()) * 1000:>10.1f}")
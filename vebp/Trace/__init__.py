@@ -0,0 +1,161 @@
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+
+class Tracer:
+    """
+    构建过程的结构化追踪，输出 Chrome trace event 格式 (chrome://tracing / Perfetto)
+
+    未启用时 span 只做一次判断，不记录任何内容，插件可以放心在钩子中调用。
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.events: list[dict[str, Any]] = []
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self.events.clear()
+
+    @staticmethod
+    def _now() -> int:
+        return time.perf_counter_ns() // 1000
+
+    def _add(self, event: dict[str, Any]) -> None:
+        event.setdefault("pid", os.getpid())
+        event.setdefault("tid", threading.get_ident())
+        with self._lock:
+            self.events.append(event)
+
+    @contextlib.contextmanager
+    def span(self, name: str, cat: str = "vebp", **args: Any) -> Iterator[None]:
+        """
+        记录一段耗时
+
+        用法示例:
+            with get_tracer().span("generate-assets", cat="my-plugin", count=10):
+                ...
+
+        :param name: 名称
+        :param cat: 分类，在追踪视图中可用于过滤
+        :param args: 附加信息，显示在事件详情中
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = self._now()
+        try:
+            yield
+        finally:
+            event = {"name": name, "cat": cat, "ph": "X", "ts": start, "dur": self._now() - start}
+            if args:
+                event["args"] = {key: str(value) for key, value in args.items()}
+            self._add(event)
+
+    def instant(self, name: str, cat: str = "vebp", **args: Any) -> None:
+        """记录一个时间点事件"""
+        if not self.enabled:
+            return
+
+        event = {"name": name, "cat": cat, "ph": "i", "s": "t", "ts": self._now()}
+        if args:
+            event["args"] = {key: str(value) for key, value in args.items()}
+        self._add(event)
+
+    def mark(self) -> int:
+        """当前事件数，配合 since 取出之后记录的事件"""
+        return len(self.events)
+
+    def since(self, mark: int) -> list[dict[str, Any]]:
+        with self._lock:
+            return self.events[mark:]
+
+    def merge(self, events: Optional[list[dict[str, Any]]]) -> None:
+        """合并子进程中记录的事件"""
+        if self.enabled and events:
+            with self._lock:
+                self.events.extend(events)
+
+    def save(self, path: Union[str, Path]) -> Path:
+        """写入 Chrome trace event JSON"""
+        path = Path(path)
+        with self._lock:
+            events = list(self.events)
+
+        names = {self.pid: "vebp"}
+        for event in events:
+            names.setdefault(event["pid"], f"vebp 子进程 {event['pid']}")
+        metadata = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": name}}
+                    for pid, name in names.items()]
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"traceEvents": metadata + events, "displayTimeUnit": "ms"}), encoding="utf-8")
+        return path
+
+
+class TraceSession:
+    """
+    命令级别的追踪/性能分析会话
+
+    --trace 启用追踪并在结束时写入 trace JSON；--profile 使用 cProfile 分析 vebp 自身的代码并写入 .pstats。
+    命令中途调用 sys.exit 时同样会写入结果。
+    """
+
+    def __init__(self, tracer: Tracer, trace: Optional[str] = None, profile: Optional[str] = None,
+                 name: str = "vebp") -> None:
+        """
+        :param tracer: 追踪器
+        :param trace: trace JSON 输出路径，None 表示不追踪
+        :param profile: .pstats 输出路径，None 表示不分析，空字符串使用 vebp-build/reports/<name>.pstats
+        :param name: 会话名称（命令名），用于根 span 和默认文件名
+        """
+        self.tracer = tracer
+        self.trace = trace
+        self.profile = profile
+        self.name = name
+        self._profiler = None
+        self._span = None
+
+    def __enter__(self) -> "TraceSession":
+        if self.trace:
+            self.tracer.enable()
+            self._span = self.tracer.span(f"vebp {self.name}", cat="command")
+            self._span.__enter__()
+
+        if self.profile is not None:
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._profiler is not None:
+            self._profiler.disable()
+            path = Path(self.profile or Path("vebp-build") / "reports" / f"{self.name}.pstats")
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                self._profiler.dump_stats(str(path))
+                print(f"📈 性能分析已保存: {path} (python -m pstats {path})")
+            except OSError as e:
+                print(f"❌ 写入性能分析失败: {str(e)}", file=sys.stderr)
+
+        if self._span is not None:
+            self._span.__exit__(*exc)
+            try:
+                path = self.tracer.save(self.trace)
+                print(f"🧭 追踪已保存: {path} (在 chrome://tracing 或 ui.perfetto.dev 中打开)")
+            except OSError as e:
+                print(f"❌ 写入追踪文件失败: {str(e)}", file=sys.stderr)
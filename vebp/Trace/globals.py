@@ -0,0 +1,41 @@
+from vebp.Trace import Tracer
+
+_global_tracer = None
+
+
+def get_tracer() -> Tracer:
+    """
+    获取全局追踪器实例
+
+    插件可以通过它记录自己的 span，未启用追踪时不产生开销。
+
+    用法示例:
+        with get_tracer().span("compress-assets", cat="my-plugin"):
+            ...
+
+    :return: 全局追踪器实例
+    """
+    global _global_tracer
+    if _global_tracer is None:
+        _global_tracer = Tracer()
+    return _global_tracer
+
+
+def reset_tracer():
+    """
+    重置全局追踪器
+
+    守护进程在每个请求开始时调用，避免不同命令的事件混在一起
+    """
+    global _global_tracer
+    _global_tracer = None
+
+
+def enable_from_argv(argv: list[str]) -> None:
+    """
+    命令行中带有 --trace 时尽早启用追踪，使加载配置和插件的阶段也被记录
+
+    :param argv: 命令行参数
+    """
+    if any(arg == "--trace" or arg.startswith("--trace=") for arg in argv):
+        get_tracer().enable()
@@ -1,11 +1,22 @@
-﻿import vebp.Builder
-import vebp.Command
-import vebp.Data
-import vebp.Plugin
+﻿"""vebp - Enhanced PyInstaller Packaging Tool"""
+import importlib
 
-import vebp.base
-import vebp.cli
-import vebp.cmd
-import vebp.fstr
-import vebp.lancher
-import vebp.version
+# 子模块按需导入，避免 `vebp version` 这类简单命令加载构建器和交互界面依赖
+__all__ = [
+    "Builder",
+    "Command",
+    "Data",
+    "Plugin",
+    "base",
+    "cli",
+    "cmd",
+    "fstr",
+    "lancher",
+    "version",
+]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,12 +1,15 @@
 ﻿from vebp.Data.globals import get_config
 from vebp.Plugin.globals import get_plugin_manager
+from vebp.Trace.globals import get_tracer
 
 
 class VebpBase:
     def __init__(self):
-        get_plugin_manager().load_plugins()
+        with get_tracer().span("plugins.load", cat="plugin"):
+            get_plugin_manager().load_plugins()
 
-        p_lst = get_config().get("plugins", [], "add")
-        if p_lst:
-            for p in p_lst:
-                get_plugin_manager().load_plugin(p)
\ No newline at end of file
+            p_lst = get_config().get("plugins", [], "add")
+            if p_lst:
+                for p in p_lst:
+                    get_plugin_manager().load_plugin(p)
+                get_plugin_manager().index.save()
\ No newline at end of file
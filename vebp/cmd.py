@@ -1,4 +1,6 @@
-﻿from colorama import Fore, Style
+﻿import shlex
+
+from colorama import Fore, Style
 
 from vebp.Command.Utils.Create import CommandUtilsCreate
 from vebp.Command.Commands.matches import CommandMatch
@@ -11,6 +13,22 @@ class CMD(VebpBase):
         super().__init__()
         self.parser = CommandUtilsCreate.create()
 
+    @staticmethod
+    def _forward(line: str) -> bool:
+        """守护进程运行时把命令转发给它执行，返回是否已转发"""
+        from vebp.Daemon import DaemonClient
+
+        try:
+            tokens = shlex.split(line)
+        except ValueError:
+            return False
+
+        # exit 需要退出当前 CMD；daemon、dev、build --watch 由 DaemonClient.forward 判断在本地执行
+        if not tokens or tokens[0] == "exit":
+            return False
+
+        return DaemonClient().forward(tokens) is not None
+
     def run(self) -> None:
         print(f"Vebp {__version__}")
         print('Type "help", "version", "copyright", "credits" or "license" for more information.')
@@ -22,7 +40,8 @@ class CMD(VebpBase):
                 print(Style.RESET_ALL, end="")
                 file = input()
                 print(Style.RESET_ALL, end="")
-                CommandMatch.handle(self.parser, 1, file)
+                if not self._forward(file):
+                    CommandMatch.handle(self.parser, 1, file)
             except Exception as e:
                 print(Style.RESET_ALL, end="")
                 print(f"{Fore.RED}{e}")
\ No newline at end of file
@@ -3,7 +3,6 @@
 from colorama import Fore
 
 from vebp.Libs.Error import get_traceback
-from vebp.cli import CLI
 
 
 def launch(func):
@@ -16,7 +15,27 @@ def launch(func):
 
     return wrapper
 
+def forward() -> None:
+    """守护进程运行时把命令转发给它执行，daemon、dev、build --watch 和 CMD 模式总是在本地执行"""
+    if len(sys.argv) < 2:
+        return
+
+    from vebp.Daemon import DaemonClient
+
+    code = DaemonClient().forward(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
+
+
 @launch
 def run():
+    forward()
+
+    from vebp.Trace.globals import enable_from_argv
+    enable_from_argv(sys.argv[1:])
+
+    # CLI 会加载配置和插件，转发成功时无需导入
+    from vebp.cli import CLI
+
     cli = CLI()
     cli.run()
\ No newline at end of file